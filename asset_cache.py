@@ -0,0 +1,88 @@
+"""
+On-disk cache of decoded and sliced image assets.
+
+Decoding PNG/SVG files and slicing spritesheets dominates startup. The
+baked result of each asset is stored as raw RGBA pixels under CACHE_DIR,
+in a file named after the hash of the source file and the bake step, and
+read back with a single read on the next start. A changed source or bake
+step hashes differently, so stale entries are never used.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+
+import pygame
+
+CACHE_DIR = "./.cache/assets"
+
+MAGIC = b"HMAC"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+
+
+def cache_path(source_path, kind):
+    """
+    Returns the cache file for a source file baked by the step named kind.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{kind}:{VERSION}:".encode("utf-8"))
+    with open(source_path, "rb") as f:
+        digest.update(f.read())
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(CACHE_DIR, f"{name}-{kind}-{digest.hexdigest()[:16]}.raw")
+
+
+def read_surface(path):
+    """
+    Reads a cached surface, or returns None if the file is missing or invalid.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, _, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    pixels = data[HEADER.size :]
+    if len(pixels) != width * height * 4:
+        return None
+    return pygame.image.frombuffer(pixels, (width, height), "RGBA")
+
+
+def write_surface(path, surface):
+    """
+    Writes a surface as raw RGBA pixels, replacing the file atomically.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    width, height = surface.get_size()
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, width, height))
+            f.write(pygame.image.tobytes(surface, "RGBA"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load(source_path, kind="image", bake=None):
+    """
+    Returns the baked surface for a source file, converted for the display.
+    bake(source_path) builds the surface when the cache has no valid entry;
+    by default the file is simply decoded.
+    """
+    path = cache_path(source_path, kind)
+    surface = read_surface(path)
+    if surface is None:
+        surface = bake(source_path) if bake else pygame.image.load(source_path)
+        try:
+            write_surface(path, surface)
+        except OSError:
+            pass  # A read-only install still works, just without the cache
+    return surface.convert_alpha()
@@ -0,0 +1,344 @@
+"""
+Benchmarks of the core engine and the rendering hot paths.
+
+Each benchmark records time metrics named like "guess.word8.ns" (the unit
+is the last part of the name). Results are written as JSON together with
+the interpreter and platform they were taken on. A metric fails when it
+exceeds its maximum in the thresholds file, or when a baseline results
+file is given and the metric is slower than the baseline by more than the
+tolerance. The exit status is 1 if any metric fails.
+
+The imports benchmark times the import of each headless module in a fresh
+interpreter with -X importtime, so it includes the modules it pulls in.
+
+The frame benchmarks need pygame and run on the SDL dummy video driver;
+they are skipped when pygame is not installed.
+
+Usage: python bench.py [--output bench_results.json] [--only guess,timers]
+                       [--baseline old.json --tolerance 0.25] [--quick]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import core
+import wordlist
+from scheduler import NO_TIMERS, TimerScheduler, VirtualScheduler
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+THRESHOLDS_PATH = "./bench_thresholds.json"
+# Modules that must load without pygame
+HEADLESS_MODULES = (
+    "core",
+    "scheduler",
+    "wordlist",
+    "word_index",
+    "simulate",
+    "build_datasets",
+)
+
+
+def measure(function, number, repeat=5):
+    """
+    Returns the median seconds per call of function over repeat runs of
+    number calls each.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - started) / number)
+    return statistics.median(timings)
+
+
+def synthetic_entry(length, words=1):
+    """
+    Returns an upper-case entry of the given length, split into words.
+    """
+    letters = [ALPHABET[(i * 7) % len(ALPHABET)] for i in range(length)]
+    step = length // words
+    for i in range(step, length, step):
+        letters[i] = " "
+    return "".join(letters)
+
+
+def bench_guess(scale):
+    """
+    guess_letters cost per call on words and phrases of several lengths.
+    A game guesses the whole alphabet, then the session is reset.
+    """
+    metrics = {}
+    session = core.HangmanSession(scheduler=NO_TIMERS)
+    cases = [
+        ("word4", synthetic_entry(4)),
+        ("word8", synthetic_entry(8)),
+        ("word16", synthetic_entry(16)),
+        ("phrase16", synthetic_entry(16, 2)),
+        ("phrase32", synthetic_entry(32, 4)),
+    ]
+    for name, entry in cases:
+
+        def game():
+            session.game_over()
+            session.current_word = entry
+            for letter in ALPHABET:
+                session.guess_letters(letter)
+
+        seconds = measure(game, 200 * scale)
+        metrics[f"guess.{name}.ns"] = seconds / len(ALPHABET) * 1e9
+    return metrics
+
+
+def bench_choose(scale):
+    """
+    choose_word latency: cold (dataset and index loaded by the call) and warm.
+    """
+    metrics = {}
+    words, indexes = core.words, dict(core.indexes)
+
+    def cold(difficulty=None):
+        core.words = []
+        core.indexes.clear()
+        started = time.perf_counter()
+        core.choose_word(difficulty)
+        return time.perf_counter() - started
+
+    try:
+        metrics["choose.cold.us"] = (
+            statistics.median(cold() for _ in range(5)) * 1e6
+        )
+        metrics["choose.cold_difficulty.us"] = (
+            statistics.median(cold("hard") for _ in range(5)) * 1e6
+        )
+        core.choose_word("hard")
+        metrics["choose.warm.ns"] = measure(core.choose_word, 2000 * scale) * 1e9
+        metrics["choose.warm_difficulty.ns"] = (
+            measure(lambda: core.choose_word("hard"), 2000 * scale) * 1e9
+        )
+    finally:
+        core.words = words
+        core.indexes.clear()
+        core.indexes.update(indexes)
+    return metrics
+
+
+def bench_dataset(scale):
+    """
+    Load time of the word list, compiled (memory mapped) and from text.
+    """
+    metrics = {}
+    if wordlist.is_current(core.WORDS_PATH):
+        compiled = measure(lambda: wordlist.load(core.WORDS_PATH).close(), 20 * scale)
+        metrics["dataset.compiled.us"] = compiled * 1e6
+    text = measure(lambda: wordlist.read_text(core.WORDS_PATH), scale, repeat=3)
+    metrics["dataset.text.us"] = text * 1e6
+    return metrics
+
+
+def bench_timers(scale):
+    """
+    Turn timer overhead with N concurrent sessions: resetting a deadline on
+    the threaded scheduler, and dispatching expiries on a virtual clock.
+    """
+    metrics = {}
+    rng = random.Random(0)
+    for count in (100, 1000, 10000):
+        scheduler = TimerScheduler()
+        sessions = [core.HangmanSession(i, scheduler) for i in range(count)]
+        for session in sessions:
+            session.start_timer(3600 + rng.random())
+        picks = [rng.choice(sessions) for _ in range(1000)]
+
+        def resets():
+            for session in picks:
+                session.reset_timer(3600 + rng.random())
+
+        seconds = measure(resets, scale)
+        metrics[f"timers.reset{count}.ns"] = seconds / len(picks) * 1e9
+        for session in sessions:
+            session.stop_timer()
+        scheduler.stop()
+
+        virtual = VirtualScheduler()
+        sessions = [core.HangmanSession(i, virtual) for i in range(count)]
+        timings = []
+        for _ in range(3):
+            for session in sessions:
+                session.start_timer(rng.uniform(0, core.TURN_SECONDS))
+            started = time.perf_counter()
+            virtual.advance(core.TURN_SECONDS)
+            timings.append((time.perf_counter() - started) / count)
+        metrics[f"timers.expire{count}.ns"] = statistics.median(timings) * 1e9
+    return metrics
+
+
+def import_profile(module):
+    """
+    Imports module in a fresh interpreter with -X importtime.
+    Returns (cumulative import time of module in microseconds, modules loaded).
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys, {module}; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = None
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        # Only the top-level entry, nested imports are indented further
+        if len(fields) == 3 and fields[2] == f" {module}":
+            cumulative = int(fields[1])
+    return cumulative, set(result.stdout.split())
+
+
+def bench_imports(scale):
+    """
+    Cumulative import time of each headless module, in a fresh interpreter.
+    """
+    metrics = {}
+    for module in HEADLESS_MODULES:
+        timings = [import_profile(module)[0] for _ in range(3 * scale)]
+        metrics[f"import.{module}.us"] = statistics.median(timings)
+    return metrics
+
+
+def bench_frame(scale):
+    """
+    Game.update and drawing cost per frame, under the SDL dummy driver.
+    """
+    try:
+        import pygame  # noqa: F401
+    except ImportError:
+        return {}
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import main
+
+    if main.screen is None:
+        main.init_display()
+    scheduler = core.session.scheduler
+    core.session.scheduler = VirtualScheduler()
+    try:
+        game = main.Game()
+        core.session.setup("basic")
+        game.mode = "basic"
+        game.state = core.GAME
+        game.create_letter_buttons()
+        game.update()
+        game.render(main.screen)
+
+        def idle_frame():
+            game.update()
+            game.render(main.screen)
+
+        def guess_frame():
+            core.session.game_over()
+            core.session.current_word = "hangman"
+            core.guess_letters("A")
+            game.update()
+            game.render(main.screen)
+
+        frames = 100 * scale
+        return {
+            "frame.update.us": measure(game.update, frames) * 1e6,
+            "frame.draw.us": measure(lambda: game.draw(main.screen), frames) * 1e6,
+            "frame.idle.us": measure(idle_frame, frames) * 1e6,
+            "frame.guess.us": measure(guess_frame, frames) * 1e6,
+        }
+    finally:
+        core.session.game_over()
+        core.session.scheduler = scheduler
+
+
+BENCHMARKS = {
+    "guess": bench_guess,
+    "choose": bench_choose,
+    "dataset": bench_dataset,
+    "timers": bench_timers,
+    "imports": bench_imports,
+    "frame": bench_frame,
+}
+
+
+def run(names=None, scale=1):
+    """
+    Runs the named benchmarks (all by default); returns their metrics.
+    """
+    metrics = {}
+    for name in names or BENCHMARKS:
+        metrics.update(BENCHMARKS[name](scale))
+    return metrics
+
+
+def check(metrics, thresholds, baseline=None, tolerance=0.25):
+    """
+    Returns a list of failure messages: metrics above their threshold
+    maximum, or more than tolerance slower than the baseline metrics.
+    """
+    failures = []
+    for name, value in sorted(metrics.items()):
+        limit = thresholds.get(name, {}).get("max")
+        if limit is not None and value > limit:
+            failures.append(f"{name}: {value:.1f} exceeds the maximum {limit}")
+        if baseline and name in baseline:
+            allowed = baseline[name] * (1 + tolerance)
+            if value > allowed:
+                failures.append(
+                    f"{name}: {value:.1f} is over {tolerance:.0%} slower than "
+                    f"the baseline {baseline[name]:.1f}"
+                )
+    return failures
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the hangman benchmarks.")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    parser.add_argument("--only", help="comma separated benchmarks to run")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--quick", action="store_true", help="fewer iterations, noisier numbers"
+    )
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else None
+    metrics = run(names, scale=1 if args.quick else 5)
+    thresholds = load_json(args.thresholds) if os.path.exists(args.thresholds) else {}
+    baseline = load_json(args.baseline)["metrics"] if args.baseline else None
+    failures = check(metrics, thresholds, baseline, args.tolerance)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "metrics": metrics,
+        "failures": failures,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for name, value in metrics.items():
+        print(f"{name:30s} {value:12.1f}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,249 @@
+"""
+Builds the game datasets from their source word lists.
+
+Every target streams its source through a chain of generator filters and
+writes the text output and its compiled word list (see wordlist.py) in a
+single pass, then writes its difficulty index (see word_index.py).
+A manifest records the hash of each source and the filter
+settings, so re-running only rebuilds targets whose inputs changed.
+Outputs are also checked against the SHA-256 of their text here, which
+the game itself never reads (it compares only sizes and mtimes).
+
+Usage: python build_datasets.py [--force] [target ...]
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+
+import word_index
+import wordlist
+
+DATASETS = "./datasets"
+MANIFEST = os.path.join(DATASETS, "manifest.json")
+
+# Output name -> source file and filters applied to it
+TARGETS = {
+    "cleaned_data": {
+        "source": "words.txt",
+        "min_length": 8,
+    },
+}
+
+# Hand-maintained lists that are only compiled, not filtered
+COMPILE_ONLY = ["words.txt", "phrases.txt"]
+
+DEFAULTS = {
+    "min_length": 1,
+    "max_length": None,
+    "charset": None,
+    "dedupe": True,
+    "tiers": None,
+}
+
+
+def read_entries(path, buffer_size=-1, errors="strict"):
+    """
+    Yields the stripped, non-blank lines of a text file.
+    """
+    with open(path, "r", encoding="utf-8", buffering=buffer_size, errors=errors) as f:
+        for line in f:
+            entry = line.strip()
+            if entry:
+                yield entry
+
+
+def filter_length(entries, min_length=1, max_length=None):
+    """
+    Keeps entries whose length lies between min_length and max_length.
+    """
+    for entry in entries:
+        if len(entry) >= min_length and (max_length is None or len(entry) <= max_length):
+            yield entry
+
+
+def filter_charset(entries, charset):
+    """
+    Keeps entries made only of characters matching the charset regex class,
+    e.g. "a-z" or "A-Za-z -".
+    """
+    pattern = re.compile(f"[{charset}]+")
+    for entry in entries:
+        if pattern.fullmatch(entry):
+            yield entry
+
+
+def filter_duplicates(entries):
+    """
+    Drops entries already seen, ignoring case.
+    Memory grows with the number of distinct entries kept.
+    """
+    seen = set()
+    for entry in entries:
+        key = entry.casefold()
+        if key not in seen:
+            seen.add(key)
+            yield entry
+
+
+def filter_tiers(entries, tiers):
+    """
+    Keeps entries whose difficulty tier is in tiers.
+    """
+    for entry in entries:
+        if word_index.difficulty_tier(entry) in tiers:
+            yield entry
+
+
+def pipeline(source, settings):
+    """
+    Chains the filters selected by settings over the source entries.
+    """
+    return filter_entries(read_entries(source), settings)
+
+
+def filter_entries(entries, settings):
+    """
+    Chains the filters selected by settings over entries.
+    """
+    entries = filter_length(entries, settings["min_length"], settings["max_length"])
+    if settings["charset"]:
+        entries = filter_charset(entries, settings["charset"])
+    if settings["dedupe"]:
+        entries = filter_duplicates(entries)
+    if settings["tiers"]:
+        entries = filter_tiers(entries, set(settings["tiers"]))
+    return entries
+
+
+def write_text(entries, f):
+    """
+    Writes each entry as a line of f and passes it on unchanged.
+    """
+    for entry in entries:
+        f.write(entry + "\n")
+        yield entry
+
+
+def file_hash(path):
+    """
+    Returns the SHA-256 of a file, in hex.
+    """
+    return wordlist.file_digest(path).hex()
+
+
+def build_target(name, config, directory=DATASETS):
+    """
+    Builds name.txt and name.bin from the target's source in one pass.
+    Returns the number of entries written.
+    """
+    settings = dict(DEFAULTS, **config)
+    source = os.path.join(directory, settings["source"])
+    text_path = os.path.join(directory, name + ".txt")
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", buffering=1 << 20) as f:
+            entries = write_text(pipeline(source, settings), f)
+            count = wordlist.compile_entries(entries, wordlist.compiled_path(text_path))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, text_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    # The compiled list was written before the text existed: record its mtime
+    wordlist.verify(text_path)
+    word_index.build_for_text(text_path)
+    return count
+
+
+def load_manifest(path=MANIFEST):
+    """
+    Returns the manifest of the last build, or an empty one.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST):
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def build(
+    names=None,
+    force=False,
+    directory=DATASETS,
+    targets=TARGETS,
+    compile_only=COMPILE_ONLY,
+):
+    """
+    Builds the named targets (all by default), skipping any whose source
+    and settings match the manifest and whose outputs still exist.
+    Returns the names of the targets that were rebuilt.
+    """
+    manifest_path = os.path.join(directory, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    rebuilt = []
+    for name in names or targets:
+        config = targets[name]
+        settings = dict(DEFAULTS, **config)
+        record = {
+            "settings": settings,
+            "source_sha256": file_hash(os.path.join(directory, settings["source"])),
+        }
+        text_path = os.path.join(directory, name + ".txt")
+        outputs_exist = all(
+            os.path.exists(path)
+            for path in (
+                text_path,
+                wordlist.compiled_path(text_path),
+                word_index.index_path(text_path),
+            )
+        )
+        previous = dict(manifest.get(name, {}))
+        previous.pop("count", None)
+        if (
+            not force
+            and outputs_exist
+            and previous == record
+            and wordlist.verify(text_path)
+            and word_index.verify(text_path)
+        ):
+            continue
+        record["count"] = build_target(name, config, directory)
+        manifest[name] = record
+        rebuilt.append(name)
+    if rebuilt:
+        save_manifest(manifest, manifest_path)
+
+    if not names:
+        for source in compile_only:
+            text_path = os.path.join(directory, source)
+            if (
+                force
+                or not wordlist.verify(text_path)
+                or not word_index.verify(text_path)
+            ):
+                wordlist.compile_text(text_path)
+                word_index.build_for_text(text_path)
+                rebuilt.append(source)
+    return rebuilt
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the hangman datasets.")
+    parser.add_argument("targets", nargs="*", help=", ".join(TARGETS))
+    parser.add_argument("--force", action="store_true", help="rebuild everything")
+    args = parser.parse_args()
+    for name in args.targets:
+        if name not in TARGETS:
+            parser.error(f"unknown target {name!r}")
+    for name in build(args.targets, args.force):
+        print(f"built {name}")
@@ -1,38 +1,75 @@
 import pygame
 import string
-
-def test_setup_intermediate(self):
-        # Test intermediate setup initializes phrase and state correctly
-        core.setup("intermediate")
-        self.assertIn(core.current_word, core.phrases)
-        self.assertEqual(len(core.word_state), len(core.current_word))
-        # Spaces in the phrase should be revealed immediately.
-        for i, ch in enumerate(core.current_word):
-            if ch == " ":
-                self.assertEqual(core.word_state[i], " ")  # Expecting a space, not an underscore
-            else:
-                self.assertEqual(core.word_state[i], "_") # All other characters are underscores
+from collections import OrderedDict
+
+import asset_cache
+
+# Surfaces created by the components so far; the frame metrics report how
+# many each frame allocates
+surfaces_created = 0
+
+# Creates each font once and hands out the same object afterwards
+class FontRegistry:
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, path, size):
+        # path None selects pygame's default font
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(path, size)
+        return font
+
+# Least-recently-used cache of rendered text surfaces
+class TextCache:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        """Return the rendered surface for (font, text, color), rendering on a miss"""
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        global surfaces_created
+        surfaces_created += 1
+        surface = self.surfaces[key] = font.render(text, antialias, color)
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+# Glyphs of the word lines, shared by every Underscores widget
+glyph_cache = TextCache()
 
 # Button class for clickable UI buttons
 class Button(pygame.sprite.Sprite):
     def __init__(self, normal_img, clicked_img, pos, text, font):
         super().__init__()
         # Load button images for normal and clicked states
-        self.normal_img = pygame.image.load(normal_img).convert_alpha()
-        self.clicked_img = pygame.image.load(clicked_img).convert_alpha()
+        self.normal_img = asset_cache.load(normal_img)
+        self.clicked_img = asset_cache.load(clicked_img)
 
         self.image = self.normal_img
         self.rect = self.image.get_rect(center=pos)
         self.font = font
 
         # Render button text
+        global surfaces_created
+        surfaces_created += 1
         self.text_surf = self.font.render(text, True, (0, 0, 0))
         self.text_rect = self.text_surf.get_rect(center=self.rect.center)
         self.clicked = False
+        self.dirty = True  # Needs to be repainted
 
     def update(self):
         # Update button image based on clicked state
-        self.image = self.clicked_img if self.clicked else self.normal_img
+        image = self.clicked_img if self.clicked else self.normal_img
+        if image is not self.image:
+            self.image = image
+            self.dirty = True
         self.text_rect.center = self.rect.center
 
     def handle_event(self, event):
@@ -52,29 +89,33 @@ class Button(pygame.sprite.Sprite):
 
 # LetterButton class for clickable letter tiles
 class LetterButton(pygame.sprite.Sprite):
-    def __init__(self, letter_surface, pos, letter):
+    def __init__(self, letter_sheet, pos, letter):
         super().__init__()
         self.letter = letter
-        self.original_image = letter_surface.copy()
-        self.image = self.original_image.copy()
+        # Views into the sheet's pre-baked atlas, one per tile state
+        self.images = {
+            variant: letter_sheet.get_tile(letter, variant)
+            for variant in ScrabbleLetterSheet.VARIANTS
+        }
+        self.image = self.images["normal"]
         self.rect = self.image.get_rect(center=pos)
         self.clicked = False
         self.disabled = False
         self.alpha = 0  # For fade-in effect
+        self.drawn = None  # (alpha, disabled) last drawn
+        self.dirty = True  # Needs to be repainted
 
     def update(self):
         # Fade in effect for letter button
         if self.alpha < 255:
             self.alpha = min(255, self.alpha + 8)
 
-        # Create image based on state
-        self.image = self.original_image.copy()
-
-        if self.disabled:
-            # Gray out disabled letters
-            self.image.fill((100, 100, 100), special_flags=pygame.BLEND_MULT)
-
-        self.image.set_alpha(self.alpha)
+        # Switch to the baked variant only when the state or alpha changed
+        if self.drawn != (self.alpha, self.disabled):
+            self.drawn = (self.alpha, self.disabled)
+            self.image = self.images["disabled" if self.disabled else "normal"]
+            self.image.set_alpha(self.alpha)
+            self.dirty = True
 
     def handle_event(self, event):
         # Handle mouse events for letter button interaction
@@ -92,18 +133,33 @@ class LetterButton(pygame.sprite.Sprite):
 
 # Loads Scrabble-style letter tiles from a spritesheet
 class ScrabbleLetterSheet:
-    def __init__(self, spritesheet_path):
-        self.spritesheet = pygame.image.load(spritesheet_path).convert_alpha()
-        self.letters = {}
-        self.load_letters_from_scrabble_sheet()
+    # Rows of the atlas, each holding every letter in one state
+    VARIANTS = ("normal", "disabled")
 
-    def load_letters_from_scrabble_sheet(self):
-        """Load letters from the Scrabble-style spritesheet"""
+    def __init__(self, spritesheet_path):
+        # The atlas is cached on disk once baked
+        self.atlas = asset_cache.load(spritesheet_path, "letter-atlas", self.bake_atlas)
+        self.tile_size = (
+            self.atlas.get_width() // len(string.ascii_uppercase),
+            self.atlas.get_height() // len(self.VARIANTS),
+        )
+        self.letters = {
+            letter: self.get_tile(letter) for letter in string.ascii_uppercase
+        }
+
+    @classmethod
+    def bake_atlas(cls, spritesheet_path):
+        """Bake every letter in every state into one atlas surface"""
+        spritesheet = pygame.image.load(spritesheet_path)
         # Assuming your spritesheet has 8 columns and 4 rows (26 letters + 6 empty spaces)
-        tile_width = self.spritesheet.get_width() // 8
-        tile_height = self.spritesheet.get_height() // 4
+        tile_width = spritesheet.get_width() // 8
+        tile_height = spritesheet.get_height() // 4
 
         alphabet = string.ascii_uppercase
+        atlas = pygame.Surface(
+            (tile_width * len(alphabet), tile_height * len(cls.VARIANTS)),
+            pygame.SRCALPHA,
+        )
 
         for i, letter in enumerate(alphabet):
             col = i % 8
@@ -112,13 +168,33 @@ class ScrabbleLetterSheet:
             x = col * tile_width
             y = row * tile_height
 
-            # Extract letter tile from spritesheet
-            letter_surface = pygame.Surface((tile_width, tile_height), pygame.SRCALPHA)
-            letter_surface.blit(
-                self.spritesheet, (0, 0), (x, y, tile_width, tile_height)
-            )
-
-            self.letters[letter] = letter_surface
+            # Copy the letter tile into each variant row of the atlas
+            for v in range(len(cls.VARIANTS)):
+                atlas.blit(
+                    spritesheet,
+                    (i * tile_width, v * tile_height),
+                    (x, y, tile_width, tile_height),
+                )
+
+        # Gray out the disabled row once instead of every frame
+        atlas.fill(
+            (100, 100, 100),
+            (0, tile_height, atlas.get_width(), tile_height),
+            special_flags=pygame.BLEND_MULT,
+        )
+        return atlas
+
+    def get_tile(self, letter, variant="normal"):
+        """Return a new view of a letter's tile in the atlas.
+        Each view has its own alpha, so buttons never copy pixels."""
+        global surfaces_created
+        surfaces_created += 1
+        tile_width, tile_height = self.tile_size
+        i = string.ascii_uppercase.index(letter.upper())
+        v = self.VARIANTS.index(variant)
+        return self.atlas.subsurface(
+            (i * tile_width, v * tile_height, tile_width, tile_height)
+        )
 
     def get_letter(self, letter):
         # Get the surface for a specific letter
@@ -126,52 +202,107 @@ class ScrabbleLetterSheet:
 
 # Loads hangman frames from a spritesheet for animation
 class HangmanSprites:
-    def __init__(self, spritesheet_path):
-        self.spritesheet = pygame.image.load(spritesheet_path).convert_alpha()
-        self.frames = []
-        self.load_hangman_frames()
+    FRAME_COUNT = 8
 
-    def load_hangman_frames(self):
-        """Load hangman frames from spritesheet"""
+    def __init__(self, spritesheet_path):
+        # Frames are stacked in one strip, cached on disk once sliced
+        self.strip = asset_cache.load(
+            spritesheet_path, "hangman-frames", self.bake_frames
+        )
+        frame_width = self.strip.get_width()
+        frame_height = self.strip.get_height() // self.FRAME_COUNT
+        self.frames = [
+            self.strip.subsurface((0, i * frame_height, frame_width, frame_height))
+            for i in range(self.FRAME_COUNT)
+        ]
+
+    @classmethod
+    def bake_frames(cls, spritesheet_path):
+        """Slice the hangman frames out of the spritesheet into a vertical strip"""
+        spritesheet = pygame.image.load(spritesheet_path)
         # Assuming 4 columns, 2 rows for 8 frames
-        frame_width = self.spritesheet.get_width() // 4
-        frame_height = self.spritesheet.get_height() // 2
+        frame_width = spritesheet.get_width() // 4
+        frame_height = spritesheet.get_height() // 2
+        strip = pygame.Surface(
+            (frame_width, frame_height * cls.FRAME_COUNT), pygame.SRCALPHA
+        )
 
-        for i in range(8):
+        for i in range(cls.FRAME_COUNT):
             col = i % 4
             row = i // 4
 
             x = col * frame_width
             y = row * frame_height
 
-            # Extract frame from spritesheet
-            frame_surface = pygame.Surface((frame_width, frame_height), pygame.SRCALPHA)
-            frame_surface.blit(
-                self.spritesheet, (0, 0), (x, y, frame_width, frame_height)
+            # Copy frame from spritesheet into its slot in the strip
+            strip.blit(
+                spritesheet, (0, i * frame_height), (x, y, frame_width, frame_height)
             )
-
-            self.frames.append(frame_surface)
+        return strip
 
     def get_frame(self, mistakes):
         """Get hangman frame based on number of mistakes (0-7)"""
         frame_index = min(mistakes, len(self.frames) - 1)
         return self.frames[frame_index] if self.frames else None
 
-# Draws underscores and revealed letters for the word
-class Underscores: 
-    def __init__(self, word, font) -> None:
-        self.word = word
+# Word line of the current game; a persistent widget that renders each glyph
+# once and only repaints the positions whose letter changed
+class Underscores:
+    def __init__(self, word, font, cache=None) -> None:
         self.font = font
+        self.cache = cache if cache is not None else glyph_cache
         self.spacing = 30  # Space between letters
+        self.word = []  # Letters currently on the line
+        self.rects = []  # Where each letter's glyph sits on the line
+        self.line = None
+        self.update(word)
+
+    def get_rect(self):
+        # Area covered by the word line
+        width = (len(self.word) + 1) * self.spacing
+        height = self.font.get_linesize()
+        return pygame.Rect(350, 600 - height // 2 - 1, width, height + 2)
+
+    def update(self, word):
+        """Bring the line up to date with word; returns True if it changed"""
+        if len(word) != len(self.word) or self.line is None:
+            self.word = [None] * len(word)
+            self.rects = [pygame.Rect(0, 0, 0, 0)] * len(word)
+            global surfaces_created
+            surfaces_created += 1
+            self.line = pygame.Surface(self.get_rect().size, pygame.SRCALPHA)
+        changed = [i for i, letter in enumerate(word) if letter != self.word[i]]
+        if not changed:
+            return False
+        # Clear what the changed positions showed and what they will show,
+        # then repaint the cleared areas from every glyph touching them, in
+        # one blits call. Overlapping areas are merged first so no pixel is
+        # painted twice.
+        top = self.line.get_height() // 2
+        cleared = []
+        for i in changed:
+            self.word[i] = word[i]
+            glyph = self.cache.render(self.font, word[i], (255, 255, 255))
+            rect = glyph.get_rect(center=((i + 1) * self.spacing, top))
+            area = self.rects[i].union(rect) if self.rects[i] else rect.copy()
+            while (j := area.collidelist(cleared)) != -1:
+                area.union_ip(cleared.pop(j))
+            cleared.append(area)
+            self.rects[i] = rect
+        glyphs = []
+        for area in cleared:
+            self.line.fill((0, 0, 0, 0), area)
+            for letter, rect in zip(self.word, self.rects):
+                clip = rect.clip(area)
+                if clip:
+                    glyph = self.cache.render(self.font, letter, (255, 255, 255))
+                    glyphs.append((glyph, clip, clip.move(-rect.x, -rect.y)))
+        self.line.blits(glyphs, doreturn=False)
+        return True
 
     def draw_underscores(self, surface):
         # Draw underscores and revealed letters on the surface
-        i = 1
-        for letter in self.word:
-            text_surface = self.font.render(letter, True, (255, 255, 255))
-            text_rectangle = text_surface.get_rect(center=(350 + i * self.spacing, 600))
-            surface.blit(text_surface, text_rectangle)
-            i += 1
+        surface.blit(self.line, self.get_rect())
 
 # Displays the game over screen
 class GameOverScreen:
@@ -195,4 +326,61 @@ class Countdown:
         self.count_down_text_rect = self.count_down_text.get_rect(center=(300, 300))
     def draw(self, screen):
         # Draw countdown text on the screen
-        screen.blit(self.count_down_text, self.count_down_text_rect)
\ No newline at end of file
+        screen.blit(self.count_down_text, self.count_down_text_rect)
+
+# Shows live frame and game metrics in a box on top of the screen
+class MetricsOverlay:
+    REFRESH_MS = 250  # Text is refreshed four times a second
+
+    def __init__(self, font, pos):
+        self.font = font
+        self.rect = pygame.Rect(pos, (380, 4 * font.get_linesize() + 10))
+        self.visible = False
+        self.refreshed = 0  # pygame ticks when the text was last rendered
+        self.surface = None
+
+    def toggle(self):
+        """Show or hide the overlay; returns the area to repaint."""
+        self.visible = not self.visible
+        self.surface = None
+        return self.rect.copy()
+
+    def lines(self, frame, core):
+        """Text of the overlay from the frame instruments and core metrics."""
+        averages = frame.averages
+        total = sum(averages.values())
+        lines = [
+            f"frame {total * 1000:.2f} ms",
+            "update {:.2f}  draw {:.2f}  flip {:.2f} ms".format(
+                *(averages[phase] * 1000 for phase in frame.PHASES)
+            ),
+            f"surfaces/frame {frame.average_surfaces:.1f}",
+        ]
+        if core is not None:
+            lines.append(
+                f"guesses {core.guesses.value}  "
+                f"timeouts {core.timer_expiries.value}  "
+                f"sessions {core.active_sessions.value}"
+            )
+        return lines
+
+    def draw(self, surface, frame, core, force=False):
+        """Draw the overlay when due or forced; returns the rect drawn, or None."""
+        now = pygame.time.get_ticks()
+        if self.surface is None or now - self.refreshed >= self.REFRESH_MS:
+            self.refreshed = now
+            lines = self.lines(frame, core)
+            # The overlay's own surfaces count towards surfaces per frame
+            global surfaces_created
+            surfaces_created += 1 + len(lines)
+            self.surface = pygame.Surface(self.rect.size)
+            self.surface.fill((0, 0, 0))
+            y = 5
+            for line in lines:
+                text = self.font.render(line, True, (120, 255, 120))
+                self.surface.blit(text, (5, y))
+                y += self.font.get_linesize()
+        elif not force:
+            return None
+        surface.blit(self.surface, self.rect)
+        return self.rect.copy()
@@ -1,161 +1,508 @@
 import random
-import threading
+import sys
 import time
+import types
+
+import wordlist
+from scheduler import TimerScheduler
 
 # Lists to store words and phrases for the game
+WORDS_PATH = "./datasets/cleaned_data.txt"
+PHRASES_PATH = "./datasets/phrases.txt"
 words = []
 phrases = []
 
+# Difficulty indexes of the datasets, loaded on first use
+indexes = {}
+
 # Game states
 MENU = "menu"
 GAME = "game"
 GAMEOVER = "gameover"
 
-# Game variables
-life_remaining = 6
-guessed_letters = []
-wrong_letters = []
-mistakes = 0
-current_word = ""
-word_state = []
-timeout = 0
+# Number of lives a new game starts with
+MAX_LIVES = 6
+
+# Seconds a player has for each guess
+TURN_SECONDS = 15
+
+# One scheduler thread tracks the turn timers of every session
+timers = TimerScheduler()
+
+# metrics.CoreInstruments while instrumentation is enabled (metrics.enable)
+instruments = None
+
+# pool.SessionPool handing out ready-made games while one is started
+pool = None
+
+# corpus.CorpusSource streaming the words or phrases from a large corpus in
+# place of the dataset, while one is started
+word_source = None
+phrase_source = None
 
-timer = None
 
+class HangmanSession:
+    """
+    Holds the state of a single hangman game.
+    Many sessions can live in one process, each with its own word and timer.
+    Sessions given scheduler.NO_TIMERS run headless, without a turn timer.
+    Sessions given an eventlog.EventLog record every event to it.
+    Words are drawn from the session's rng, the global random module unless
+    a seeded stream is given (see session_rng).
+    """
 
-def setup(mode):
+    __slots__ = (
+        "session_id",
+        "mode",
+        "_current_word",
+        "_word_state",
+        "_guessed_letters",
+        "guessed",
+        "positions",
+        "remaining",
+        "wrong_letters",
+        "mistakes",
+        "life_remaining",
+        "deadline",
+        "started",
+        "scheduler",
+        "log",
+        "rng",
+    )
+
+    def __init__(self, session_id=None, scheduler=None, log=None, rng=None):
+        self.session_id = session_id
+        self.mode = None
+        self.deadline = None
+        self.scheduler = scheduler if scheduler is not None else timers
+        self.rng = rng if rng is not None else random
+        self.log = None
+        self.wrong_letters = []
+        self.game_over()
+        self.log = log
+
+    def setup(self, mode, difficulty=None, length=None, distinct=None):
+        """
+        Initializes the game based on the selected mode.
+        Sets up the timer and chooses a word or phrase,
+        optionally of a given difficulty ("easy", "medium" or "hard"),
+        length and number of distinct letters (see choose_entry).
+        """
+        self.mode = mode
+        self.started = time.monotonic()
+        self.start_timer(TURN_SECONDS)
+
+        # Seeded sessions draw their own words, so they never take from the pool
+        template = None
+        targets = (difficulty, length, distinct)
+        if pool is not None and targets == (None, None, None) and self.rng is random:
+            template = pool.claim(mode)
+        if template is not None:
+            # A pooled game comes with its word already indexed
+            self._current_word, self.positions, self.word_state = template
+        # Choosing the word also builds word_state and the letter index
+        elif mode == "basic":
+            self.current_word = choose_word(*targets, rng=self.rng)
+        elif mode == "intermediate":
+            self.current_word = choose_phrase(*targets, rng=self.rng)
+        if self.log is not None:
+            self.log.setup(self)
+
+    @property
+    def current_word(self):
+        return self._current_word
+
+    @current_word.setter
+    def current_word(self, word):
+        """
+        Sets the word to guess, indexes the positions of each letter
+        and initializes word_state with underscores.
+        """
+        self._current_word = word
+        self.positions, self.word_state = index_word(word)
+
+    @property
+    def word_state(self):
+        return self._word_state
+
+    @word_state.setter
+    def word_state(self, word_state):
+        self._word_state = word_state
+        self.remaining = word_state.count("_")
+
+    @property
+    def guessed_letters(self):
+        return self._guessed_letters
+
+    @guessed_letters.setter
+    def guessed_letters(self, guessed_letters):
+        self._guessed_letters = guessed_letters
+        self.guessed = set(guessed_letters)
+
+    def guess_letters(self, letter):
+        """
+        Handles guessing a letter.
+        Reveals only the positions the letter occupies and reduces
+        life remaining on a miss. Resets the timer on each guess.
+        """
+        started = time.perf_counter() if instruments is not None else None
+        self.reset_timer(TURN_SECONDS)
+        if self.log is not None:
+            self.log.guess(self, letter)
+
+        self._guessed_letters.append(letter)
+
+        matches = self.positions.get(letter)
+        if matches is None:
+            # If guessed letter is not in the word, reduce life
+            self.life_remaining -= 1
+            if letter not in self.guessed:
+                self.wrong_letters.append(letter)
+        else:
+            word_state = self._word_state
+            for i in matches:
+                if word_state[i] == "_":
+                    word_state[i] = letter
+                    self.remaining -= 1
+        self.guessed.add(letter)
+        if started is not None:
+            instruments.guessed(time.perf_counter() - started)
+
+    def is_won(self):
+        """
+        Returns True once every letter of the word has been revealed.
+        """
+        return self.remaining == 0
+
+    def reduce_life(self):
+        """
+        Reduces the player's remaining lives by one.
+        """
+        self.life_remaining -= 1
+
+    def start_timer(self, seconds):
+        """
+        Starts the countdown timer for the game.
+        Replaces any deadline the session already had.
+        """
+        self.scheduler.schedule(self, seconds)
+
+    def countdown(self):
+        """
+        Called by the scheduler when the deadline passes.
+        Reduces life because time ran out.
+        """
+        if self.log is not None:
+            self.log.timeout(self)
+        if instruments is not None:
+            instruments.timer_expiries.inc()
+        self.reduce_life()
+
+    @property
+    def timeout(self):
+        """
+        Whole seconds left before the current turn runs out.
+        """
+        return self.scheduler.remaining(self)
+
+    def reset_timer(self, seconds):
+        """
+        Resets the countdown timer to the specified number of seconds.
+        """
+        self.start_timer(seconds)
+
+    def stop_timer(self):
+        """
+        Cancels the running countdown, if any.
+        """
+        self.scheduler.cancel(self)
+
+    def game_over(self):
+        """
+        Resets all game variables to their initial state.
+        """
+        self.stop_timer()
+        if self.log is not None:
+            self.log.game_over(self)
+        self.started = None
+        self.guessed_letters = []
+        self.wrong_letters = []
+        self.mistakes = 0
+        self.current_word = ""
+        self.word_state = []
+        self.life_remaining = MAX_LIVES
+
+
+class SessionManager:
     """
-    Initializes the game based on the selected mode.
-    Sets up the timer and chooses a word or phrase.
+    Keeps track of every live session in the process, keyed by session id.
     """
-    global current_word
-    global word_state
 
-    start_timer(15)
+    # Sessions open in all managers of the process
+    open_sessions = 0
+
+    def __init__(self, scheduler=None, log=None, seed=None):
+        self.sessions = {}
+        self.scheduler = scheduler
+        self.log = log
+        self.seed = seed
+        self._next_id = 0
+
+    def create(self, mode=None, session_id=None):
+        """
+        Creates a new session and, if a mode is given, starts a game in it.
+        A session_id chosen by the caller is used if it is not taken yet.
+        """
+        if session_id is None or session_id in self.sessions:
+            self._next_id += 1
+            session_id = self._next_id
+        elif isinstance(session_id, int):
+            self._next_id = max(self._next_id, session_id)
+        rng = None if self.seed is None else session_rng(self.seed, session_id)
+        session = HangmanSession(session_id, self.scheduler, self.log, rng)
+        self.sessions[session.session_id] = session
+        SessionManager.open_sessions += 1
+        if instruments is not None:
+            instruments.active_sessions.set(SessionManager.open_sessions)
+        if mode is not None:
+            session.setup(mode)
+        return session
+
+    def get(self, session_id):
+        """
+        Returns the session with the given id, or None if it does not exist.
+        """
+        return self.sessions.get(session_id)
+
+    def close(self, session_id):
+        """
+        Stops the session's timer and forgets about it.
+        """
+        session = self.discard(session_id)
+        if session is not None:
+            session.game_over()
+            if self.log is not None:
+                self.log.closed(session)
+        return session
+
+    def discard(self, session_id):
+        """
+        Forgets a session without ending its game or logging anything.
+        """
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            SessionManager.open_sessions -= 1
+            if instruments is not None:
+                instruments.active_sessions.set(SessionManager.open_sessions)
+        return session
+
+    def snapshot(self):
+        """
+        Snapshots every session to the event log, if there is one.
+        """
+        if self.log is not None:
+            self.log.snapshot(self.sessions.values())
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self.sessions
+
+    def __iter__(self):
+        return iter(self.sessions.values())
+
+
+def session_rng(seed, session_id):
+    """
+    Returns the random stream of a session in a seeded run. Each session
+    gets its own stream, so its words do not depend on how the games of
+    other sessions interleave with it.
+    """
+    return random.Random(f"{seed}:{session_id}")
 
-    if mode == "basic":
-        current_word = choose_word()
-    elif mode == "intermediate":
-        current_word = choose_phrase()
-    print(current_word)
 
-    # Initialize word_state with underscores
-    if word_state == []:
-        for i in current_word:
-            if i == " ":
-                word_state.append(" ")
-            else:
-                word_state.append("_")
+def index_word(word):
+    """
+    Returns (positions, word_state) for a new game on word: the positions
+    of each letter and the masked state with only the spaces revealed.
+    """
+    positions = {}
+    word_state = []
+    for i, letter in enumerate(word.upper()):
+        if letter == " ":
+            word_state.append(" ")
+        else:
+            word_state.append("_")
+            positions.setdefault(letter, []).append(i)
+    return positions, word_state
 
 
-def choose_word() -> str:
+def choose_word(difficulty=None, length=None, distinct=None, rng=None) -> str:
     """
     Chooses a random word from the dataset.
     Loads words from file if not already loaded.
+    A corpus word source, when started, is used instead (without targets).
     """
-    if words == []:
-        with open("./datasets/cleaned_data.txt", "r") as f:
-            for data in f:
-                words.append(data.strip())
-    random_number = random.randrange(0, len(words))
-    return words[random_number]
+    if word_source is not None:
+        return word_source.choose(rng)
+    return choose_entry(load_words(), WORDS_PATH, difficulty, length, distinct, rng)
 
 
-def choose_phrase() -> str:
+def choose_phrase(difficulty=None, length=None, distinct=None, rng=None) -> str:
     """
     Chooses a random phrase from the dataset.
     Loads phrases from file if not already loaded.
+    A corpus phrase source, when started, is used instead (without targets).
     """
-    if phrases == []:
-        with open("./datasets/phrases.txt", "r") as f:
-            for data in f:
-                phrases.append(data.strip())
-    random_number = random.randrange(0, len(phrases))
-    return phrases[random_number]
+    if phrase_source is not None:
+        return phrase_source.choose(rng)
+    return choose_entry(
+        load_phrases(), PHRASES_PATH, difficulty, length, distinct, rng
+    )
 
 
-def guess_letters(letter):
+def load_words():
     """
-    Handles guessing a letter.
-    Updates guessed letters, word state, and life remaining.
-    Resets the timer on each guess.
+    Returns the word list, loading it from file if not already loaded.
     """
-    global word_state
-    global guessed_letters
-    global life_remaining
+    global words
+    if instruments is not None:
+        instruments.dataset("words", bool(words))
+    if not words:
+        words = wordlist.load(WORDS_PATH)
+    return words
 
-    reset_timer(15)
 
-    word_state = []
+def load_phrases():
+    """
+    Returns the phrase list, loading it from file if not already loaded.
+    """
+    global phrases
+    if instruments is not None:
+        instruments.dataset("phrases", bool(phrases))
+    if not phrases:
+        phrases = wordlist.load(PHRASES_PATH)
+    return phrases
 
-    guessed_letters.append(letter)
 
-    # If guessed letter is not in the word, reduce life
-    if letter not in current_word.upper():
-        life_remaining -= 1
+def choose_entry(
+    entries, path, difficulty=None, length=None, distinct=None, rng=None
+):
+    """
+    Chooses a random entry, sampling from the dataset's difficulty index
+    when a difficulty or length is given; distinct (the number of distinct
+    letters) narrows a length. Falls back to a uniform pick when the
+    index is missing or stale, or has no entry of that bucket.
+    Draws from rng, or the global random module if none is given.
+    """
+    if rng is None:
+        rng = random
+    if difficulty is not None or length is not None:
+        # Imported on first use; games without a difficulty never need it
+        import word_index
+
+        if path not in indexes:
+            indexes[path] = word_index.load(path)
+        index = indexes[path]
+        if index is not None:
+            position = index.sample(difficulty, length, distinct, rng)
+            if position is not None and position < len(entries):
+                return entries[position]
+    random_number = rng.randrange(0, len(entries))
+    return entries[random_number]
 
-    # Update word_state with guessed letters
-    for i in current_word.upper():
-        if i in guessed_letters:
-            word_state.append(i)
-        elif i == " ":
-            word_state.append(" ")
-        else:
-            word_state.append("_")
+
+# The single-player frontend and the tests drive one default session through
+# the module-level functions and attributes below.
+session = HangmanSession()
+
+
+def setup(mode, difficulty=None, length=None, distinct=None):
+    """
+    Initializes the default session based on the selected mode.
+    """
+    session.setup(mode, difficulty, length, distinct)
+    print(session.current_word)
+
+
+def guess_letters(letter):
+    """
+    Guesses a letter in the default session.
+    """
+    session.guess_letters(letter)
 
 
 def reduce_life():
     """
-    Reduces the player's remaining lives by one.
+    Reduces the default session's remaining lives by one.
     """
-    global life_remaining
-    life_remaining -= 1
+    session.reduce_life()
 
 
 def start_timer(seconds):
     """
-    Starts the countdown timer for the game.
-    Cancels any existing timer before starting a new one.
+    Starts the countdown timer of the default session.
     """
-    global timer, timeout
-
-    if timer:
-        timer.cancel()
-    timeout = seconds
-    countdown()
+    session.start_timer(seconds)
 
 
 def countdown():
     """
-    Handles the countdown logic.
-    Reduces timeout every second and reduces life when time runs out.
+    Handles the default session's timer running out.
     """
-    global timer, timeout
+    session.countdown()
 
-    timeout -= 1
-    if timeout >= 1:
-        timer = threading.Timer(1.0, countdown)
-        timer.start()
-    else:
-        reduce_life()
+
+def is_won():
+    """
+    Returns True once the default session's word is fully revealed.
+    """
+    return session.is_won()
 
 
 def game_over():
     """
-    Resets all game variables to their initial state.
+    Resets the default session to its initial state.
     """
-    global timeout, guessed_letters, mistakes, current_word, word_state, life_remaining
-
-    timeout = 0
-    guessed_letters = []
-    mistakes = 0
-    current_word = ""
-    word_state = []
-    life_remaining = 6
+    session.game_over()
 
 
 def reset_timer(seconds):
     """
-    Resets the countdown timer to the specified number of seconds.
+    Resets the default session's countdown timer.
     """
-    start_timer(seconds)
+    session.reset_timer(seconds)
+
+
+# Game variables: module attributes such as core.word_state read and write
+# the matching attribute of the default session.
+_SESSION_ATTRIBUTES = (
+    "life_remaining",
+    "guessed_letters",
+    "wrong_letters",
+    "mistakes",
+    "current_word",
+    "word_state",
+    "timeout",
+)
+
+
+def _session_property(name):
+    def getter(module):
+        return getattr(module.session, name)
+
+    def setter(module, value):
+        setattr(module.session, name, value)
+
+    return property(getter, setter)
+
+
+class _CoreModule(types.ModuleType):
+    pass
+
+
+for _name in _SESSION_ATTRIBUTES:
+    setattr(_CoreModule, _name, _session_property(_name))
+
+sys.modules[__name__].__class__ = _CoreModule
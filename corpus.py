@@ -0,0 +1,225 @@
+"""
+Streaming word and phrase source for corpora too large to load.
+
+A CorpusSource reads a text corpus line by line through a large read
+buffer and passes each line through the filters of a build_datasets
+target (cleaned_data's, letters only, by default). It keeps a uniform
+sample of K of the entries that pass, using reservoir sampling: Li's
+Algorithm L, which draws random numbers only for the entries it takes.
+Each pass over the corpus produces one batch of K candidates. Memory holds
+at most three batches (the one being handed out, a copy of it and the one
+being sampled) and the read buffer, however large the corpus is.
+
+Duplicates cannot be dropped across the whole corpus without remembering
+every entry. Instead an entry is skipped when an equal one (ignoring case)
+is already in the reservoir, so a batch never holds the same entry twice.
+
+While a source is installed with start(), core.choose_word (or
+choose_phrase) takes its entries from it instead of the dataset. The
+first batch is sampled by start(). Once the current batch drops to the low
+watermark the next pass starts on a background thread, and its batch
+replaces the current one when it is done. choose() never waits for a
+pass: if the current batch runs out first, entries are drawn again from
+a copy of it until the new batch is in.
+
+Usage: python corpus.py CORPUS [--sample 1000] [--min-length 8]
+"""
+
+import argparse
+import math
+import random
+import threading
+import time
+
+import build_datasets
+import core
+
+SAMPLE_SIZE = 1000
+
+# Read buffer of the corpus file
+BUFFER_SIZE = 1 << 20
+
+# Filters for lines used as basic mode words: cleaned_data's, letters only,
+# since the letter buttons could never reveal anything else
+WORDS = dict(build_datasets.TARGETS["cleaned_data"], charset="A-Za-z")
+
+# Filters for lines used as intermediate mode phrases: letters and spaces,
+# long enough to be a phrase and short enough to fit on screen
+PHRASES = {"min_length": 8, "max_length": 16, "charset": "A-Za-z "}
+
+
+def reservoir_sample(entries, k, rng=random):
+    """
+    Returns a uniform sample of up to k distinct entries (ignoring case)
+    of an iterable of any length, in one pass.
+    """
+    sample = []
+    keys = {}  # casefolded entry -> its slot in sample
+    entries = iter(entries)
+    for entry in entries:
+        key = entry.casefold()
+        if key not in keys:
+            keys[key] = len(sample)
+            sample.append(entry)
+            if len(sample) == k:
+                break
+    if len(sample) < k:
+        return sample
+
+    # Algorithm L: skip ahead geometrically instead of drawing per entry
+    weight = math.exp(math.log(rng.random()) / k)
+    skip = math.floor(math.log(rng.random()) / math.log(1 - weight))
+    for entry in entries:
+        if skip:
+            skip -= 1
+            continue
+        key = entry.casefold()
+        if key not in keys:
+            slot = rng.randrange(k)
+            del keys[sample[slot].casefold()]
+            keys[key] = slot
+            sample[slot] = entry
+        weight *= math.exp(math.log(rng.random()) / k)
+        skip = math.floor(math.log(rng.random()) / math.log(1 - weight))
+    return sample
+
+
+class CorpusSource:
+    """
+    Hands out entries of a corpus, K sampled candidates per pass.
+    """
+
+    def __init__(
+        self, path, k=SAMPLE_SIZE, settings=None, seed=None, low_watermark=None
+    ):
+        self.path = path
+        self.k = k
+        self.low_watermark = low_watermark if low_watermark is not None else k // 4
+        config = WORDS if settings is None else settings
+        self.settings = dict(build_datasets.DEFAULTS, **config)
+        # Duplicates are dropped inside the reservoir instead
+        self.settings["dedupe"] = False
+        self.rng = random.Random(seed)
+        self.batch = []
+        self.previous = []  # the current batch as it was handed over
+        self.passes = 0
+        self.pass_seconds = 0.0
+        self._next = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """
+        Runs one pass over the corpus; returns its batch of candidates.
+        """
+        started = time.perf_counter()
+        entries = build_datasets.read_entries(
+            self.path, buffer_size=BUFFER_SIZE, errors="replace"
+        )
+        entries = build_datasets.filter_entries(entries, self.settings)
+        batch = reservoir_sample(entries, self.k, self.rng)
+        self.pass_seconds = time.perf_counter() - started
+        self.passes += 1
+        return batch
+
+    def start(self):
+        """
+        Samples the first batch.
+        """
+        batch = self.sample()
+        if not batch:
+            raise ValueError(f"no entry of {self.path} passes the filters")
+        with self._lock:
+            self._use(batch)
+        return self
+
+    def stop(self):
+        """
+        Waits for a pass still running in the background.
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def choose(self, rng=None):
+        """
+        Returns a random candidate of the current batch, removing it.
+        Never waits for the corpus to be read.
+        """
+        if rng is None:
+            rng = random
+        with self._lock:
+            if self._next is not None:
+                self._use(self._next)
+                self._next = None
+            if len(self.batch) <= self.low_watermark and self._thread is None:
+                self._prefetch()
+            batch = self.batch
+            if not batch:
+                # Used up before the next pass is done: draw from its copy
+                return self.previous[rng.randrange(len(self.previous))]
+            i = rng.randrange(len(batch))
+            batch[i], batch[-1] = batch[-1], batch[i]
+            return batch.pop()
+
+    def _use(self, batch):
+        # Called with the lock held
+        self.batch = batch
+        self.previous = list(batch)
+
+    def _prefetch(self):
+        # Called with the lock held
+        def run():
+            batch = self.sample()
+            with self._lock:
+                # An empty pass keeps the batch in use
+                if batch:
+                    self._next = batch
+                self._thread = None
+
+        self._thread = threading.Thread(target=run, name="hangman-corpus", daemon=True)
+        self._thread.start()
+
+
+def start(path, mode="basic", k=SAMPLE_SIZE, settings=None):
+    """
+    Installs a source for the words ("basic") or phrases ("intermediate")
+    of core; returns it.
+    """
+    source = CorpusSource(path, k, settings).start()
+    stop(mode)
+    if mode == "basic":
+        core.word_source = source
+    else:
+        core.phrase_source = source
+    return source
+
+
+def stop(mode="basic"):
+    """
+    Uninstalls the source of a mode, if any.
+    """
+    name = "word_source" if mode == "basic" else "phrase_source"
+    source = getattr(core, name)
+    if source is not None:
+        source.stop()
+        setattr(core, name, None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sample entries from a corpus.")
+    parser.add_argument("corpus")
+    parser.add_argument("--sample", type=int, default=20)
+    parser.add_argument("--min-length", type=int)
+    parser.add_argument("--max-length", type=int)
+    parser.add_argument("--charset", help='regex class, e.g. "A-Za-z "')
+    args = parser.parse_args()
+
+    settings = dict(WORDS)
+    for name in ("min_length", "max_length", "charset"):
+        if getattr(args, name) is not None:
+            settings[name] = getattr(args, name)
+    source = CorpusSource(args.corpus, args.sample, settings)
+    for entry in source.sample():
+        print(entry)
+    print(f"sampled in {source.pass_seconds:.2f}s")
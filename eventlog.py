@@ -0,0 +1,361 @@
+"""
+Append-only event log and snapshots of game sessions.
+
+Every session event is encoded as a small binary record:
+
+    frame    <HI   body length, CRC-32 of the body
+    body     B     event type (SETUP, GUESS, TIMEOUT, GAME_OVER, CLOSED)
+             ...   session id: B 0 + <q integer, or B 1 + text
+             ...   SETUP: mode and word, as texts
+                   GUESS: the letter as one ASCII byte
+
+where a text is <H length + UTF-8.
+
+Records are queued in memory by the thread playing the session and written
+by a background thread, which batches everything queued since its last
+pass into one write and one fsync (group commit, see groupcommit.py), so
+guessing never waits for the disk. A write that fails is logged and its
+records dropped; the next sync() raises the error.
+
+The log is split into numbered segment files in one directory. Taking a
+snapshot writes the state of every session to snapshot.bin, starts a new
+segment and deletes the older ones, so recovery loads the snapshot and only
+replays the segments written after it. A record torn by a crash fails its
+CRC and ends the replay of its segment.
+"""
+
+import glob
+import os
+import re
+import struct
+import zlib
+
+from groupcommit import GroupCommitQueue
+from scheduler import NO_TIMERS
+
+SETUP = 1
+GUESS = 2
+TIMEOUT = 3
+GAME_OVER = 4
+CLOSED = 5
+
+FRAME = struct.Struct("<HI")
+SESSION_INT = struct.Struct("<Bq")
+TEXT_LENGTH = struct.Struct("<H")
+
+SNAPSHOT_MAGIC = b"HMSN"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sHHQI")  # magic, version, pad, segment, count
+SNAPSHOT_LIVES = struct.Struct("<hh")  # mistakes, life_remaining
+SNAPSHOT_NAME = "snapshot.bin"
+
+SEGMENT_PATTERN = re.compile(r"events-(\d{8})\.log$")
+
+# Seconds between background flushes; records queued in that window share
+# one write and one fsync
+FLUSH_INTERVAL = 0.01
+
+
+def segment_path(directory, number):
+    return os.path.join(directory, f"events-{number:08d}.log")
+
+
+def segments(directory):
+    """
+    Returns the (number, path) of every log segment in order.
+    """
+    found = []
+    for path in glob.glob(os.path.join(directory, "events-*.log")):
+        match = SEGMENT_PATTERN.search(path)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def pack_text(text):
+    data = text.encode("utf-8")
+    return TEXT_LENGTH.pack(len(data)) + data
+
+
+def unpack_text(data, offset):
+    (length,) = TEXT_LENGTH.unpack_from(data, offset)
+    start = offset + TEXT_LENGTH.size
+    return data[start : start + length].decode("utf-8"), start + length
+
+
+def pack_session_id(session_id):
+    if isinstance(session_id, int):
+        return SESSION_INT.pack(0, session_id)
+    return b"\x01" + pack_text(str(session_id))
+
+
+def unpack_session_id(data, offset):
+    if data[offset] == 0:
+        return SESSION_INT.unpack_from(data, offset)[1], offset + SESSION_INT.size
+    return unpack_text(data, offset + 1)
+
+
+def frame(body):
+    return FRAME.pack(len(body), zlib.crc32(body)) + body
+
+
+def read_records(data):
+    """
+    Yields the body of each intact record, stopping at the first torn one.
+    """
+    offset = 0
+    while offset + FRAME.size <= len(data):
+        length, crc = FRAME.unpack_from(data, offset)
+        start = offset + FRAME.size
+        body = data[start : start + length]
+        if len(body) != length or zlib.crc32(body) != crc:
+            return
+        yield body
+        offset = start + length
+
+
+def pack_state(session):
+    """
+    Encodes everything needed to restore a session.
+    """
+    return b"".join(
+        (
+            pack_session_id(session.session_id),
+            pack_text(session.mode or ""),
+            pack_text(session.current_word),
+            pack_text("".join(session.word_state)),
+            pack_text("".join(session.guessed_letters)),
+            pack_text("".join(session.wrong_letters)),
+            SNAPSHOT_LIVES.pack(session.mistakes, session.life_remaining),
+        )
+    )
+
+
+def unpack_state(session, data, offset):
+    """
+    Restores a session from pack_state data; returns the next offset.
+    """
+    mode, offset = unpack_text(data, offset)
+    word, offset = unpack_text(data, offset)
+    word_state, offset = unpack_text(data, offset)
+    guessed, offset = unpack_text(data, offset)
+    wrong, offset = unpack_text(data, offset)
+    session.mistakes, session.life_remaining = SNAPSHOT_LIVES.unpack_from(
+        data, offset
+    )
+    session.mode = mode or None
+    session.current_word = word
+    session.word_state = list(word_state)
+    session.guessed_letters = list(guessed)
+    session.wrong_letters = list(wrong)
+    return offset + SNAPSHOT_LIVES.size
+
+
+class EventLog:
+    """
+    Writer of the event log of one directory. The session methods only
+    queue a record; a background thread writes and fsyncs the queue.
+    """
+
+    def __init__(self, directory, flush_interval=FLUSH_INTERVAL):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        existing = segments(directory)
+        # Never append to a segment a crash may have left torn
+        self.segment = existing[-1][0] + 1 if existing else 1
+        self._file = open(segment_path(directory, self.segment), "ab")
+        self._queue = GroupCommitQueue(self._write_batch, flush_interval, __name__)
+
+    # Session events, called by core.HangmanSession and SessionManager
+
+    def setup(self, session):
+        self._queue.append(
+            frame(
+                bytes((SETUP,))
+                + pack_session_id(session.session_id)
+                + pack_text(session.mode)
+                + pack_text(session.current_word)
+            )
+        )
+
+    def guess(self, session, letter):
+        self._queue.append(
+            frame(
+                bytes((GUESS,))
+                + pack_session_id(session.session_id)
+                + letter.encode("ascii")
+            )
+        )
+
+    def timeout(self, session):
+        self._queue.append(
+            frame(bytes((TIMEOUT,)) + pack_session_id(session.session_id))
+        )
+
+    def game_over(self, session):
+        self._queue.append(
+            frame(bytes((GAME_OVER,)) + pack_session_id(session.session_id))
+        )
+
+    def closed(self, session):
+        self._queue.append(
+            frame(bytes((CLOSED,)) + pack_session_id(session.session_id))
+        )
+
+    def snapshot(self, sessions):
+        """
+        Queues a snapshot of sessions. Must be called on the thread playing
+        them, so the state matches the records queued before it.
+        """
+        states = [pack_state(session) for session in sessions]
+        self._queue.append(("snapshot", states))
+        self._queue.wake()
+
+    def sync(self):
+        """
+        Blocks until every record queued so far is on disk. Raises the
+        error of a write that failed since the last sync.
+        """
+        self._queue.sync()
+
+    def close(self):
+        """
+        Flushes the queue and stops the background thread.
+        """
+        if self._queue.closed:
+            return
+        self._queue.close()
+        self._file.close()
+
+    # Background thread
+
+    def _write_batch(self, items):
+        try:
+            chunk = []
+            for item in items:
+                if isinstance(item, bytes):
+                    chunk.append(item)
+                else:
+                    self._write(chunk)
+                    chunk = []
+                    self._write_snapshot(item[1])
+            self._write(chunk)
+        except OSError:
+            # The failed write may have left a torn record, which would end
+            # the replay of its segment; later records go to a new one
+            self._next_segment()
+            raise
+
+    def _next_segment(self):
+        self._file.close()
+        self.segment += 1
+        self._file = open(segment_path(self.directory, self.segment), "ab")
+
+    def _write(self, chunk):
+        if chunk:
+            self._file.write(b"".join(chunk))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _write_snapshot(self, states):
+        # Later records go to a new segment, which the snapshot points at
+        self._next_segment()
+
+        path = os.path.join(self.directory, SNAPSHOT_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                SNAPSHOT_HEADER.pack(
+                    SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, self.segment, len(states)
+                )
+            )
+            f.write(b"".join(states))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        directory = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+        for number, old_path in segments(self.directory):
+            if number < self.segment:
+                os.unlink(old_path)
+
+
+def read_snapshot(directory):
+    """
+    Returns (first segment to replay, snapshot data, offset of its first
+    session), or (0, b"", 0) without a valid snapshot.
+    """
+    try:
+        with open(os.path.join(directory, SNAPSHOT_NAME), "rb") as f:
+            data = f.read()
+    except OSError:
+        return 0, b"", 0
+    if len(data) < SNAPSHOT_HEADER.size:
+        return 0, b"", 0
+    magic, version, _, segment, _ = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        return 0, b"", 0
+    return segment, data, SNAPSHOT_HEADER.size
+
+
+def recover(directory, manager):
+    """
+    Rebuilds the sessions of a directory's snapshot and log into a
+    core.SessionManager. Replayed sessions run without timers and are not
+    logged again; their timers are left stopped.
+    Returns the number of log records replayed.
+    """
+    restored = {}  # session id -> (session, the scheduler it was created with)
+
+    def session_for(session_id):
+        entry = restored.get(session_id)
+        if entry is None:
+            session = manager.create(session_id=session_id)
+            entry = restored[session_id] = (session, session.scheduler)
+            session.scheduler = NO_TIMERS
+            session.log = None
+        return entry[0]
+
+    segment, data, offset = read_snapshot(directory)
+    if data:
+        _, _, _, _, count = SNAPSHOT_HEADER.unpack_from(data)
+        for _ in range(count):
+            session_id, offset = unpack_session_id(data, offset)
+            offset = unpack_state(session_for(session_id), data, offset)
+
+    replayed = 0
+    for number, path in segments(directory):
+        if number < segment:
+            continue
+        with open(path, "rb") as f:
+            log = f.read()
+        for body in read_records(log):
+            replayed += 1
+            session_id, offset = unpack_session_id(body, 1)
+            event = body[0]
+            if event == CLOSED:
+                if session_id in restored:
+                    manager.discard(session_id)
+                    del restored[session_id]
+                continue
+            session = session_for(session_id)
+            if event == SETUP:
+                mode, offset = unpack_text(body, offset)
+                session.mode = mode
+                session.current_word, _ = unpack_text(body, offset)
+            elif event == GUESS:
+                session.guess_letters(chr(body[offset]))
+            elif event == TIMEOUT:
+                session.reduce_life()
+            elif event == GAME_OVER:
+                session.game_over()
+
+    for session, scheduler in restored.values():
+        session.scheduler = scheduler
+        session.log = manager.log
+    return replayed
@@ -0,0 +1,94 @@
+"""
+Queue drained by a background writer in batches (group commit).
+
+Producers append items and return at once. A background thread wakes every
+flush_interval, or as soon as wake() is called, takes everything queued
+since its last pass and hands it to write() as one list, so a burst of
+items costs one write (and one fsync or commit). Used by the event log and
+the statistics store.
+
+An exception raised by write() is logged and its batch dropped; the thread
+keeps running, and the next sync() raises it.
+"""
+
+import collections
+import logging
+import threading
+
+
+class GroupCommitQueue:
+    """
+    Items appended are passed to write(items) on a background thread.
+    Errors are logged to the logger called name.
+    """
+
+    def __init__(self, write, flush_interval, name):
+        self.write = write
+        self.flush_interval = flush_interval
+        self.closed = False
+        self._log = logging.getLogger(name)
+        self._items = collections.deque()
+        self._wake = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def append(self, item):
+        self._items.append(item)
+
+    def wake(self):
+        """
+        Starts a pass now instead of at the next interval.
+        """
+        self._wake.set()
+
+    def sync(self):
+        """
+        Blocks until every item queued so far is written. Raises the error
+        of a write that failed since the last sync.
+        """
+        done = threading.Event()
+        self._items.append(done)
+        self._wake.set()
+        done.wait()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        """
+        Writes the queue and stops the background thread.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+            if self.closed:
+                self._flush()
+                return
+
+    def _flush(self):
+        batch = []
+        waiters = []
+        items = self._items
+        while items:
+            item = items.popleft()
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            else:
+                batch.append(item)
+        if batch:
+            try:
+                self.write(batch)
+            except Exception as error:
+                self._log.exception("dropped %d queued items", len(batch))
+                self._error = error
+        for waiter in waiters:
+            waiter.set()
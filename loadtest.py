@@ -0,0 +1,103 @@
+"""
+Loopback load test for server.py.
+
+Opens many client connections at once; each plays games by guessing letters
+in English frequency order, and the run reports requests per second and
+round-trip latency percentiles.
+
+Usage: python loadtest.py --clients 1000 --games 5 [--port 8765]
+       python loadtest.py --clients 1000 --local   (starts its own server)
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import server
+import simulate
+
+
+async def play_client(host, port, games, mode, latencies):
+    """
+    Connects one client and plays games; returns (wins, requests sent).
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    wins = 0
+    requests = 0
+
+    async def request(message):
+        nonlocal requests
+        requests += 1
+        started = time.perf_counter()
+        writer.write(json.dumps(message).encode() + b"\n")
+        reply = json.loads(await reader.readline())
+        # Timer expiries are pushed unprompted; skip them
+        while reply.get("event") == "timeout":
+            reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - started)
+        return reply
+
+    try:
+        for _ in range(games):
+            state = await request({"op": "new", "mode": mode})
+            order = iter(simulate.FREQUENCY_ORDER)
+            while state.get("status") == "playing":
+                state = await request({"op": "guess", "letter": next(order)})
+            wins += state.get("status") == "won"
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return wins, requests
+
+
+async def run(host, port, clients, games, mode, local):
+    hangman_server = None
+    if local:
+        hangman_server, _ = await server.serve(host, port)
+    latencies = []
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(play_client(host, port, games, mode, latencies) for _ in range(clients))
+    )
+    elapsed = time.perf_counter() - started
+    if hangman_server is not None:
+        hangman_server.close()
+        await hangman_server.wait_closed()
+
+    wins = sum(result[0] for result in results)
+    requests = sum(result[1] for result in results)
+    latencies.sort()
+    return {
+        "clients": clients,
+        "games": clients * games,
+        "wins": wins,
+        "requests": requests,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed,
+        "latency_median_ms": statistics.median(latencies) * 1000,
+        "latency_p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the hangman server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--mode", choices=["basic", "intermediate"], default="basic")
+    parser.add_argument(
+        "--local", action="store_true", help="start a server in-process"
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run(args.host, args.port, args.clients, args.games, args.mode, args.local)
+    )
+    for key, value in result.items():
+        if isinstance(value, float):
+            print(f"{key:22s} {value:.2f}")
+        else:
+            print(f"{key:22s} {value}")
@@ -1,23 +1,74 @@
+import argparse
+import math
 import pygame
 import string
 import core
 import components
-
-pygame.init()
+import corpus
+import metrics
+import pool
+import stats
+import statesync
 
 # Screen setup
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 700
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Hangman Game with Letter Selection")
 
-# Font for button text
-font = pygame.font.Font("./assets/font.ttf", 18)
-font_medium = pygame.font.Font("./assets/font.ttf", 24)
-font_large = pygame.font.Font("./assets/font.ttf", 30)
+# Display, fonts and text cache; created by init_display() when the
+# frontend starts, so importing this module has no side effects
+screen = None
+fonts = None
+text_cache = None
+font = None
+font_medium = None
+font_large = None
+
+
+def init_display():
+    """Initialize pygame, open the window and load the fonts."""
+    global screen, fonts, text_cache, font, font_medium, font_large
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Hangman Game with Letter Selection")
+
+    # Fonts are created once and rendered text is cached across frames
+    fonts = components.FontRegistry()
+    text_cache = components.TextCache()
+
+    # Font for button text
+    font = fonts.get("./assets/font.ttf", 18)
+    font_medium = fonts.get("./assets/font.ttf", 24)
+    font_large = fonts.get("./assets/font.ttf", 30)
+
+# Screen area holding the mode, lives, mistakes and countdown text
+HUD_RECT = pygame.Rect(0, 0, 400, 140)
+
+# F3 shows the metrics overlay (turning instrumentation on), F4 writes the
+# metrics in the Prometheus text format to METRICS_PATH
+OVERLAY_KEY = pygame.K_F3
+DUMP_KEY = pygame.K_F4
+METRICS_PATH = "./metrics.prom"
+
+# Posted when the countdown on screen changes and when a turn timer runs out,
+# so the main loop can sleep in pygame.event.wait until then
+TIMER_TICK = pygame.event.custom_type()
+TIMER_EXPIRED = pygame.event.custom_type()
+
+# The loop only wakes up on its own while something animates
+MAX_FPS = 60
+FRAME_MS = 1000 // MAX_FPS
+
+# Games kept ready per mode, so clicking a mode never waits on the datasets
+POOL_WATERMARK = 4
+
+# Finished games are recorded here, under PLAYER; the store is opened by main()
+STATS_PATH = "./stats.db"
+PLAYER = "player"
+stats_store = None
 
 class Game:
-    def __init__(self):
+    def __init__(self, client=None):
         # Initial game state (menu, game, gameover)
         self.state = core.MENU
         self.mode = None  # Game mode (basic/intermediate)
@@ -38,6 +89,10 @@ class Game:
         self.word_state = core.word_state
         self.life_remaining = core.life_remaining
         self.timeout = str(core.timeout)
+        # With a statesync.LocalClient the screen shows the state decoded
+        # from its delta stream instead of reading core directly
+        self.client = client
+        self.view = client.view if client is not None else core
         # Menu buttons for selecting game mode
         self.basic_button = components.Button(
             "./assets/button.svg",
@@ -54,11 +109,23 @@ class Game:
             font,
         )
         # Underscores for displaying current word state
-        self.underscores = components.Underscores(self.word_state, font)
+        self.underscores = components.Underscores(self.word_state, font, text_cache)
         # Game over screen component
         self.gameover = components.GameOverScreen(
             font_large, font, SCREEN_HEIGHT, SCREEN_WIDTH
         )
+        # Where the hangman frame is drawn
+        self.hangman_rect = self.hangman_sprites.get_frame(0).get_rect(
+            center=(250, SCREEN_HEIGHT // 2)
+        )
+        # Screen regions changed since the last frame, and what they showed
+        self.dirty_rects = []
+        self.drawn_state = None
+        self.drawn_word = None
+        self.drawn_mistakes = None
+        self.drawn_hud = None
+        # Delay in ms of the TIMER_TICK currently armed, if any
+        self.tick_ms = None
 
     def create_letter_buttons(self):
         """Create clickable letter buttons for A-Z and arrange them in a grid on the right side."""
@@ -79,12 +146,9 @@ class Game:
             x = start_x + (col * spacing_x)
             y = start_y + (row * spacing_y)
 
-            # Get letter image from spritesheet
-            letter_surface = self.letter_sheet.get_letter(letter)
-            if letter_surface:
-                # Create button sprite and add to group
-                letter_button = components.LetterButton(letter_surface, (x, y), letter)
-                self.letter_buttons.add(letter_button)
+            # Create button sprite from the letter atlas and add to group
+            letter_button = components.LetterButton(self.letter_sheet, (x, y), letter)
+            self.letter_buttons.add(letter_button)
 
     def handle_events(self, event):
         """Handle all pygame events (mouse, keyboard) depending on game state."""
@@ -105,6 +169,10 @@ class Game:
                 self.transition_timer = 0
 
         elif self.state == core.GAME:
+            # A turn that ran out may have cost the last life
+            if event.type == TIMER_EXPIRED and core.life_remaining <= 0:
+                self.lose_game()
+
             # Handle letter button clicks
             for button in self.letter_buttons:
                 clicked_letter = button.handle_event(event)
@@ -112,7 +180,8 @@ class Game:
                     core.guess_letters(clicked_letter)  # Update game logic with guessed letter
                     self.word_state = core.word_state
                     self.life_remaining = core.life_remaining
-                    if "_" not in self.word_state and self.life_remaining > 0:
+                    if core.is_won() and self.life_remaining > 0:
+                        record_game(won=True)
                         core.game_over()
                         self.state = core.MENU
                         self.letter_buttons.empty()
@@ -121,8 +190,7 @@ class Game:
 
                     # If no lives left, trigger game over
                     if self.life_remaining <= 0:
-                        core.game_over()
-                        self.state = core.GAMEOVER
+                        self.lose_game()
 
         # Handle escape key to return to menu (works in any state)
         if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
@@ -132,21 +200,97 @@ class Game:
             self.mistakes = 0
             core.life_remaining = 6
 
+    def lose_game(self):
+        """Record the lost game and show the game over screen."""
+        record_game(won=False)
+        core.game_over()
+        self.state = core.GAMEOVER
+
     def update(self):
         """Update game state and components each frame."""
         if self.state == core.MENU:
             self.basic_button.update()
             self.intermediate_button.update()
         elif self.state == core.GAME:
+            if self.client is not None:
+                self.client.pump()
             # Sync word state and update letter buttons
-            self.word_state = core.word_state
+            self.word_state = self.view.word_state
             self.letter_buttons.update()
             self.transition_timer += 1
             # Calculate mistakes from lives
-            self.mistakes = 6 - core.life_remaining
-            self.timeout = str(core.timeout)
-            # Update underscores display
-            self.underscores = components.Underscores(self.word_state, font)
+            self.life_remaining = self.view.life_remaining
+            self.mistakes = 6 - self.life_remaining
+            self.timeout = str(self.view.timeout)
+            # Repaint the positions of the word line that a guess revealed
+            self.underscores.update(self.word_state)
+
+        self.collect_dirty_rects()
+
+    def animating(self):
+        """True while letter buttons are still fading in."""
+        if self.state != core.GAME:
+            return False
+        return any(button.alpha < 255 for button in self.letter_buttons)
+
+    def schedule_tick(self):
+        """Arm a TIMER_TICK for when the countdown on screen next changes."""
+        delay = None
+        if self.state == core.GAME:
+            delay = core.session.scheduler.next_change(core.session)
+        if delay is None:
+            if self.tick_ms is not None:
+                pygame.time.set_timer(TIMER_TICK, 0)
+                self.tick_ms = None
+            return
+        # Round up so the tick never arrives before the displayed value changes
+        self.tick_ms = max(1, math.ceil(delay * 1000))
+        pygame.time.set_timer(TIMER_TICK, self.tick_ms, 1)
+
+    def collect_dirty_rects(self):
+        """Record which parts of the screen changed since they were last drawn."""
+        if self.state != self.drawn_state:
+            # A new screen repaints everything
+            self.drawn_state = self.state
+            self.drawn_word = self.drawn_mistakes = self.drawn_hud = None
+            self.dirty_rects = [screen.get_rect()]
+            return
+
+        if self.state == core.MENU:
+            buttons = [self.basic_button, self.intermediate_button]
+        elif self.state == core.GAME:
+            buttons = self.letter_buttons.sprites()
+        else:
+            buttons = []
+        for button in buttons:
+            if button.dirty:
+                button.dirty = False
+                self.dirty_rects.append(button.rect.copy())
+
+        if self.state == core.GAME:
+            word = tuple(self.word_state)
+            if word != self.drawn_word:
+                self.drawn_word = word
+                self.dirty_rects.append(self.underscores.get_rect())
+            if self.mistakes != self.drawn_mistakes:
+                self.drawn_mistakes = self.mistakes
+                self.dirty_rects.append(self.hangman_rect.copy())
+            hud = (self.mode, self.life_remaining, self.mistakes, self.timeout)
+            if hud != self.drawn_hud:
+                self.drawn_hud = hud
+                self.dirty_rects.append(HUD_RECT.copy())
+
+    def render(self, surface):
+        """Repaint only the dirty regions; returns them for display.update."""
+        dirty_rects = merge_overlapping(self.dirty_rects)
+        self.dirty_rects = []
+        # Each region is redrawn on its own: the bounding box of a HUD change
+        # and a word line change would cover most of the screen
+        for rect in dirty_rects:
+            surface.set_clip(rect)
+            self.draw(surface)
+        surface.set_clip(None)
+        return dirty_rects
 
     def draw(self, surface):
         """Draw all game elements to the screen depending on state."""
@@ -158,14 +302,15 @@ class Game:
             self.intermediate_button.draw(surface)
 
             # Draw title
-            title_font = pygame.font.Font(None, 48)
-            title_text = title_font.render("HANGMAN GAME", True, (255, 255, 255))
+            title_text = text_cache.render(
+                fonts.get(None, 48), "HANGMAN GAME", (255, 255, 255)
+            )
             title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 100))
             surface.blit(title_text, title_rect)
 
             # Draw instructions
-            instruction_text = font.render(
-                "Click Basic or Intermediate to start", True, (255, 255, 255)
+            instruction_text = text_cache.render(
+                font, "Click Basic or Intermediate to start", (255, 255, 255)
             )
             text_rect = instruction_text.get_rect(
                 center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 200)
@@ -181,56 +326,153 @@ class Game:
             # Draw hangman sprite based on mistakes
             hangman_frame = self.hangman_sprites.get_frame(self.mistakes)
             if hangman_frame:
-                hangman_rect = hangman_frame.get_rect()
-                hangman_rect.center = (250, SCREEN_HEIGHT // 2)
-                surface.blit(hangman_frame, hangman_rect)
+                surface.blit(hangman_frame, self.hangman_rect)
 
-            # Draw game info (mode, lives, mistakes, timer)
-            mode_text = pygame.font.Font(None, 24).render(
-                f"Mode: {self.mode}", True, (255, 255, 255)
+            # Draw game info (mode, lives, mistakes, timer); the cache only
+            # renders a value again when it changes
+            mode_text = text_cache.render(
+                fonts.get(None, 24), f"Mode: {self.mode}", (255, 255, 255)
             )
             surface.blit(mode_text, (20, 20))
 
-            lives_text = pygame.font.Font(None, 24).render(
-                f"Lives: {core.life_remaining}", True, (255, 100, 100)
+            lives_text = text_cache.render(
+                fonts.get(None, 24), f"Lives: {self.life_remaining}", (255, 100, 100)
             )
             surface.blit(lives_text, (20, 50))
 
-            mistakes_text = pygame.font.Font(None, 20).render(
-                f"Mistakes: {self.mistakes}/6", True, (255, 200, 100)
+            mistakes_text = text_cache.render(
+                fonts.get(None, 20), f"Mistakes: {self.mistakes}/6", (255, 200, 100)
             )
             surface.blit(mistakes_text, (20, 80))
-            count_down_text = pygame.font.Font("./assets/font.ttf", 20).render(
-                self.timeout, True, "white"
+            count_down_text = text_cache.render(
+                fonts.get("./assets/font.ttf", 20), self.timeout, "white"
             )
             surface.blit(count_down_text, (20, 110))
 
             # Draw instructions
-            instruction_text = pygame.font.Font(None, 18).render(
-                "Press ESC to return to menu", True, (200, 200, 200)
+            instruction_text = text_cache.render(
+                fonts.get(None, 18), "Press ESC to return to menu", (200, 200, 200)
             )
             surface.blit(instruction_text, (20, SCREEN_HEIGHT - 30))
 
             # Draw all letter buttons
             self.letter_buttons.draw(surface)
 
-# Initialize game instance
-game = Game()
-clock = pygame.time.Clock()
+def merge_overlapping(rects):
+    """Merge the rects that overlap, so no region is drawn twice."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        while (i := rect.collidelist(merged)) != -1:
+            rect.union_ip(merged.pop(i))
+        merged.append(rect)
+    return merged
+
+
+def record_game(won):
+    """Queue the default session's finished game to the statistics store."""
+    if stats_store is not None:
+        stats_store.record(core.session, won, PLAYER)
+
+
+def post_timer_expired(expired):
+    """Called on the timer thread; wakes the main loop with a TIMER_EXPIRED."""
+    pygame.event.post(pygame.event.Event(TIMER_EXPIRED))
+
+
+def wait_timeout(game, overlay):
+    """Milliseconds the main loop may wait for events, or None to block."""
+    if game.animating():
+        return FRAME_MS
+    if overlay.visible:
+        return overlay.REFRESH_MS
+    return None
+
+
+def main(sync=False):
+    """Run the game window until it is closed.
+
+    With sync the screen is drawn from the state stream of a
+    statesync.LocalClient, the way a remote frontend would see it.
+    """
+    global stats_store
+    init_display()
+    pool.start(POOL_WATERMARK)
+    stats_store = stats.StatsStore(STATS_PATH)
+
+    # Initialize game instance
+    game = Game(statesync.LocalClient(core.session) if sync else None)
+    clock = pygame.time.Clock()
+    overlay = components.MetricsOverlay(fonts.get(None, 20), (SCREEN_WIDTH - 400, 540))
+
+    # Nothing reacts to the pointer moving, so those events never wake the loop
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+    # The scheduler thread reports expiries as events instead of being polled
+    core.timers.on_expired = post_timer_expired
+
+    # Main loop
+    running = True
+    while running:
+        # Sleep until input or a timer event arrives, unless something animates
+        timeout = wait_timeout(game, overlay)
+        if timeout is None:
+            events = [pygame.event.wait()]
+        else:
+            events = [pygame.event.wait(timeout)]
+        events.extend(pygame.event.get())
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+                core.session.stop_timer()  # Cancel any running timer in core logic
+            elif event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+                metrics.enable()
+                game.dirty_rects.append(overlay.toggle())
+            elif event.type == pygame.KEYDOWN and event.key == DUMP_KEY:
+                with open(METRICS_PATH, "w", encoding="utf-8") as f:
+                    f.write(metrics.render())
+
+            game.handle_events(event)  # Pass event to game
 
-# Main loop
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-            core.timer.cancel()  # Cancel any running timer in core logic
+        # Frame phases are only timed while instrumentation is on
+        frame = metrics.game
+        if frame is not None:
+            frame.start_frame(components.surfaces_created)
+        game.update()  # Update game state
+        if frame is not None:
+            frame.lap("update")
+        # Repaint and push to the display only what changed; idle frames do nothing
+        dirty_rects = game.render(screen)
+        if overlay.visible and frame is not None:
+            covered = overlay.rect.collidelist(dirty_rects) != -1
+            overlay_rect = overlay.draw(screen, frame, core.instruments, covered)
+            if overlay_rect is not None:
+                dirty_rects.append(overlay_rect)
+        if frame is not None:
+            frame.lap("draw")
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        if frame is not None:
+            frame.lap("flip")
+            frame.end_frame(components.surfaces_created)
+        game.schedule_tick()
+        clock.tick(MAX_FPS)  # Bursts of events are still limited to 60 FPS
 
-        game.handle_events(event)  # Pass event to game
+    core.timers.on_expired = None
+    pool.stop()
+    stats_store.close()
+    pygame.quit()
 
-    game.update()  # Update game state
-    game.draw(screen)  # Draw everything
-    pygame.display.flip()  # Update display
-    clock.tick(60)  # Limit to 60 FPS
 
-pygame.quit()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play hangman.")
+    parser.add_argument(
+        "--sync", action="store_true", help="render from the delta state stream"
+    )
+    parser.add_argument("--words-corpus", help="stream basic words from a corpus")
+    parser.add_argument("--phrases-corpus", help="stream phrases from a corpus")
+    args = parser.parse_args()
+    if args.words_corpus:
+        corpus.start(args.words_corpus, "basic")
+    if args.phrases_corpus:
+        corpus.start(args.phrases_corpus, "intermediate", settings=corpus.PHRASES)
+    main(args.sync)
@@ -0,0 +1,263 @@
+"""
+Optional counters and histograms for the hot paths.
+
+Instrumentation is off until enable() is called. Until then core.instruments
+and the game module global below are None, and the instrumented code pays
+one global lookup per event. Once enabled, core counts guesses (with their
+latency), timer expiries, live sessions and dataset cache hits, and the
+frontend records how long each frame spends updating, drawing and flipping
+and how many surfaces it allocates.
+
+render() dumps the registry in the Prometheus text exposition format.
+"""
+
+import bisect
+import time
+
+# Upper bounds of the histogram buckets, in seconds or counts
+GUESS_BUCKETS = (1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5, 1e-4, 1e-3, 1e-2)
+FRAME_BUCKETS = (0.0005, 0.001, 0.002, 0.004, 0.008, 0.016, 0.033, 0.066, 0.1)
+SURFACE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Weight of the newest frame in the moving averages shown on screen
+SMOOTHING = 0.05
+
+
+def format_labels(labels, extra=None):
+    pairs = dict(labels)
+    if extra:
+        pairs.update(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs.items()) + "}"
+
+
+class Counter:
+    """
+    Value that only goes up.
+    """
+
+    kind = "counter"
+    __slots__ = ("name", "labels", "value")
+
+    def __init__(self, name, labels=()):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self):
+        yield self.name + format_labels(self.labels), self.value
+
+
+class Gauge(Counter):
+    """
+    Value that goes up and down.
+    """
+
+    kind = "gauge"
+    __slots__ = ()
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Histogram:
+    """
+    Counts of observations falling into fixed buckets, plus their sum.
+    """
+
+    kind = "histogram"
+    __slots__ = ("name", "labels", "buckets", "counts", "sum", "count")
+
+    def __init__(self, name, buckets, labels=()):
+        self.name = name
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            yield (
+                self.name + "_bucket" + format_labels(self.labels, {"le": bound}),
+                cumulative,
+            )
+        yield self.name + "_sum" + format_labels(self.labels), self.sum
+        yield self.name + "_count" + format_labels(self.labels), self.count
+
+
+class Registry:
+    """
+    Named metrics, each possibly split into several label sets.
+    """
+
+    def __init__(self):
+        self.metrics = {}  # (name, labels) -> metric
+        self.help = {}  # name -> help text
+
+    def _get(self, cls, name, help, labels, *args):
+        labels = tuple(sorted((labels or {}).items()))
+        metric = self.metrics.get((name, labels))
+        if metric is None:
+            metric = self.metrics[(name, labels)] = cls(name, *args, labels)
+            self.help[name] = help
+        return metric
+
+    def counter(self, name, help, labels=None):
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help, labels=None):
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help, buckets, labels=None):
+        return self._get(Histogram, name, help, labels, buckets)
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text format.
+        """
+        lines = []
+        seen = set()
+        for (name, _), metric in sorted(self.metrics.items()):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {metric.kind}")
+            for sample, value in metric.samples():
+                lines.append(f"{sample} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class CoreInstruments:
+    """
+    Metrics updated by core while instrumentation is enabled.
+    """
+
+    def __init__(self, registry):
+        self.guesses = registry.counter("hangman_guesses_total", "Letters guessed")
+        self.guess_seconds = registry.histogram(
+            "hangman_guess_seconds", "Time spent in guess_letters", GUESS_BUCKETS
+        )
+        self.timer_expiries = registry.counter(
+            "hangman_timer_expiries_total", "Turn timers that ran out"
+        )
+        self.active_sessions = registry.gauge(
+            "hangman_active_sessions", "Sessions open in session managers"
+        )
+        self.dataset_hits = {}
+        self.dataset_misses = {}
+        for dataset in ("words", "phrases"):
+            labels = {"dataset": dataset}
+            self.dataset_hits[dataset] = registry.counter(
+                "hangman_dataset_cache_hits_total",
+                "Dataset requests served from memory",
+                labels,
+            )
+            self.dataset_misses[dataset] = registry.counter(
+                "hangman_dataset_cache_misses_total",
+                "Dataset requests that loaded the dataset",
+                labels,
+            )
+
+    def guessed(self, seconds):
+        self.guesses.inc()
+        self.guess_seconds.observe(seconds)
+
+    def dataset(self, name, hit):
+        (self.dataset_hits if hit else self.dataset_misses)[name].inc()
+
+
+class GameInstruments:
+    """
+    Per-frame metrics of the pygame frontend. A frame is timed with
+    start_frame(), one lap() per phase and end_frame().
+    """
+
+    PHASES = ("update", "draw", "flip")
+
+    def __init__(self, registry):
+        self.seconds = {
+            phase: registry.histogram(
+                "hangman_frame_seconds",
+                "Time per frame spent in each phase",
+                FRAME_BUCKETS,
+                {"phase": phase},
+            )
+            for phase in self.PHASES
+        }
+        self.surfaces = registry.histogram(
+            "hangman_frame_surfaces", "Surfaces allocated per frame", SURFACE_BUCKETS
+        )
+        # Moving averages for the on-screen overlay
+        self.averages = dict.fromkeys(self.PHASES, 0.0)
+        self.average_surfaces = 0.0
+        self._mark = 0.0
+        self._surfaces = 0
+
+    def start_frame(self, surfaces_created):
+        self._mark = time.perf_counter()
+        self._surfaces = surfaces_created
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        elapsed = now - self._mark
+        self._mark = now
+        self.seconds[phase].observe(elapsed)
+        self.averages[phase] += (elapsed - self.averages[phase]) * SMOOTHING
+
+    def end_frame(self, surfaces_created):
+        count = surfaces_created - self._surfaces
+        self.surfaces.observe(count)
+        self.average_surfaces += (count - self.average_surfaces) * SMOOTHING
+
+
+registry = Registry()
+
+# Frontend instruments; None while instrumentation is disabled
+game = None
+
+
+def enable():
+    """
+    Turns instrumentation on in core and the frontend.
+    """
+    global game
+    import core
+
+    if core.instruments is None:
+        core.instruments = CoreInstruments(registry)
+        core.instruments.active_sessions.set(core.SessionManager.open_sessions)
+    if game is None:
+        game = GameInstruments(registry)
+
+
+def disable():
+    """
+    Turns instrumentation off; the metrics recorded so far are kept.
+    """
+    global game
+    import core
+
+    core.instruments = None
+    game = None
+
+
+def render():
+    """
+    Returns the Prometheus text dump of every metric.
+    """
+    return registry.render()
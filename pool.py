@@ -0,0 +1,136 @@
+"""
+Pool of ready-made games, so that starting one does no dataset work.
+
+A template is (word, positions, word_state): a chosen word, the positions
+of each of its letters and the masked state a game on it starts from (see
+core.index_word). A SessionPool keeps up to `watermark` templates for each
+mode. claim() takes one in O(1), and once a mode drops below the low
+watermark a background thread tops it back up. The datasets are loaded
+when the pool starts instead of by the first game.
+
+While a pool is installed with start(), core sessions take their word from
+it for games without a difficulty. Seeded sessions keep drawing from their
+own random stream, and a mode whose pool has run dry falls back to
+choosing a word on the spot.
+"""
+
+import collections
+import random
+import threading
+
+import core
+
+# How each mode picks its entry
+CHOOSERS = {"basic": core.choose_word, "intermediate": core.choose_phrase}
+
+WATERMARK = 64
+
+
+class SessionPool:
+    """
+    Ready-made game templates per mode, refilled on a background thread.
+    """
+
+    def __init__(self, watermark=WATERMARK, low_watermark=None, modes=None, rng=None):
+        self.watermark = watermark
+        self.low_watermark = (
+            low_watermark if low_watermark is not None else max(1, watermark // 2)
+        )
+        self.rng = rng if rng is not None else random.Random()
+        self.ready = {mode: collections.deque() for mode in modes or CHOOSERS}
+        self.claimed = 0
+        self.misses = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """
+        Loads the datasets, fills every mode to the watermark and starts
+        the refill thread.
+        """
+        core.load_words()
+        core.load_phrases()
+        self.fill()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="hangman-pool", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the refill thread; templates already made can still be claimed.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def make(self, mode):
+        """
+        Returns a new template for mode.
+        """
+        word = CHOOSERS[mode](rng=self.rng)
+        return (word, *core.index_word(word))
+
+    def fill(self):
+        """
+        Tops every mode up to the watermark.
+        """
+        for mode, templates in self.ready.items():
+            while len(templates) < self.watermark:
+                templates.append(self.make(mode))
+
+    def claim(self, mode):
+        """
+        Returns a template for mode, or None if there is none ready.
+        """
+        templates = self.ready.get(mode)
+        if not templates:
+            self.misses += 1
+            return None
+        # popleft can still lose a race with another claiming thread
+        try:
+            template = templates.popleft()
+        except IndexError:
+            self.misses += 1
+            return None
+        self.claimed += 1
+        if len(templates) < self.low_watermark:
+            with self._condition:
+                self._condition.notify()
+        return template
+
+    def needs_refill(self):
+        return any(len(t) < self.low_watermark for t in self.ready.values())
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self.needs_refill():
+                    self._condition.wait()
+                if not self._running:
+                    return
+            self.fill()
+
+
+def start(watermark=WATERMARK):
+    """
+    Starts a pool and installs it in core; returns it.
+    """
+    stop()
+    core.pool = SessionPool(watermark).start()
+    return core.pool
+
+
+def stop():
+    """
+    Stops the installed pool, if any, and takes it out of core.
+    """
+    if core.pool is not None:
+        core.pool.stop()
+        core.pool = None
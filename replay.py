@@ -0,0 +1,193 @@
+"""
+Deterministic replay of recorded guess traces.
+
+A trace is a JSON lines file. The first line holds the run settings and
+every other line one timestamped client action:
+
+    {"seed": 1, "turn_seconds": 15}
+    {"t": 0.84, "session": 3, "op": "new", "mode": "basic"}
+    {"t": 2.5, "session": 3, "op": "guess", "letter": "E"}
+
+Replaying runs the actions on sessions with seeded RNG streams (so every
+session draws the same words again) and a scheduler.VirtualScheduler
+(so turn timers expire at the same virtual moments). Nothing sleeps: a
+trace covering hours of play replays at full CPU speed, and two replays of
+one trace end with the same digest.
+
+Usage: python replay.py generate trace.jsonl --sessions 100 --games 10
+       python replay.py run trace.jsonl
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import random
+import time
+
+import core
+import simulate
+from scheduler import VirtualScheduler
+
+
+class Engine:
+    """
+    Applies trace actions to sessions on a virtual clock and keeps score.
+    """
+
+    def __init__(self, seed=0):
+        self.timers = VirtualScheduler(self.timers_expired)
+        self.sessions = core.SessionManager(self.timers, seed=seed)
+        self.active = set()  # ids of sessions with a game running
+        self.games = 0
+        self.wins = 0
+        self.timeouts = 0
+        self.actions = 0
+        self._digest = hashlib.sha256()
+
+    def apply(self, action):
+        """
+        Runs one trace action, after firing the timers that expire before it.
+        """
+        self.timers.advance_to(action["t"])
+        self.actions += 1
+        session_id = action["session"]
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions.create(session_id=session_id)
+        if action["op"] == "new":
+            session.game_over()
+            session.setup(action.get("mode", "basic"))
+            self.active.add(session_id)
+        elif action["op"] == "guess" and session_id in self.active:
+            session.guess_letters(action["letter"])
+            self.check(session)
+        return session
+
+    def timers_expired(self, expired):
+        self.timeouts += len(expired)
+        for session in expired:
+            self.check(session)
+
+    def check(self, session):
+        """
+        Scores the session's game if it just ended.
+        """
+        won = session.is_won()
+        if not won and session.life_remaining > 0:
+            return
+        session.stop_timer()
+        self.active.discard(session.session_id)
+        self.games += 1
+        self.wins += won
+        self._digest.update(
+            f"{session.session_id}:{session.current_word}:"
+            f"{''.join(session.guessed_letters)}:{session.life_remaining}\n".encode()
+        )
+
+    def result(self):
+        return {
+            "actions": self.actions,
+            "games": self.games,
+            "wins": self.wins,
+            "timeouts": self.timeouts,
+            "virtual_seconds": self.timers.clock.now,
+            "digest": self._digest.hexdigest(),
+        }
+
+
+def run_trace(header, actions):
+    """
+    Replays actions with the settings of a trace header; returns the
+    Engine's result plus the real time taken.
+    """
+    turn_seconds = core.TURN_SECONDS
+    core.TURN_SECONDS = header.get("turn_seconds", turn_seconds)
+    try:
+        started = time.perf_counter()
+        engine = Engine(header.get("seed", 0))
+        for action in actions:
+            engine.apply(action)
+        elapsed = time.perf_counter() - started
+    finally:
+        core.TURN_SECONDS = turn_seconds
+    result = engine.result()
+    result["seconds"] = elapsed
+    result["actions_per_second"] = result["actions"] / elapsed if elapsed else 0.0
+    return result
+
+
+def generate(sessions=100, games=10, seed=0, mode="basic", think_seconds=4.0):
+    """
+    Plays games with the frequency strategy and exponentially distributed
+    think times, some long enough for the turn timer to run out.
+    Returns (header, actions) of the recorded trace.
+    """
+    header = {"seed": seed, "turn_seconds": core.TURN_SECONDS}
+    rng = random.Random(seed)
+    engine = Engine(seed)
+    actions = []
+    started = {session_id: 0 for session_id in range(1, sessions + 1)}
+    # (time of the next action, session id)
+    queue = [(rng.expovariate(1 / think_seconds), session_id) for session_id in started]
+    heapq.heapify(queue)
+    while queue:
+        t, session_id = heapq.heappop(queue)
+        engine.timers.advance_to(t)
+        if session_id in engine.active:
+            session = engine.sessions.get(session_id)
+            letter = simulate.frequency_strategy(session, rng)
+            action = {"t": t, "session": session_id, "op": "guess", "letter": letter}
+        elif started[session_id] < games:
+            started[session_id] += 1
+            action = {"t": t, "session": session_id, "op": "new", "mode": mode}
+        else:
+            continue
+        actions.append(action)
+        engine.apply(action)
+        heapq.heappush(queue, (t + rng.expovariate(1 / think_seconds), session_id))
+    return header, actions
+
+
+def write_trace(path, header, actions):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in [header, *actions]:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def read_trace(path):
+    """
+    Returns (header, actions) of a trace file.
+    """
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        actions = [json.loads(line) for line in f if line.strip()]
+    return header, actions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record and replay guess traces.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate_parser = commands.add_parser("generate", help="record a synthetic trace")
+    generate_parser.add_argument("trace")
+    generate_parser.add_argument("--sessions", type=int, default=100)
+    generate_parser.add_argument("--games", type=int, default=10)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument(
+        "--mode", choices=["basic", "intermediate"], default="basic"
+    )
+    run_parser = commands.add_parser("run", help="replay a trace")
+    run_parser.add_argument("trace")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        header, actions = generate(args.sessions, args.games, args.seed, args.mode)
+        write_trace(args.trace, header, actions)
+        print(f"recorded {len(actions)} actions to {args.trace}")
+    else:
+        result = run_trace(*read_trace(args.trace))
+        for key, value in result.items():
+            if isinstance(value, float):
+                print(f"{key:20s} {value:.2f}")
+            else:
+                print(f"{key:20s} {value}")
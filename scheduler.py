@@ -0,0 +1,247 @@
+import heapq
+import math
+import threading
+import time
+
+
+class TimerScheduler:
+    """
+    Tracks the turn deadlines of every session on a single background thread.
+    Deadlines live in a heap; when one or more pass, their sessions'
+    countdown() callbacks are fired together in one batch, after which
+    on_expired, if given, is called with the list of expired sessions.
+    """
+
+    def __init__(self, clock=time.monotonic, on_expired=None):
+        self.clock = clock
+        self.on_expired = on_expired
+        self._heap = []
+        self._live = 0
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def schedule(self, session, seconds):
+        """
+        Sets the session's deadline to `seconds` from now,
+        replacing any deadline it already had.
+        """
+        with self._condition:
+            if session.deadline is None:
+                self._live += 1
+            deadline = self.clock() + seconds
+            session.deadline = deadline
+            self._sequence += 1
+            heapq.heappush(self._heap, (deadline, self._sequence, session))
+            self._compact()
+            self._wake(session)
+
+    def cancel(self, session):
+        """
+        Forgets the session's deadline. The stale heap entry is skipped later.
+        """
+        with self._condition:
+            if session.deadline is not None:
+                session.deadline = None
+                self._live -= 1
+
+    def remaining(self, session):
+        """
+        Returns the whole seconds left before the session's deadline.
+        """
+        deadline = session.deadline
+        if deadline is None:
+            return 0
+        return max(0, math.ceil(deadline - self.clock()))
+
+    def next_change(self, session):
+        """
+        Returns the seconds until remaining(session) next changes,
+        or None if the session has no deadline.
+        """
+        deadline = session.deadline
+        if deadline is None:
+            return None
+        left = deadline - self.clock()
+        if left <= 0:
+            return 0.0
+        return left - (math.ceil(left) - 1)
+
+    def pending(self):
+        """
+        Returns the number of sessions with a running timer.
+        """
+        return self._live
+
+    def pop_expired(self):
+        """
+        Removes and returns every session whose deadline has passed.
+        """
+        expired = []
+        with self._condition:
+            now = self.clock()
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                deadline, _, session = heapq.heappop(heap)
+                # Entries left behind by a reset or cancel are ignored
+                if session.deadline == deadline:
+                    session.deadline = None
+                    self._live -= 1
+                    expired.append(session)
+        return expired
+
+    def fire_expired(self):
+        """
+        Runs the countdown callback of every expired session.
+        """
+        expired = self.pop_expired()
+        for session in expired:
+            session.countdown()
+        if expired and self.on_expired is not None:
+            self.on_expired(expired)
+        return expired
+
+    def stop(self):
+        """
+        Stops the background thread, if one was started. Deadlines still
+        pending, or scheduled later, never fire.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _compact(self):
+        # Resetting a timer leaves its old entry in the heap; rebuild the heap
+        # once stale entries outnumber live ones so it cannot grow unbounded.
+        if len(self._heap) > 2 * self._live + 64:
+            self._heap = [
+                entry for entry in self._heap if entry[2].deadline == entry[0]
+            ]
+            heapq.heapify(self._heap)
+
+    def _wake(self, session):
+        # Called with the lock held after a deadline was pushed
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="hangman-timers", daemon=True
+            )
+            self._thread.start()
+        elif self._heap[0][2] is session:
+            # The new deadline is the earliest one, wake the thread up
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                delay = self._heap[0][0] - self.clock()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+            self.fire_expired()
+
+
+class LoopScheduler(TimerScheduler):
+    """
+    Scheduler driven by an asyncio event loop instead of a thread.
+    A single loop timer is armed for the earliest deadline.
+    """
+
+    def __init__(self, loop, on_expired=None):
+        super().__init__(loop.time, on_expired)
+        self.loop = loop
+        self._handle = None
+
+    def _wake(self, session):
+        deadline = self._heap[0][0]
+        if self._handle is not None:
+            if self._handle.when() <= deadline:
+                return
+            self._handle.cancel()
+        self._handle = self.loop.call_at(deadline, self._fire)
+
+    def _fire(self):
+        self._handle = None
+        self.fire_expired()
+        with self._condition:
+            if self._heap and self._handle is None:
+                self._handle = self.loop.call_at(self._heap[0][0], self._fire)
+
+
+class VirtualClock:
+    """
+    Clock that only moves when told to.
+    """
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class VirtualScheduler(TimerScheduler):
+    """
+    Scheduler on a VirtualClock, for tests, replays and benchmarks.
+    Time only moves in advance(), which fires the deadlines it passes in
+    order, with the clock set to each deadline, and never sleeps.
+    """
+
+    def __init__(self, on_expired=None, start=0.0):
+        super().__init__(VirtualClock(start), on_expired)
+
+    def advance(self, seconds):
+        """
+        Moves the clock forward; returns the sessions whose timers expired.
+        """
+        return self.advance_to(self.clock.now + seconds)
+
+    def advance_to(self, when):
+        """
+        Moves the clock to `when` if it is later than now; returns the
+        sessions whose timers expired on the way.
+        """
+        expired = []
+        while True:
+            with self._condition:
+                if not self._heap or self._heap[0][0] > when:
+                    break
+                self.clock.now = max(self.clock.now, self._heap[0][0])
+            expired += self.fire_expired()
+        self.clock.now = max(self.clock.now, when)
+        return expired
+
+    def _wake(self, session):
+        pass
+
+
+class NullScheduler:
+    """
+    Scheduler for headless sessions: deadlines are never tracked or fired.
+    """
+
+    def schedule(self, session, seconds):
+        pass
+
+    def cancel(self, session):
+        session.deadline = None
+
+    def remaining(self, session):
+        return 0
+
+    def next_change(self, session):
+        return None
+
+    def pending(self):
+        return 0
+
+
+# Shared by every session that runs without turn timers
+NO_TIMERS = NullScheduler()
@@ -0,0 +1,342 @@
+"""
+Multiplayer hangman server.
+
+Hosts one core.HangmanSession per connection on an asyncio event loop. Turn
+timers run on a scheduler.LoopScheduler, so there are no timer threads.
+Clients speak newline-delimited JSON over TCP:
+
+    client -> server   {"op": "hello", "session": "abc"}
+                       {"op": "new", "mode": "basic"}
+                       {"op": "guess", "letter": "E"}
+                       {"op": "metrics"}
+    server -> client   {"type": "hello", "session": "abc", "worker": 1234}
+                       {"type": "state", "word_state": "_E__", ...}
+                       {"type": "metrics", "text": "# HELP ..."}
+                       {"type": "error", "message": "..."}
+
+A named session outlives its connection by RECONNECT_SECONDS, with its
+turn timer stopped, so a client that reconnects and says hello with the
+same id carries on with its game.
+
+Every request gets exactly one reply, and a state message with
+"event": "timeout" is also pushed when a turn timer runs out.
+Outgoing messages are queued and written once per loop iteration for all
+connections together. A connection that stops reading has its input paused
+until its output drains, and is dropped if its backlog keeps growing.
+
+With --log DIR every session event goes to an eventlog.EventLog and the
+sessions are snapshotted every SNAPSHOT_SECONDS. On start the sessions of
+the log are recovered, and a client saying hello with the id of a
+recovered session resumes its game. With --pool N new games take their
+word from a pool.SessionPool of N ready-made games per mode. With
+--stats PATH every finished game is recorded to a stats.StatsStore, with
+the session id as the player. --words-corpus and --phrases-corpus stream
+the words or phrases from a large text corpus (see corpus.py).
+
+Usage: python server.py [--host 127.0.0.1] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import string
+
+import core
+import corpus
+import eventlog
+import metrics
+import pool
+import stats
+from scheduler import LoopScheduler
+
+# Per-connection limits on buffered data
+MAX_LINE = 1024
+MAX_BACKLOG = 1 << 20
+
+# Seconds between session snapshots when an event log is kept
+SNAPSHOT_SECONDS = 60
+
+# Seconds a named session is kept after its client disconnects
+RECONNECT_SECONDS = 30
+
+
+def state_message(session, event):
+    """
+    Builds the state update pushed to a session's client after an event:
+    "new", "guess" or "timeout".
+    """
+    if session.is_won():
+        status = "won"
+    elif session.life_remaining <= 0:
+        status = "lost"
+    else:
+        status = "playing"
+    message = {
+        "type": "state",
+        "event": event,
+        "mode": session.mode,
+        "word_state": "".join(session.word_state),
+        "guessed": "".join(session.guessed_letters),
+        "life_remaining": session.life_remaining,
+        "timeout": session.timeout,
+        "status": status,
+    }
+    if status != "playing":
+        message["answer"] = session.current_word
+    return message
+
+
+class HangmanServer:
+    """
+    Owns the sessions, the loop scheduler and the batched write queue.
+    """
+
+    def __init__(self, loop, log=None, stats=None):
+        self.loop = loop
+        self.stats = stats
+        self.scheduler = LoopScheduler(loop, self.timers_expired)
+        self.sessions = core.SessionManager(self.scheduler, log)
+        self.connections = {}  # session id -> protocol
+        self._orphans = {}  # session id -> handle closing it after disconnect
+        self._pending = set()  # protocols with queued output
+        self._flush_scheduled = False
+        if log is not None:
+            eventlog.recover(log.directory, self.sessions)
+            self.snapshot()
+
+    def snapshot(self):
+        self.sessions.snapshot()
+        self.loop.call_later(SNAPSHOT_SECONDS, self.snapshot)
+
+    def connect(self, protocol):
+        session = self.sessions.get(protocol.session_id)
+        if session is None or session.session_id in self.connections:
+            session = self.sessions.create(session_id=protocol.session_id)
+        else:
+            orphan = self._orphans.pop(session.session_id, None)
+            if orphan is not None:
+                orphan.cancel()
+            if session.life_remaining > 0 and not session.is_won():
+                # A session recovered from the event log, or whose client
+                # reconnected, resumes its game
+                session.start_timer(core.TURN_SECONDS)
+        self.connections[session.session_id] = protocol
+        return session
+
+    def rebind(self, protocol, session_id):
+        """
+        Moves a connection to the named session, resuming it if it exists.
+        The supervisor binds connections on accept, so this is only needed
+        when clients connect to a single server directly.
+        """
+        self.connections.pop(protocol.session.session_id, None)
+        self.sessions.close(protocol.session.session_id)
+        protocol.session_id = session_id
+        protocol.session = self.connect(protocol)
+        return protocol.session
+
+    def disconnect(self, protocol):
+        """
+        Detaches a closed connection. An unnamed session is closed at once;
+        a named one is kept, its timer stopped, for RECONNECT_SECONDS.
+        """
+        session_id = protocol.session.session_id
+        self.connections.pop(session_id, None)
+        self._pending.discard(protocol)
+        if protocol.session_id is None:
+            self.sessions.close(session_id)
+        else:
+            protocol.session.stop_timer()
+            self._orphans[session_id] = self.loop.call_later(
+                RECONNECT_SECONDS, self.expire, session_id
+            )
+
+    def expire(self, session_id):
+        """
+        Closes a session whose client did not come back in time.
+        """
+        del self._orphans[session_id]
+        self.sessions.close(session_id)
+
+    def handle(self, protocol, request):
+        """
+        Applies one client request to its session.
+        """
+        session = protocol.session
+        op = request.get("op")
+        if op == "hello":
+            session_id = request.get("session")
+            if isinstance(session_id, str) and session_id != session.session_id:
+                session = self.rebind(protocol, session_id)
+            return protocol.send(
+                {"type": "hello", "session": session.session_id, "worker": os.getpid()}
+            )
+        if op == "metrics":
+            # Prometheus text dump; empty until started with --metrics
+            return protocol.send({"type": "metrics", "text": metrics.render()})
+        if op == "new":
+            mode = request.get("mode", "basic")
+            if mode not in ("basic", "intermediate"):
+                return protocol.send({"type": "error", "message": "unknown mode"})
+            session.game_over()
+            session.setup(mode)
+        elif op == "guess":
+            letter = str(request.get("letter", "")).upper()
+            if len(letter) != 1 or letter not in string.ascii_uppercase:
+                return protocol.send({"type": "error", "message": "invalid letter"})
+            if session.is_won() or session.life_remaining <= 0:
+                return protocol.send({"type": "error", "message": "no game running"})
+            session.guess_letters(letter)
+            if session.is_won() or session.life_remaining <= 0:
+                session.stop_timer()
+                self.finished(session)
+        else:
+            return protocol.send({"type": "error", "message": "unknown op"})
+        protocol.send(state_message(session, op))
+
+    def timers_expired(self, expired):
+        """
+        Pushes the new state of every session whose turn ran out.
+        """
+        for session in expired:
+            if session.life_remaining <= 0:
+                self.finished(session)
+            protocol = self.connections.get(session.session_id)
+            if protocol is not None:
+                protocol.send(state_message(session, "timeout"))
+
+    def finished(self, session):
+        """
+        Records a game that just ended, if statistics are kept.
+        """
+        if self.stats is not None:
+            self.stats.record(session, session.is_won(), str(session.session_id))
+
+    def queue(self, protocol):
+        # Output is flushed once per loop iteration, for every connection
+        self._pending.add(protocol)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.loop.call_soon(self.flush)
+
+    def flush(self):
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, set()
+        for protocol in pending:
+            protocol.flush()
+
+
+class HangmanProtocol(asyncio.Protocol):
+    """
+    One client connection and its session.
+    """
+
+    def __init__(self, server, session_id=None):
+        self.server = server
+        self.session_id = session_id
+        self.transport = None
+        self.session = None
+        self.buffer = b""
+        self.outgoing = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.session = self.server.connect(self)
+
+    def connection_lost(self, exc):
+        self.server.disconnect(self)
+
+    def data_received(self, data):
+        self.buffer += data
+        *lines, self.buffer = self.buffer.split(b"\n")
+        if len(self.buffer) > MAX_LINE:
+            self.transport.close()
+            return
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self.send({"type": "error", "message": "invalid json"})
+                continue
+            if isinstance(request, dict):
+                self.server.handle(self, request)
+            else:
+                self.send({"type": "error", "message": "invalid request"})
+
+    def send(self, message):
+        self.outgoing.append(json.dumps(message, separators=(",", ":")).encode())
+        self.server.queue(self)
+
+    def flush(self):
+        if self.transport.is_closing():
+            return
+        self.outgoing.append(b"")
+        self.transport.write(b"\n".join(self.outgoing))
+        self.outgoing = []
+        if self.transport.get_write_buffer_size() > MAX_BACKLOG:
+            self.transport.close()
+
+    # Backpressure: stop reading requests while the client is not reading
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+async def serve(host="127.0.0.1", port=8765, log=None, stats=None):
+    """
+    Starts the server and returns (asyncio server, HangmanServer).
+    """
+    loop = asyncio.get_running_loop()
+    hangman = HangmanServer(loop, log, stats)
+    server = await loop.create_server(
+        lambda: HangmanProtocol(hangman), host, port, backlog=4096
+    )
+    return server, hangman
+
+
+async def main(host, port, log_directory=None, stats_path=None):
+    log = eventlog.EventLog(log_directory) if log_directory else None
+    store = stats.StatsStore(stats_path) if stats_path else None
+    try:
+        server, _ = await serve(host, port, log, store)
+        async with server:
+            await server.serve_forever()
+    finally:
+        if log is not None:
+            log.close()
+        if store is not None:
+            store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the hangman game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--log", help="directory of the session event log")
+    parser.add_argument(
+        "--metrics", action="store_true", help="count guesses, timeouts and sessions"
+    )
+    parser.add_argument(
+        "--pool", type=int, default=0, help="ready-made games kept per mode"
+    )
+    parser.add_argument("--stats", help="SQLite database of finished games")
+    parser.add_argument("--words-corpus", help="stream basic words from a corpus")
+    parser.add_argument("--phrases-corpus", help="stream phrases from a corpus")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+    if args.words_corpus:
+        corpus.start(args.words_corpus, "basic")
+    if args.phrases_corpus:
+        corpus.start(args.phrases_corpus, "intermediate", settings=corpus.PHRASES)
+    if args.pool:
+        pool.start(args.pool)
+    else:
+        core.load_words()
+        core.load_phrases()
+    asyncio.run(main(args.host, args.port, args.log, args.stats))
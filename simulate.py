@@ -0,0 +1,207 @@
+"""
+Batch simulator for tuning word lists.
+
+Plays games on headless sessions (no timers, no prints, no pygame) against a
+guessing strategy, spread over a process pool, and reports the win rate and
+the distribution of guesses per game.
+
+Usage: python simulate.py --games 100000 --mode basic --strategy frequency
+"""
+
+import argparse
+import random
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import core
+import word_index
+from scheduler import NO_TIMERS
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Letters from most to least common in English
+FREQUENCY_ORDER = sorted(
+    ALPHABET, key=lambda letter: -word_index.LETTER_FREQUENCY[letter]
+)
+
+
+def random_strategy(session, rng):
+    """
+    Guesses any letter not guessed yet.
+    """
+    return rng.choice([letter for letter in ALPHABET if letter not in session.guessed])
+
+
+def frequency_strategy(session, rng):
+    """
+    Guesses the most common English letter not guessed yet.
+    """
+    for letter in FREQUENCY_ORDER:
+        if letter not in session.guessed:
+            return letter
+
+
+def matches(entry, session):
+    """
+    Returns True if entry could be the session's word given what is revealed.
+    """
+    if len(entry) != len(session.word_state):
+        return False
+    for letter, shown in zip(entry.upper(), session.word_state):
+        if shown == "_":
+            if letter in session.guessed:
+                return False
+        elif letter != shown:
+            return False
+    return True
+
+
+def candidate_strategy(session, rng):
+    """
+    Guesses the unguessed letter found in the most dictionary entries
+    that are still consistent with the revealed word.
+    """
+    entries = core.phrases if session.mode == "intermediate" else core.words
+    counts = Counter()
+    for entry in entries:
+        if matches(entry, session):
+            counts.update(set(entry.upper()) - session.guessed - {" "})
+    for letter, _ in counts.most_common():
+        if letter in ALPHABET:
+            return letter
+    return frequency_strategy(session, rng)
+
+
+def solver_strategy(session, rng):
+    """
+    Guesses the most informative letter according to the NumPy solver.
+    """
+    import solver
+
+    entries = core.phrases if session.mode == "intermediate" else core.words
+    letter = solver.solver_for(entries).best_letter(session.word_state, session.guessed)
+    return letter or frequency_strategy(session, rng)
+
+
+STRATEGIES = {
+    "random": random_strategy,
+    "frequency": frequency_strategy,
+    "candidates": candidate_strategy,
+    "solver": solver_strategy,
+}
+
+
+def play(session, word, strategy, rng):
+    """
+    Plays one game of word on a headless session.
+    Returns (won, guesses made).
+    """
+    session.game_over()
+    session.current_word = word
+    guesses = 0
+    while session.life_remaining > 0 and not session.is_won():
+        letter = strategy(session, rng)
+        if letter is None or letter in session.guessed:
+            raise ValueError(f"strategy returned {letter!r}, not a new letter")
+        session.guess_letters(letter)
+        guesses += 1
+    return session.life_remaining > 0, guesses
+
+
+def play_batch(games, mode, strategy_name, seed, difficulty=None):
+    """
+    Plays a batch of games in one worker.
+    Returns (wins, Counter of guesses per game).
+    """
+    rng = random.Random(seed)
+    strategy = STRATEGIES[strategy_name]
+    session = core.HangmanSession(scheduler=NO_TIMERS)
+    session.mode = mode
+    choose = core.choose_phrase if mode == "intermediate" else core.choose_word
+    wins = 0
+    guesses = Counter()
+    for _ in range(games):
+        won, count = play(session, choose(difficulty, rng=rng), strategy, rng)
+        wins += won
+        guesses[count] += 1
+    return wins, guesses
+
+
+def simulate(
+    games,
+    mode="basic",
+    strategy="frequency",
+    workers=None,
+    seed=0,
+    difficulty=None,
+    batch_size=1000,
+):
+    """
+    Plays games across a process pool and returns a report dictionary.
+    """
+    batches = []
+    remaining = games
+    while remaining > 0:
+        batches.append(min(batch_size, remaining))
+        remaining -= batches[-1]
+
+    wins = 0
+    guesses = Counter()
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(
+            play_batch,
+            batches,
+            [mode] * len(batches),
+            [strategy] * len(batches),
+            [seed + i for i in range(len(batches))],
+            [difficulty] * len(batches),
+        )
+        for batch_wins, batch_guesses in results:
+            wins += batch_wins
+            guesses.update(batch_guesses)
+    return report(games, wins, guesses)
+
+
+def report(games, wins, guesses):
+    """
+    Summarizes the outcome of a simulation.
+    """
+    samples = sorted(guesses.elements())
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "guesses_mean": statistics.fmean(samples) if samples else 0.0,
+        "guesses_median": statistics.median(samples) if samples else 0,
+        "guesses_p90": samples[int(0.9 * (len(samples) - 1))] if samples else 0,
+        "guesses_histogram": dict(sorted(guesses.items())),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate hangman games.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--mode", choices=["basic", "intermediate"], default="basic")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="frequency")
+    parser.add_argument("--difficulty", choices=word_index.TIERS)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = simulate(
+        args.games,
+        args.mode,
+        args.strategy,
+        args.workers,
+        args.seed,
+        args.difficulty,
+    )
+    print(f"games:    {result['games']}")
+    print(f"win rate: {result['win_rate']:.2%}")
+    print(
+        f"guesses:  mean {result['guesses_mean']:.2f}, "
+        f"median {result['guesses_median']}, p90 {result['guesses_p90']}"
+    )
+    for count, games in result["guesses_histogram"].items():
+        print(f"  {count:3d} {games}")
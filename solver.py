@@ -0,0 +1,142 @@
+"""
+Vectorized hangman solver.
+
+The dictionary is encoded once as NumPy uint8 matrices, one per entry length,
+holding the upper-case character codes of each entry. Filtering the entries
+consistent with a word_state and ranking the next letter then run as
+array masks and bincounts instead of Python loops over every word.
+"""
+
+import numpy as np
+
+import core
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+LETTER_CODES = np.frombuffer(ALPHABET.encode("ascii"), dtype=np.uint8)
+
+
+def encode(characters):
+    """
+    Encodes a string or list of characters as a uint8 array of ASCII codes.
+    """
+    data = "".join(characters).encode("ascii", errors="replace")
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+class Solver:
+    """
+    Candidate filter and letter ranker over a word list.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        # Grouped by upper-case length, like the word_state of a game:
+        # upper-casing can change it ("ß" becomes "SS")
+        by_length = {}
+        for position, entry in enumerate(entries):
+            upper = entry.upper()
+            uppers, positions = by_length.setdefault(len(upper), ([], []))
+            uppers.append(upper)
+            positions.append(position)
+        # length -> (character matrix, word list positions of its rows)
+        self.groups = {}
+        for length, (uppers, positions) in by_length.items():
+            matrix = encode(uppers).reshape(len(positions), length)
+            self.groups[length] = (matrix, np.array(positions, dtype=np.uint32))
+
+    def candidates(self, word_state, guessed):
+        """
+        Returns the character matrix and word list positions of the entries
+        consistent with word_state and the set of guessed letters.
+        """
+        group = self.groups.get(len(word_state))
+        if group is None:
+            empty = np.empty((0, len(word_state)), dtype=np.uint8)
+            return empty, np.empty(0, dtype=np.uint32)
+        matrix, positions = group
+
+        state = encode(word_state)
+        hidden = state == ord("_")
+        # Shown characters must match exactly
+        mask = (matrix[:, ~hidden] == state[~hidden]).all(axis=1)
+        # Hidden characters cannot be letters that were already guessed
+        if guessed:
+            guessed_table = np.zeros(256, dtype=bool)
+            guessed_table[[ord(letter) for letter in guessed]] = True
+            mask &= ~guessed_table[matrix[:, hidden]].any(axis=1)
+        return matrix[mask], positions[mask]
+
+    def rank_letters(self, word_state, guessed):
+        """
+        Ranks the unguessed letters by the expected information of guessing
+        them: the entropy of how they would split the remaining candidates.
+        Returns a list of (letter, bits, candidates containing it), best first.
+        """
+        matrix, _ = self.candidates(word_state, guessed)
+        count = len(matrix)
+        if count == 0:
+            return []
+        hidden = encode(word_state) == ord("_")
+        hidden_matrix = matrix[:, hidden]
+
+        # Number of candidates containing each letter in a hidden position
+        present = np.zeros((count, 256), dtype=bool)
+        present[np.arange(count)[:, None], hidden_matrix] = True
+        containing = present.sum(axis=0)
+
+        # Candidates revealing the same positions end up indistinguishable,
+        # so each letter splits them by the bit pattern of its positions
+        width = hidden_matrix.shape[1]
+        if width <= 63:
+            weights = np.left_shift(np.uint64(1), np.arange(width, dtype=np.uint64))
+        ranking = []
+        for code in LETTER_CODES:
+            letter = chr(code)
+            if letter in guessed or containing[code] == 0:
+                continue
+            revealed = hidden_matrix == code
+            if width <= 63:
+                patterns = (revealed * weights).sum(axis=1, dtype=np.uint64)
+                _, sizes = np.unique(patterns, return_counts=True)
+            else:
+                _, sizes = np.unique(revealed, axis=0, return_counts=True)
+            p = sizes / count
+            bits = float(-(p * np.log2(p)).sum())
+            ranking.append((letter, bits, int(containing[code])))
+        ranking.sort(key=lambda item: (-item[1], -item[2], item[0]))
+        return ranking
+
+    def best_letter(self, word_state, guessed):
+        """
+        Returns the most informative letter to guess next, or None.
+        """
+        ranking = self.rank_letters(word_state, guessed)
+        return ranking[0][0] if ranking else None
+
+
+# Solvers built for each dataset, keyed by the word list object
+_solvers = {}
+
+
+def solver_for(entries):
+    """
+    Returns the cached solver of a word list, building it on first use.
+    """
+    solver = _solvers.get(id(entries))
+    if solver is None or solver.entries is not entries:
+        solver = _solvers[id(entries)] = Solver(entries)
+    return solver
+
+
+def hint(session=None):
+    """
+    Suggests the next letter for a session (the default core session if
+    none is given), using its word_state and guessed letters.
+    """
+    if session is None:
+        session = core.session
+    if session.mode == "intermediate":
+        entries = core.load_phrases()
+    else:
+        entries = core.load_words()
+    return solver_for(entries).best_letter(session.word_state, session.guessed)
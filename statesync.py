@@ -0,0 +1,305 @@
+"""
+Compact binary state sync for remote frontends.
+
+A client is sent one full state message when a game starts, then only
+deltas: the letters guessed since the last message, the positions they
+revealed, the new life count and the new turn deadline. Idle updates send
+nothing. Messages are framed with a <H length on the stream.
+
+    full    B FULL, B mode, b life, I guessed mask, I deadline ms, H length,
+            revealed bitmap (one bit per position), then the revealed
+            characters in position order, as UTF-8
+    delta   B DELTA, B flags, then in this order, when flagged:
+            LETTERS   I mask of newly guessed letters, bitmap of newly
+                      revealed positions, their characters as UTF-8
+            LIFE      b life remaining
+            DEADLINE  I deadline ms
+
+Guessed letters are a 26-bit mask with bit 0 for A. The deadline is sent
+as milliseconds left (NO_DEADLINE when the turn timer is not running), so
+client and server clocks never have to agree. Bitmaps hold position i in
+bit i % 8 of byte i // 8.
+
+LocalClient wires an encoder to a decoder through an in-memory stream, so
+the pygame frontend can render from the decoded state exactly as a remote
+client would (python main.py --sync).
+"""
+
+import math
+import string
+import struct
+import time
+
+import core
+
+FULL = 1
+DELTA = 2
+
+# Delta flags
+LETTERS = 1
+LIFE = 2
+DEADLINE = 4
+
+MODES = (None, "basic", "intermediate")
+NO_DEADLINE = 0xFFFFFFFF
+
+FRAME = struct.Struct("<H")
+FULL_HEADER = struct.Struct("<BBbIIH")
+DELTA_HEADER = struct.Struct("<BB")
+MASK = struct.Struct("<I")
+LIFE_VALUE = struct.Struct("<b")
+
+LETTER_BITS = {letter: 1 << i for i, letter in enumerate(string.ascii_uppercase)}
+
+
+def letter_mask(letters):
+    """
+    Returns the 26-bit mask of the given letters.
+    """
+    mask = 0
+    for letter in letters:
+        mask |= LETTER_BITS.get(letter, 0)
+    return mask
+
+
+def mask_letters(mask):
+    """
+    Returns the letters of a mask, in alphabetical order.
+    """
+    return [letter for letter, bit in LETTER_BITS.items() if mask & bit]
+
+
+def pack_bitmap(bits, length):
+    return bits.to_bytes((length + 7) // 8, "little")
+
+
+def bitmap_positions(bits):
+    """
+    Returns the positions set in a bitmap, in order.
+    """
+    positions = []
+    while bits:
+        low = bits & -bits
+        positions.append(low.bit_length() - 1)
+        bits ^= low
+    return positions
+
+
+def deadline_ms(session):
+    if session.deadline is None:
+        return NO_DEADLINE
+    left = session.deadline - session.scheduler.clock()
+    return min(NO_DEADLINE - 1, max(0, math.ceil(left * 1000)))
+
+
+class StateEncoder:
+    """
+    Server side: turns a session's state into full or delta messages,
+    remembering what the client was last sent.
+    """
+
+    def __init__(self):
+        self.started = None
+        self.length = -1
+        self.guesses = 0
+        self.mask = 0
+        self.revealed = 0
+        self.life = None
+        self.deadline = None
+
+    def encode(self, session):
+        """
+        Returns the message bringing the client up to date with session,
+        or b"" when nothing changed since the last one.
+        """
+        if session.started != self.started or len(session.word_state) != self.length:
+            return self.full(session)
+        guesses = len(session.guessed_letters)
+        if (
+            guesses == self.guesses
+            and session.life_remaining == self.life
+            and session.deadline == self.deadline
+        ):
+            return b""
+
+        flags = 0
+        body = []
+        if guesses != self.guesses:
+            self.guesses = guesses
+            mask = letter_mask(session.guessed) & ~self.mask
+            if mask:
+                self.mask |= mask
+                revealed = 0
+                for letter in mask_letters(mask):
+                    for i in session.positions.get(letter, ()):
+                        revealed |= 1 << i
+                self.revealed |= revealed
+                word_state = session.word_state
+                flags |= LETTERS
+                body.append(MASK.pack(mask))
+                body.append(pack_bitmap(revealed, self.length))
+                body.append(
+                    "".join(word_state[i] for i in bitmap_positions(revealed)).encode()
+                )
+        if session.life_remaining != self.life:
+            self.life = session.life_remaining
+            flags |= LIFE
+            body.append(LIFE_VALUE.pack(self.life))
+        if session.deadline != self.deadline:
+            self.deadline = session.deadline
+            flags |= DEADLINE
+            body.append(MASK.pack(deadline_ms(session)))
+        if not flags:
+            return b""
+        return DELTA_HEADER.pack(DELTA, flags) + b"".join(body)
+
+    def full(self, session):
+        """
+        Returns a full state message and resets the delta baseline to it.
+        """
+        word_state = session.word_state
+        self.started = session.started
+        self.length = len(word_state)
+        self.guesses = len(session.guessed_letters)
+        self.mask = letter_mask(session.guessed)
+        self.life = session.life_remaining
+        self.deadline = session.deadline
+        self.revealed = 0
+        shown = []
+        for i, letter in enumerate(word_state):
+            if letter != "_":
+                self.revealed |= 1 << i
+                shown.append(letter)
+        return (
+            FULL_HEADER.pack(
+                FULL,
+                MODES.index(session.mode) if session.mode in MODES else 0,
+                self.life,
+                self.mask,
+                deadline_ms(session),
+                self.length,
+            )
+            + pack_bitmap(self.revealed, self.length)
+            + "".join(shown).encode()
+        )
+
+
+class StateDecoder:
+    """
+    Client side: rebuilds the state from the messages. Exposes the same
+    word_state, life_remaining and timeout attributes as core, so a
+    frontend can read it in place of the core module.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.mode = None
+        self.word_state = []
+        self.mask = 0
+        self.life_remaining = core.MAX_LIVES
+        self.deadline = None
+
+    @property
+    def guessed(self):
+        return mask_letters(self.mask)
+
+    @property
+    def timeout(self):
+        """
+        Whole seconds left before the turn runs out, as core.timeout.
+        """
+        if self.deadline is None:
+            return 0
+        return max(0, math.ceil(self.deadline - self.clock()))
+
+    def apply(self, message):
+        """
+        Applies one full or delta message.
+        """
+        if message[0] == FULL:
+            _, mode, life, mask, deadline, length = FULL_HEADER.unpack_from(message)
+            offset = FULL_HEADER.size
+            size = (length + 7) // 8
+            revealed = int.from_bytes(message[offset : offset + size], "little")
+            self.mode = MODES[mode] if mode < len(MODES) else None
+            self.word_state = ["_"] * length
+            self.reveal(revealed, message[offset + size :])
+            self.mask = mask
+            self.life_remaining = life
+            self.set_deadline(deadline)
+            return
+        _, flags = DELTA_HEADER.unpack_from(message)
+        offset = DELTA_HEADER.size
+        if flags & LETTERS:
+            (mask,) = MASK.unpack_from(message, offset)
+            self.mask |= mask
+            offset += MASK.size
+            size = (len(self.word_state) + 7) // 8
+            revealed = int.from_bytes(message[offset : offset + size], "little")
+            offset += size
+            # Each revealed character is one byte: guesses are A to Z
+            count = bin(revealed).count("1")
+            self.reveal(revealed, message[offset : offset + count])
+            offset += count
+        if flags & LIFE:
+            (self.life_remaining,) = LIFE_VALUE.unpack_from(message, offset)
+            offset += LIFE_VALUE.size
+        if flags & DEADLINE:
+            (deadline,) = MASK.unpack_from(message, offset)
+            self.set_deadline(deadline)
+
+    def reveal(self, revealed, characters):
+        word_state = self.word_state
+        for i, letter in zip(bitmap_positions(revealed), characters.decode()):
+            word_state[i] = letter
+
+    def set_deadline(self, milliseconds):
+        if milliseconds == NO_DEADLINE:
+            self.deadline = None
+        else:
+            self.deadline = self.clock() + milliseconds / 1000
+
+
+def read_messages(stream):
+    """
+    Removes and returns the complete framed messages at the start of a
+    bytearray stream.
+    """
+    messages = []
+    offset = 0
+    while len(stream) - offset >= FRAME.size:
+        (length,) = FRAME.unpack_from(stream, offset)
+        end = offset + FRAME.size + length
+        if end > len(stream):
+            break
+        messages.append(bytes(stream[offset + FRAME.size : end]))
+        offset = end
+    del stream[:offset]
+    return messages
+
+
+class LocalClient:
+    """
+    Stand-in for a remote frontend of one session: pump() encodes the
+    session's changes onto an in-memory stream and decodes them into view.
+    """
+
+    def __init__(self, session, clock=time.monotonic):
+        self.session = session
+        self.encoder = StateEncoder()
+        self.view = StateDecoder(clock)
+        self.stream = bytearray()
+        self.messages = 0
+        self.bytes_sent = 0
+
+    def pump(self):
+        """
+        Sends the session's changes, if any, and applies them to view.
+        """
+        message = self.encoder.encode(self.session)
+        if message:
+            self.stream += FRAME.pack(len(message)) + message
+            self.messages += 1
+            self.bytes_sent += FRAME.size + len(message)
+        for message in read_messages(self.stream):
+            self.view.apply(message)
@@ -0,0 +1,209 @@
+"""
+Statistics of finished games, kept in an SQLite database.
+
+record() copies what it needs from a finished session into an in-memory
+queue and returns; it never touches the database. A background thread
+(see groupcommit.py) commits everything queued since its last pass in one
+transaction, so a burst of finished games costs one commit. The database runs in WAL mode,
+so reading statistics never blocks the writer and the writer never blocks
+readers. A transaction that fails is logged and its games dropped; the
+thread keeps running and the next sync() raises the error.
+
+Tables:
+
+    games          one row per finished game: player, word, mode, number
+                   of guesses, wrong letters, seconds used and outcome
+    word_stats     totals per word, kept up to date in the same transaction
+    player_stats   totals per player, likewise
+
+The aggregate tables are indexed by what the queries sort on, so
+leaderboard() and hardest_words() read only the rows they return,
+however many games have been recorded.
+"""
+
+import sqlite3
+import threading
+import time
+
+from groupcommit import GroupCommitQueue
+
+# Seconds between background commits; games finished in that window share
+# one transaction
+FLUSH_INTERVAL = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    word TEXT NOT NULL,
+    mode TEXT,
+    guesses INTEGER NOT NULL,
+    wrong_letters TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    won INTEGER NOT NULL,
+    finished REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS word_stats (
+    word TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    wrong INTEGER NOT NULL,
+    seconds REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS word_stats_loss_rate
+    ON word_stats (CAST(losses AS REAL) / games);
+CREATE TABLE IF NOT EXISTS player_stats (
+    player TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    wrong INTEGER NOT NULL,
+    seconds REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS player_stats_wins ON player_stats (wins);
+"""
+
+INSERT_GAME = """
+INSERT INTO games (player, word, mode, guesses, wrong_letters, seconds, won, finished)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_WORD = """
+INSERT INTO word_stats (word, games, losses, wrong, seconds) VALUES (?, 1, ?, ?, ?)
+ON CONFLICT (word) DO UPDATE SET
+    games = games + 1,
+    losses = losses + excluded.losses,
+    wrong = wrong + excluded.wrong,
+    seconds = seconds + excluded.seconds
+"""
+
+UPDATE_PLAYER = """
+INSERT INTO player_stats (player, games, wins, wrong, seconds) VALUES (?, 1, ?, ?, ?)
+ON CONFLICT (player) DO UPDATE SET
+    games = games + 1,
+    wins = wins + excluded.wins,
+    wrong = wrong + excluded.wrong,
+    seconds = seconds + excluded.seconds
+"""
+
+
+def connect(path):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # In WAL mode a commit only waits for the log write, not an fsync;
+    # a crash can lose the last commits but never corrupts the database
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class StatsStore:
+    """
+    Records finished games to the database at path. record() only queues;
+    a background thread owns the writing connection.
+    """
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._writer = connect(path)
+        self._writer.executescript(SCHEMA)
+        self._reader = connect(path)
+        self._read_lock = threading.Lock()
+        self._queue = GroupCommitQueue(self._commit, flush_interval, __name__)
+
+    def record(self, session, won, player="player"):
+        """
+        Queues the game session just finished. Call it before the session
+        is reset, while its word and guesses are still there.
+        """
+        started = session.started
+        seconds = time.monotonic() - started if started is not None else 0.0
+        self._queue.append(
+            (
+                player,
+                session.current_word,
+                session.mode,
+                len(session.guessed_letters),
+                "".join(session.wrong_letters),
+                seconds,
+                int(bool(won)),
+                time.time(),
+            )
+        )
+
+    def sync(self):
+        """
+        Blocks until every game queued so far is committed. Raises the
+        error of a commit that failed since the last sync.
+        """
+        self._queue.sync()
+
+    def close(self):
+        """
+        Commits the queue and stops the background thread.
+        """
+        if self._queue.closed:
+            return
+        self._queue.close()
+        self._writer.close()
+        self._reader.close()
+
+    # Queries
+
+    def _query(self, sql, parameters=()):
+        with self._read_lock:
+            return self._reader.execute(sql, parameters).fetchall()
+
+    def leaderboard(self, limit=10):
+        """
+        Returns (player, wins, games) of the players with the most wins.
+        """
+        return self._query(
+            "SELECT player, wins, games FROM player_stats "
+            "ORDER BY wins DESC LIMIT ?",
+            (limit,),
+        )
+
+    def hardest_words(self, limit=10, min_games=5):
+        """
+        Returns (word, loss rate, games) of the words lost most often,
+        among those played at least min_games times.
+        """
+        return self._query(
+            "SELECT word, CAST(losses AS REAL) / games, games FROM word_stats "
+            "WHERE games >= ? ORDER BY CAST(losses AS REAL) / games DESC LIMIT ?",
+            (min_games, limit),
+        )
+
+    def player(self, player):
+        """
+        Returns (games, wins, wrong guesses, seconds) of a player, or None.
+        """
+        rows = self._query(
+            "SELECT games, wins, wrong, seconds FROM player_stats WHERE player = ?",
+            (player,),
+        )
+        return rows[0] if rows else None
+
+    def word(self, word):
+        """
+        Returns (games, losses, wrong guesses, seconds) of a word, or None.
+        """
+        rows = self._query(
+            "SELECT games, losses, wrong, seconds FROM word_stats WHERE word = ?",
+            (word,),
+        )
+        return rows[0] if rows else None
+
+    # Background thread
+
+    def _commit(self, games):
+        with self._writer:
+            self._writer.executemany(INSERT_GAME, games)
+            self._writer.executemany(
+                UPDATE_WORD,
+                [(g[1], 1 - g[6], len(g[4]), g[5]) for g in games],
+            )
+            self._writer.executemany(
+                UPDATE_PLAYER,
+                [(g[0], g[6], len(g[4]), g[5]) for g in games],
+            )
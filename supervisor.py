@@ -0,0 +1,332 @@
+"""
+Multi-process sharded hangman server.
+
+The supervisor loads the word and phrase datasets (and their difficulty
+indexes) once, then forks one worker process per shard. The compiled word
+lists are memory mapped and the rest is shared copy-on-write, so every
+worker reads the same single copy of the dictionaries.
+
+The supervisor owns the listening socket. For each connection it reads the
+first line; if that is {"op": "hello", "session": ID} the session is routed
+by ID, otherwise a fresh ID is made up. The connected socket and the bytes
+read so far are then handed to the worker owning ID on a consistent hash
+ring, which runs a server.HangmanServer over it. The same ID always lands
+on the same shard, and the ring stays fixed when a worker dies: the worker
+is restarted in its slot and the other shards never notice. With --log DIR
+each shard keeps its event log in DIR/shard-N, so a restarted worker
+recovers the sessions of its shard and their clients can resume them.
+With --pool N every worker keeps N ready-made games per mode.
+
+Usage: python supervisor.py --workers 4 [--host 127.0.0.1] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import bisect
+import gc
+import hashlib
+import json
+import multiprocessing
+import os
+import selectors
+import signal
+import socket
+import time
+import uuid
+
+import core
+import eventlog
+import pool
+import server
+
+# Points per shard on the hash ring; more points spread sessions more evenly
+VIRTUAL_NODES = 64
+
+# Seconds a new connection gets to send its first line
+HELLO_TIMEOUT = 1.0
+
+# Largest handoff message: the session header plus the buffered first line
+HANDOFF_SIZE = server.MAX_LINE + 8192
+
+
+def hash_key(key):
+    """
+    Returns a stable 64-bit hash of a key (the same in every process).
+    """
+    digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to shards. Adding a shard moves only
+    the keys that the new shard takes over.
+    """
+
+    def __init__(self, shards, replicas=VIRTUAL_NODES):
+        points = sorted(
+            (hash_key(f"{shard}:{replica}"), shard)
+            for shard in shards
+            for replica in range(replicas)
+        )
+        self.hashes = [point[0] for point in points]
+        self.shards = [point[1] for point in points]
+
+    def shard(self, key):
+        """
+        Returns the shard owning key.
+        """
+        index = bisect.bisect(self.hashes, hash_key(key)) % len(self.hashes)
+        return self.shards[index]
+
+
+def load_datasets():
+    """
+    Loads the word and phrase lists and their difficulty indexes into core.
+    """
+    import word_index
+
+    core.load_words()
+    core.load_phrases()
+    for path in (core.WORDS_PATH, core.PHRASES_PATH):
+        if path not in core.indexes:
+            core.indexes[path] = word_index.load(path)
+
+
+def session_for(line):
+    """
+    Returns the session ID named by a hello line, or None.
+    """
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(request, dict) and request.get("op") == "hello":
+        session_id = request.get("session")
+        if isinstance(session_id, str) and session_id:
+            return session_id
+    return None
+
+
+async def adopt(loop, hangman, sock, session_id, pending):
+    """
+    Serves a socket handed over by the supervisor, replaying the bytes the
+    supervisor already read from it.
+    """
+    _, protocol = await loop.connect_accepted_socket(
+        lambda: server.HangmanProtocol(hangman, session_id), sock
+    )
+    if pending:
+        protocol.data_received(pending)
+
+
+async def run_worker(control, log=None):
+    """
+    Worker event loop: serves sockets received on the control socket until
+    the supervisor goes away.
+    """
+    loop = asyncio.get_running_loop()
+    hangman = server.HangmanServer(loop, log)
+    stopped = loop.create_future()
+
+    def receive():
+        while True:
+            try:
+                data, fds, _, _ = socket.recv_fds(control, HANDOFF_SIZE, 1)
+            except BlockingIOError:
+                return
+            if not data:
+                if not stopped.done():
+                    stopped.set_result(None)
+                return
+            header, _, pending = data.partition(b"\n")
+            session_id = json.loads(header)["session"]
+            for fd in fds:
+                sock = socket.socket(fileno=fd)
+                loop.create_task(adopt(loop, hangman, sock, session_id, pending))
+
+    control.setblocking(False)
+    loop.add_reader(control.fileno(), receive)
+    await stopped
+
+
+class Supervisor:
+    """
+    Accepts connections and routes them to forked worker processes.
+    """
+
+    def __init__(
+        self, workers, host="127.0.0.1", port=8765, log_directory=None, pool_size=0
+    ):
+        self.log_directory = log_directory
+        self.pool_size = pool_size
+        self.ring = HashRing(range(workers))
+        self.listener = socket.create_server((host, port), backlog=4096)
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        self.selector = selectors.DefaultSelector()
+        self.workers = [None] * workers  # slot -> (process, control socket)
+        self.pending = {}  # socket -> [bytes read, deadline]
+        self.restarts = 0
+        self.running = False
+        self._context = multiprocessing.get_context("fork")
+
+    def start(self):
+        """
+        Loads the datasets and forks the workers.
+        """
+        load_datasets()
+        # Keep the loaded data out of the cyclic collector, whose bookkeeping
+        # would otherwise write to (and so copy) those pages in every worker
+        gc.freeze()
+        for slot in range(len(self.workers)):
+            self.spawn(slot)
+        self.selector.register(self.listener, selectors.EVENT_READ, self.accept)
+
+    def spawn(self, slot):
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        process = self._context.Process(
+            target=self._worker_main, args=(child, slot), daemon=True
+        )
+        process.start()
+        child.close()
+        parent.setblocking(False)
+        self.workers[slot] = (process, parent)
+        self.selector.register(process.sentinel, selectors.EVENT_READ, self.reap)
+
+    def _worker_main(self, control, slot):
+        # Drop the supervisor's sockets inherited through fork, so the worker
+        # sees end of file on its control socket when the supervisor exits
+        self.selector.close()
+        self.listener.close()
+        for sock in self.pending:
+            sock.close()
+        for worker in self.workers:
+            if worker is not None:
+                worker[1].close()
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        log = None
+        if self.log_directory:
+            log = eventlog.EventLog(os.path.join(self.log_directory, f"shard-{slot}"))
+        # Threads do not survive fork, so each worker starts its own pool
+        if self.pool_size:
+            pool.start(self.pool_size)
+        try:
+            asyncio.run(run_worker(control, log))
+        finally:
+            if log is not None:
+                log.close()
+
+    def reap(self, sentinel):
+        """
+        Restarts the worker whose process exited; other shards are untouched.
+        """
+        self.selector.unregister(sentinel)
+        for slot, (process, control) in enumerate(self.workers):
+            if process.sentinel == sentinel:
+                process.join()
+                control.close()
+                if self.running:
+                    self.restarts += 1
+                    self.spawn(slot)
+                return
+
+    def accept(self, listener):
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            self.pending[sock] = [b"", time.monotonic() + HELLO_TIMEOUT]
+            self.selector.register(sock, selectors.EVENT_READ, self.read_hello)
+
+    def read_hello(self, sock):
+        try:
+            data = sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.drop(sock)
+            return
+        entry = self.pending[sock]
+        entry[0] += data
+        if b"\n" in entry[0] or len(entry[0]) > server.MAX_LINE:
+            self.route(sock)
+
+    def expire_hellos(self):
+        now = time.monotonic()
+        for sock in [sock for sock, entry in self.pending.items() if entry[1] <= now]:
+            self.route(sock)
+
+    def route(self, sock):
+        """
+        Hands a connection to the worker owning its session.
+        """
+        pending = self.pending[sock][0]
+        session_id = session_for(pending.partition(b"\n")[0]) or uuid.uuid4().hex
+        _, control = self.workers[self.ring.shard(session_id)]
+        header = json.dumps({"session": session_id}).encode()
+        try:
+            socket.send_fds(control, [header + b"\n" + pending], [sock.fileno()])
+        except OSError:
+            pass  # A busy or dead worker costs this connection only
+        self.drop(sock)
+
+    def drop(self, sock):
+        self.selector.unregister(sock)
+        del self.pending[sock]
+        sock.close()
+
+    def serve_forever(self, poll_interval=0.1):
+        self.running = True
+        while self.running:
+            for key, _ in self.selector.select(poll_interval):
+                key.data(key.fileobj)
+            if self.pending:
+                self.expire_hellos()
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        """
+        Stops the workers and closes every socket.
+        """
+        self.running = False
+        for process, control in self.workers:
+            control.close()
+            process.terminate()
+        for process, _ in self.workers:
+            process.join()
+        for sock in list(self.pending):
+            self.drop(sock)
+        self.selector.close()
+        self.listener.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the sharded hangman server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--log", help="directory of the per-shard event logs")
+    parser.add_argument(
+        "--pool", type=int, default=0, help="ready-made games kept per mode per worker"
+    )
+    args = parser.parse_args()
+
+    supervisor = Supervisor(args.workers, args.host, args.port, args.log, args.pool)
+    supervisor.start()
+    signal.signal(signal.SIGTERM, lambda signum, frame: supervisor.stop())
+    host, port = supervisor.address[:2]
+    print(f"listening on {host}:{port} with {args.workers} workers", flush=True)
+    try:
+        supervisor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.close()
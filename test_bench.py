@@ -0,0 +1,54 @@
+import threading
+import unittest
+import bench
+
+
+# Test suite for the benchmark runner
+class TestBench(unittest.TestCase):
+
+    def test_run_reports_metrics(self):
+        # Each benchmark reports positive timings in its own namespace
+        metrics = bench.run(["guess", "dataset"])
+        self.assertIn("guess.word8.ns", metrics)
+        self.assertIn("dataset.text.us", metrics)
+        self.assertTrue(all(value > 0 for value in metrics.values()))
+
+    def test_import_times_are_reported(self):
+        # Each headless module gets an import time metric
+        metrics = bench.bench_imports(1)
+        self.assertEqual(
+            set(metrics), {f"import.{m}.us" for m in bench.HEADLESS_MODULES}
+        )
+        self.assertTrue(all(value > 0 for value in metrics.values()))
+
+    def test_timers_leave_no_threads(self):
+        # Every threaded scheduler the benchmark starts is stopped again
+        threads = threading.active_count()
+        bench.run(["timers"])
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_thresholds_are_maxima(self):
+        # Only metrics above their maximum fail
+        failures = bench.check(
+            {"guess.word8.ns": 900.0, "guess.word4.ns": 100.0},
+            {"guess.word8.ns": {"max": 500}, "guess.word4.ns": {"max": 500}},
+        )
+        self.assertEqual(len(failures), 1)
+        self.assertIn("guess.word8.ns", failures[0])
+
+    def test_baseline_tolerance(self):
+        # A metric may be slower than its baseline only within the tolerance
+        baseline = {"frame.draw.us": 100.0}
+        self.assertEqual(bench.check({"frame.draw.us": 120.0}, {}, baseline, 0.25), [])
+        self.assertEqual(
+            len(bench.check({"frame.draw.us": 130.0}, {}, baseline, 0.25)), 1
+        )
+
+    def test_synthetic_entries(self):
+        # Phrases are split into words by spaces
+        self.assertEqual(len(bench.synthetic_entry(16, 2)), 16)
+        self.assertEqual(bench.synthetic_entry(16, 2).count(" "), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
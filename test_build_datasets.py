@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import build_datasets
+import word_index
+import wordlist
+
+
+# Test suite for the dataset build pipeline
+class TestBuildDatasets(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, "source.txt")
+        with open(self.source, "w") as f:
+            f.write("python\r\nHangman\r\nhangman\r\nelephant\r\nso-called\r\nzone")
+        self.targets = {"long": {"source": "source.txt", "min_length": 7}}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def build(self, **kwargs):
+        return build_datasets.build(
+            directory=self.directory.name,
+            targets=self.targets,
+            compile_only=[],
+            **kwargs,
+        )
+
+    def read_output(self):
+        with open(os.path.join(self.directory.name, "long.txt")) as f:
+            return f.read().splitlines()
+
+    def test_filters_and_dedupes(self):
+        # Short entries are dropped and duplicates ignore case
+        self.assertEqual(self.build(), ["long"])
+        self.assertEqual(self.read_output(), ["Hangman", "elephant", "so-called"])
+        compiled = wordlist.load(os.path.join(self.directory.name, "long.txt"))
+        self.assertIsInstance(compiled, wordlist.WordList)
+        self.assertEqual(list(compiled), self.read_output())
+        compiled.close()
+
+    def test_charset_filter(self):
+        # Entries with characters outside the charset are dropped
+        self.targets["long"]["charset"] = "a-z"
+        self.build()
+        self.assertEqual(self.read_output(), ["hangman", "elephant"])
+
+    def test_incremental_rebuild(self):
+        # A second run with unchanged inputs does nothing
+        self.assertEqual(self.build(), ["long"])
+        self.assertEqual(self.build(), [])
+        with open(self.source, "a") as f:
+            f.write("\r\nabandoned")
+        self.assertEqual(self.build(), ["long"])
+        self.assertEqual(self.read_output()[-1], "abandoned")
+        self.assertEqual(self.build(force=True), ["long"])
+
+    def test_tier_filter(self):
+        # Only entries of the requested tiers are kept
+        self.targets["long"]["tiers"] = ["medium"]
+        self.build()
+        self.assertEqual(self.read_output(), ["Hangman"])
+
+    def test_writes_difficulty_index(self):
+        # Every built target gets a difficulty index
+        self.build()
+        text_path = os.path.join(self.directory.name, "long.txt")
+        self.assertIsNotNone(word_index.load(text_path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,323 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import pygame
+    import asset_cache
+    import components
+    import core
+    import main
+    import metrics
+    import stats
+    import statesync
+    from scheduler import VirtualScheduler
+except ImportError:  # pygame is only needed by the display frontend
+    pygame = None
+
+
+# Test suite for the pygame components
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+        self.fonts = components.FontRegistry()
+
+    def test_font_registry_reuses_fonts(self):
+        # The same path and size give the same font object
+        self.assertIs(self.fonts.get(None, 24), self.fonts.get(None, 24))
+        self.assertIsNot(self.fonts.get(None, 24), self.fonts.get(None, 20))
+
+    def test_text_cache_hits(self):
+        # Rendering the same text twice returns the cached surface
+        cache = components.TextCache()
+        font = self.fonts.get(None, 24)
+        first = cache.render(font, "Lives: 6", (255, 100, 100))
+        self.assertIs(cache.render(font, "Lives: 6", (255, 100, 100)), first)
+        self.assertIsNot(cache.render(font, "Lives: 5", (255, 100, 100)), first)
+
+    def test_text_cache_evicts_least_recently_used(self):
+        # Past max_size the oldest unused entry is dropped
+        cache = components.TextCache(max_size=2)
+        font = self.fonts.get(None, 24)
+        first = cache.render(font, "a", "white")
+        cache.render(font, "b", "white")
+        cache.render(font, "a", "white")
+        cache.render(font, "c", "white")
+        self.assertEqual(len(cache.surfaces), 2)
+        self.assertIs(cache.render(font, "a", "white"), first)
+        self.assertNotIn((font, "b", "white", True), cache.surfaces)
+
+
+# Test suite for the pre-baked letter tile atlas
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestLetterAtlas(unittest.TestCase):
+
+    def setUp(self):
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+        self.sheet = components.ScrabbleLetterSheet("./assets/letters.png")
+
+    def test_tiles_are_views_of_the_atlas(self):
+        # Tiles share the atlas pixels instead of owning copies
+        tile = self.sheet.get_tile("q", "disabled")
+        self.assertIs(tile.get_parent(), self.sheet.atlas)
+        self.assertEqual(tile.get_size(), self.sheet.tile_size)
+
+    def test_button_switches_variants_without_copies(self):
+        # Once faded in, an unchanged tile keeps its image and stays clean
+        button = components.LetterButton(self.sheet, (100, 100), "A")
+        for _ in range(40):
+            button.update()
+        image = button.image
+        button.dirty = False
+        button.update()
+        self.assertIs(button.image, image)
+        self.assertFalse(button.dirty)
+
+        button.disabled = True
+        button.update()
+        self.assertIs(button.image, button.images["disabled"])
+        self.assertEqual(button.image.get_alpha(), 255)
+        self.assertTrue(button.dirty)
+
+
+# Test suite for the decoded-asset cache
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestAssetCache(unittest.TestCase):
+
+    def setUp(self):
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = asset_cache.CACHE_DIR
+        asset_cache.CACHE_DIR = os.path.join(self.directory.name, "cache")
+        self.source = os.path.join(self.directory.name, "tile.png")
+        self.save_source((255, 0, 0, 128))
+
+    def tearDown(self):
+        asset_cache.CACHE_DIR = self.cache_dir
+        self.directory.cleanup()
+
+    def save_source(self, color):
+        surface = pygame.Surface((4, 3), pygame.SRCALPHA)
+        surface.fill(color)
+        pygame.image.save(surface, self.source)
+
+    def test_second_load_reads_cache(self):
+        # The bake step only runs while the cache is cold
+        calls = []
+
+        def bake(path):
+            calls.append(path)
+            return pygame.image.load(path)
+
+        first = asset_cache.load(self.source, "test", bake)
+        second = asset_cache.load(self.source, "test", bake)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second.get_size(), (4, 3))
+        self.assertEqual(second.get_at((1, 1)), first.get_at((1, 1)))
+
+    def test_changed_source_is_rebaked(self):
+        # Editing the source file changes its cache key
+        old_path = asset_cache.cache_path(self.source, "test")
+        asset_cache.load(self.source, "test")
+        self.save_source((0, 255, 0, 255))
+        self.assertNotEqual(asset_cache.cache_path(self.source, "test"), old_path)
+        surface = asset_cache.load(self.source, "test")
+        self.assertEqual(surface.get_at((0, 0)), (0, 255, 0, 255))
+
+
+# Test suite for the persistent word line
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestUnderscores(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+        self.font = pygame.font.Font("./assets/font.ttf", 36)
+        self.cache = components.TextCache()
+
+    def pixels(self, underscores):
+        return pygame.image.tobytes(underscores.line, "RGBA")
+
+    def test_glyphs_rendered_once(self):
+        # Repeated letters share one cached glyph; guesses only add new ones
+        underscores = components.Underscores(list("___ ___"), self.font, self.cache)
+        self.assertEqual(len(self.cache.surfaces), 2)
+        underscores.update(list("A__ _A_"))
+        self.assertEqual(len(self.cache.surfaces), 3)
+
+    def test_update_matches_fresh_line(self):
+        # Revealing positions in place gives the same pixels as a new line,
+        # even where wide glyphs overlap their neighbours
+        underscores = components.Underscores(list("_______"), self.font, self.cache)
+        for state in ["_A___A_", "HA___AN", "HANGMAN"]:
+            self.assertTrue(underscores.update(list(state)))
+            fresh = components.Underscores(list(state), self.font, self.cache)
+            self.assertEqual(self.pixels(underscores), self.pixels(fresh))
+
+    def test_unchanged_word_is_not_repainted(self):
+        # Frames without a guess leave the line untouched
+        underscores = components.Underscores(list("____"), self.font, self.cache)
+        line = underscores.line
+        self.assertFalse(underscores.update(list("____")))
+        self.assertIs(underscores.line, line)
+        underscores.update(list("______"))
+        self.assertEqual(underscores.get_rect().width, 7 * underscores.spacing)
+
+
+# Test suite for the event-driven main loop
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestEventLoop(unittest.TestCase):
+
+    def setUp(self):
+        if main.screen is None:
+            main.init_display()
+        core.words = ["python"]
+        self.timers = VirtualScheduler()
+        core.session.scheduler = self.timers
+        self.game = main.Game()
+        self.overlay = components.MetricsOverlay(main.font, (0, 0))
+
+    def tearDown(self):
+        core.game_over()
+        self.game.schedule_tick()
+        core.session.scheduler = core.timers
+
+    def start_game(self):
+        core.session.setup("basic")
+        self.game.state = core.GAME
+        self.game.create_letter_buttons()
+
+    def test_menu_blocks_on_events(self):
+        # Nothing animates on the menu, so the loop waits without a timeout
+        self.assertIsNone(main.wait_timeout(self.game, self.overlay))
+        self.overlay.toggle()
+        self.assertEqual(main.wait_timeout(self.game, self.overlay), 250)
+
+    def test_fade_in_wakes_every_frame(self):
+        # Letter buttons fading in keep the loop running at the frame rate
+        self.start_game()
+        self.assertEqual(main.wait_timeout(self.game, self.overlay), main.FRAME_MS)
+        for _ in range(40):
+            self.game.update()
+        self.assertIsNone(main.wait_timeout(self.game, self.overlay))
+
+    def test_tick_armed_for_countdown_change(self):
+        # The tick fires when the displayed countdown next changes
+        self.start_game()
+        self.timers.advance(0.25)
+        self.game.schedule_tick()
+        self.assertEqual(self.game.tick_ms, 750)
+        core.game_over()
+        self.game.state = core.MENU
+        self.game.schedule_tick()
+        self.assertIsNone(self.game.tick_ms)
+
+    def test_only_changed_regions_are_repainted(self):
+        # A countdown tick and a guess repaint the HUD, the word line and
+        # the clicked tile separately, not their bounding box
+        self.start_game()
+        for _ in range(40):
+            self.game.update()
+        self.game.render(main.screen)
+        tile = next(b for b in self.game.letter_buttons if b.letter == "P")
+        rects = [main.HUD_RECT, self.game.underscores.get_rect(), tile.rect]
+        box = rects[0].unionall(rects[1:])
+        marker = next(
+            (x, y)
+            for x in range(box.left, box.right, 10)
+            for y in range(box.top, box.bottom, 10)
+            if pygame.Rect(x, y, 1, 1).collidelist(rects) == -1
+            and not self.game.hangman_rect.collidepoint(x, y)
+        )
+        main.screen.set_at(marker, (255, 0, 255))
+
+        self.timers.advance(1)
+        self.game.update()
+        self.game.handle_events(
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=tile.rect.center)
+        )
+        self.game.update()
+        dirty_rects = self.game.render(main.screen)
+        self.assertEqual(len(dirty_rects), 3)
+        self.assertEqual(pygame.Rect(marker, (1, 1)).collidelist(dirty_rects), -1)
+        self.assertEqual(main.screen.get_at(marker), (255, 0, 255))
+
+    def test_overlapping_rects_are_merged(self):
+        # Only rects that overlap are combined
+        merged = main.merge_overlapping(
+            [pygame.Rect(0, 0, 10, 10), pygame.Rect(100, 0, 10, 10), (5, 5, 10, 10)]
+        )
+        self.assertEqual(
+            merged, [pygame.Rect(100, 0, 10, 10), pygame.Rect(0, 0, 15, 15)]
+        )
+
+    def test_renders_from_state_stream(self):
+        # A game given a local client reads its state from the decoded stream
+        client = statesync.LocalClient(core.session, self.timers.clock)
+        self.game = main.Game(client)
+        self.start_game()
+        self.game.update()
+        core.guess_letters("Z")
+        self.timers.advance(2.5)
+        self.game.update()
+        self.assertEqual(self.game.word_state, ["_"] * 6)
+        self.assertEqual(self.game.mistakes, 1)
+        self.assertEqual(self.game.timeout, str(core.timeout))
+        self.assertEqual(client.messages, 2)
+
+    def test_overlay_counts_its_surfaces(self):
+        # Refreshing the overlay creates its surface and one per text line
+        frame = metrics.GameInstruments(metrics.Registry())
+        before = components.surfaces_created
+        self.overlay.toggle()
+        self.overlay.draw(main.screen, frame, None)
+        self.assertEqual(components.surfaces_created - before, 1 + 3)
+        self.assertIsNone(self.overlay.draw(main.screen, frame, None))
+        self.assertEqual(components.surfaces_created - before, 1 + 3)
+
+    def test_won_game_is_recorded(self):
+        # Finishing a game queues it to the statistics store
+        with tempfile.TemporaryDirectory() as directory:
+            main.stats_store = stats.StatsStore(os.path.join(directory, "stats.db"))
+            try:
+                self.start_game()
+                buttons = {button.letter: button for button in self.game.letter_buttons}
+                for letter in "PYTHON":
+                    self.game.handle_events(
+                        pygame.event.Event(
+                            pygame.MOUSEBUTTONDOWN,
+                            button=1,
+                            pos=buttons[letter].rect.center,
+                        )
+                    )
+                self.assertEqual(self.game.state, core.MENU)
+                main.stats_store.sync()
+                self.assertEqual(main.stats_store.word("python")[:3], (1, 0, 0))
+            finally:
+                main.stats_store.close()
+                main.stats_store = None
+
+
+    def test_timed_out_game_is_recorded(self):
+        # Losing the last life to the timer ends and records the game
+        with tempfile.TemporaryDirectory() as directory:
+            main.stats_store = stats.StatsStore(os.path.join(directory, "stats.db"))
+            try:
+                self.start_game()
+                core.session.life_remaining = 1
+                self.timers.advance(core.TURN_SECONDS)
+                self.game.handle_events(pygame.event.Event(main.TIMER_EXPIRED))
+                self.assertEqual(self.game.state, core.GAMEOVER)
+                main.stats_store.sync()
+                self.assertEqual(main.stats_store.word("python")[:2], (1, 1))
+            finally:
+                main.stats_store.close()
+                main.stats_store = None
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import collections
+import os
+import random
+import tempfile
+import threading
+import unittest
+import core
+import corpus
+
+
+# Test suite for the streaming corpus source
+class TestCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "corpus.txt")
+        with open(self.path, "w") as f:
+            for i in range(200):
+                suffix = "".join(chr(ord("a") + i // 26 ** p % 26) for p in range(2))
+                f.write(f"longword{suffix}\nshort\n\nword{i:04d}\nlong words\n")
+
+    def tearDown(self):
+        corpus.stop("basic")
+        self.directory.cleanup()
+
+    def test_reservoir_is_uniform(self):
+        # Every entry of the stream is equally likely to be sampled
+        rng = random.Random(1)
+        counts = collections.Counter()
+        for _ in range(2000):
+            counts.update(corpus.reservoir_sample(map(str, range(100)), 10, rng))
+        self.assertEqual(len(counts), 100)
+        self.assertGreater(min(counts.values()), 150)
+        self.assertLess(max(counts.values()), 250)
+
+    def test_reservoir_holds_distinct_entries(self):
+        # An entry equal to one in the reservoir, ignoring case, is skipped
+        sample = corpus.reservoir_sample(["Hangman", "hangman", "HANGMAN", "zoo"], 3)
+        self.assertEqual(sorted(sample), ["Hangman", "zoo"])
+        stream = (f"word{i % 7}" for i in range(10000))
+        self.assertEqual(len(corpus.reservoir_sample(stream, 5)), 5)
+
+    def test_pass_applies_dataset_filters(self):
+        # Lines are filtered like cleaned_data.txt, letters only, and the
+        # batch holds k of them
+        source = corpus.CorpusSource(self.path, k=20, seed=3)
+        batch = source.sample()
+        self.assertEqual(len(batch), 20)
+        self.assertTrue(all(entry.startswith("longword") for entry in batch))
+
+    def test_choose_word_streams_batches(self):
+        # core.choose_word hands out the batch, then the next pass
+        source = corpus.start(self.path, "basic", k=5)
+        words = [core.choose_word() for _ in range(5)]
+        self.assertEqual(len(set(words)), 5)
+        # The next pass started at the low watermark
+        source.stop()
+        self.assertEqual(source.passes, 2)
+        self.assertEqual(len(set(core.choose_word() for _ in range(5))), 5)
+        corpus.stop("basic")
+        self.assertIsNone(core.word_source)
+
+    def test_choose_never_waits_for_the_reader(self):
+        # A used up batch is drawn from again while the next pass runs
+        source = corpus.CorpusSource(self.path, k=4).start()
+        first = set(source.batch)
+        release = threading.Event()
+        source.sample = lambda: release.wait() and ["fromnextpass"]
+        picks = [source.choose() for _ in range(10)]
+        self.assertEqual(set(picks[:4]), first)
+        self.assertTrue(set(picks[4:]) <= first)
+        release.set()
+        source.stop()
+        self.assertEqual(source.choose(), "fromnextpass")
+
+
+if __name__ == "__main__":
+    unittest.main()
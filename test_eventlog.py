@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import core
+import eventlog
+from scheduler import NO_TIMERS
+
+
+# Test suite for the session event log
+class TestEventLog(unittest.TestCase):
+
+    def setUp(self):
+        core.words = ["python"]
+        core.phrases = ["machine learning"]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+        self.log = eventlog.EventLog(self.directory)
+        self.sessions = core.SessionManager(NO_TIMERS, self.log)
+
+    def tearDown(self):
+        self.log.close()
+        self.tmp.cleanup()
+
+    def recover(self):
+        self.log.sync()
+        recovered = core.SessionManager(NO_TIMERS)
+        replayed = eventlog.recover(self.directory, recovered)
+        return recovered, replayed
+
+    def assertSameState(self, session, other):
+        self.assertEqual(other.mode, session.mode)
+        self.assertEqual(other.current_word, session.current_word)
+        self.assertEqual(other.word_state, session.word_state)
+        self.assertEqual(other.guessed_letters, session.guessed_letters)
+        self.assertEqual(other.wrong_letters, session.wrong_letters)
+        self.assertEqual(other.life_remaining, session.life_remaining)
+        self.assertEqual(other.remaining, session.remaining)
+
+    def test_replay_restores_sessions(self):
+        # Setup, guesses and timer expiries are replayed in order
+        session = self.sessions.create("basic")
+        for letter in "PXZ":
+            session.guess_letters(letter)
+        session.countdown()
+        phrase = self.sessions.create(session_id="player")
+        phrase.setup("intermediate")
+        phrase.guess_letters("A")
+
+        recovered, replayed = self.recover()
+        self.assertEqual(replayed, 7)
+        self.assertSameState(session, recovered.get(session.session_id))
+        self.assertSameState(phrase, recovered.get("player"))
+        self.assertEqual(recovered.get(session.session_id).life_remaining, 3)
+
+    def test_default_manager_keeps_its_timers(self):
+        # Sessions recovered into a default manager go back to core.timers
+        session = self.sessions.create("basic")
+        self.log.sync()
+        recovered = core.SessionManager()
+        eventlog.recover(self.directory, recovered)
+        restored = recovered.get(session.session_id)
+        self.assertIs(restored.scheduler, core.timers)
+        restored.guess_letters("Y")
+        self.assertEqual(restored.word_state, list("_Y____"))
+        recovered.close(session.session_id)
+
+    def test_failed_write_keeps_writer(self):
+        # A failed fsync is reported by sync, and later records still land
+        session = self.sessions.create("basic")
+        segment = self.log.segment
+        with mock.patch("eventlog.os.fsync", side_effect=OSError("I/O error")):
+            with self.assertLogs("eventlog", "ERROR"):
+                with self.assertRaises(OSError):
+                    self.log.sync()
+        self.assertEqual(self.log.segment, segment + 1)
+        session.guess_letters("Y")
+        recovered, _ = self.recover()
+        self.assertEqual(recovered.get(session.session_id).word_state, list("_Y____"))
+
+    def test_closed_sessions_are_not_recovered(self):
+        # A closed session is dropped from the recovered state
+        session = self.sessions.create("basic")
+        self.sessions.close(session.session_id)
+        recovered, _ = self.recover()
+        self.assertEqual(len(recovered), 0)
+
+    def test_snapshot_limits_replay_to_tail(self):
+        # After a snapshot only the newer records are replayed
+        session = self.sessions.create("basic")
+        for letter in "PYT":
+            session.guess_letters(letter)
+        self.sessions.snapshot()
+        session.guess_letters("Q")
+
+        recovered, replayed = self.recover()
+        self.assertEqual(replayed, 1)
+        self.assertEqual(len(eventlog.segments(self.directory)), 1)
+        self.assertSameState(session, recovered.get(session.session_id))
+
+    def test_torn_record_is_ignored(self):
+        # A partly written record at the end of the log is skipped
+        session = self.sessions.create("basic")
+        session.guess_letters("P")
+        self.log.sync()
+        _, path = eventlog.segments(self.directory)[-1]
+        with open(path, "ab") as f:
+            f.write(eventlog.frame(b"\x02\x00")[:-1])
+        recovered, replayed = self.recover()
+        self.assertEqual(replayed, 2)
+        self.assertSameState(session, recovered.get(session.session_id))
+
+    def test_records_share_fsyncs(self):
+        # Records queued together are written with a single fsync
+        session = self.sessions.create("basic")
+        with mock.patch("eventlog.os.fsync", wraps=os.fsync) as fsync:
+            for _ in range(1000):
+                session.guess_letters("X")
+            self.log.sync()
+        self.assertLess(fsync.call_count, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
-import time
 import core  # assume your code is saved in core.py
+import word_index
+from scheduler import TimerScheduler, VirtualScheduler
 
 
 # Test suite for the core Hangman game logic
@@ -10,8 +11,15 @@ class TestWordcore(unittest.TestCase):
         # Set up test data and reset game state before each test
         core.words = ["python", "hangman", "test"]
         core.phrases = ["machine learning", "data science"]
+        # Turn timers run on a virtual clock, so tests never sleep
+        self.timers = VirtualScheduler()
+        core.session.scheduler = self.timers
         core.game_over()  # reset state before each test
 
+    def tearDown(self):
+        core.game_over()
+        core.session.scheduler = core.timers
+
     def test_choose_word(self):
         # Test that choose_word returns a word from the list
         word = core.choose_word()
@@ -22,6 +30,23 @@ class TestWordcore(unittest.TestCase):
         phrase = core.choose_phrase()
         self.assertIn(phrase, core.phrases)
 
+    def test_choose_word_by_difficulty(self):
+        # The difficulty index only hands out words of the requested tier
+        core.words = []
+        for tier in word_index.TIERS:
+            word = core.choose_word(tier)
+            self.assertEqual(word_index.difficulty_tier(word), tier)
+
+    def test_setup_by_length(self):
+        # Length and distinct-letter targets reach the index through setup
+        core.words = []
+        core.setup("basic", length=9)
+        self.assertEqual(len(core.current_word), 9)
+        core.game_over()
+        core.setup("basic", "easy", length=9, distinct=6)
+        self.assertEqual(word_index.letter_profile(core.current_word)[:2], (9, 6))
+        self.assertEqual(word_index.difficulty_tier(core.current_word), "easy")
+
     def test_setup_basic(self):
         # Test basic setup initializes word and state correctly
         core.setup("basic")
@@ -62,13 +87,50 @@ class TestWordcore(unittest.TestCase):
         core.guess_letters("Z")
         self.assertEqual(core.life_remaining, 5)
 
+    def test_guess_reveals_every_position(self):
+        # A letter occurring several times is revealed everywhere at once
+        core.current_word = "hangman"
+        core.guess_letters("A")
+        self.assertEqual(core.word_state, ["_", "A", "_", "_", "_", "A", "_"])
+        self.assertFalse(core.is_won())
+        for letter in "HNGM":
+            core.guess_letters(letter)
+        self.assertTrue(core.is_won())
+
+    def test_guess_wrong_letter_recorded(self):
+        # Wrong guesses are kept in wrong_letters
+        core.current_word = "PYTHON"
+        core.guess_letters("Z")
+        core.guess_letters("P")
+        self.assertEqual(core.wrong_letters, ["Z"])
+        self.assertEqual(core.guessed_letters, ["Z", "P"])
+
     def test_timer_reduces_life(self):
         # Test timer expiration reduces life_remaining
         core.life_remaining = 6
         core.start_timer(1)  # short timer for test
-        time.sleep(2)  # wait until timer expires
+        self.timers.advance(2)  # move past the deadline
         self.assertEqual(core.life_remaining, 5)
 
+    def test_reset_timer_postpones_expiry(self):
+        # A guess pushes the deadline back instead of adding a second timer
+        core.current_word = "PYTHON"
+        core.start_timer(1)
+        core.reset_timer(15)
+        self.timers.advance(1.5)
+        self.assertEqual(core.life_remaining, 6)
+        self.assertEqual(self.timers.pending(), 1)
+        self.assertGreater(core.timeout, 0)
+
+    def test_next_countdown_change(self):
+        # The countdown shown next changes when a whole second has passed
+        core.start_timer(15)
+        self.timers.advance(0.4)
+        self.assertEqual(core.timeout, 15)
+        self.assertAlmostEqual(self.timers.next_change(core.session), 0.6)
+        core.game_over()
+        self.assertIsNone(self.timers.next_change(core.session))
+
     def test_reset_core(self):
         # Test game_over resets all game state variables
         core.current_word = "PYTHON"
@@ -97,5 +159,75 @@ class TestWordcore(unittest.TestCase):
         self.assertIn("_", core.word_state)
 
 
+# Test suite for running several sessions in one process
+class TestSessions(unittest.TestCase):
+
+    def setUp(self):
+        core.words = ["python", "hangman", "test"]
+        core.phrases = ["machine learning", "data science"]
+        self.manager = core.SessionManager()
+
+    def tearDown(self):
+        for session_id in list(self.manager.sessions):
+            self.manager.close(session_id)
+
+    def test_sessions_are_independent(self):
+        # Guessing in one session must not touch another
+        first = self.manager.create("basic")
+        second = self.manager.create("basic")
+        first.current_word = "PYTHON"
+        second.current_word = "TEST"
+        first.guess_letters("Z")
+        self.assertEqual(first.life_remaining, 5)
+        self.assertEqual(second.life_remaining, 6)
+        self.assertEqual(second.guessed_letters, [])
+
+    def test_close_session(self):
+        # Closing a session removes it from the manager
+        session = self.manager.create("basic")
+        self.assertIn(session.session_id, self.manager)
+        self.manager.close(session.session_id)
+        self.assertNotIn(session.session_id, self.manager)
+        self.assertEqual(len(self.manager), 0)
+
+    def test_seeded_sessions_repeat_their_words(self):
+        # Each session of a seeded manager has its own stream of words
+        core.words = [f"word{i}" for i in range(100)]
+        first = core.SessionManager(VirtualScheduler(), seed=7)
+        second = core.SessionManager(VirtualScheduler(), seed=7)
+        words = [first.create("basic", i).current_word for i in (1, 2, 3)]
+        reversed_words = [second.create("basic", i).current_word for i in (3, 2, 1)]
+        self.assertEqual(words, reversed_words[::-1])
+
+    def test_virtual_timers_fire_in_order(self):
+        # Advancing the virtual clock fires each passed deadline once
+        timers = VirtualScheduler()
+        manager = core.SessionManager(timers)
+        late = manager.create("basic")
+        early = manager.create("basic")
+        late.start_timer(10)
+        early.start_timer(5)
+        self.assertEqual(timers.advance(7), [early])
+        self.assertEqual(timers.advance(7), [late])
+        self.assertEqual(early.life_remaining, 5)
+
+    def test_stop_ends_timer_thread(self):
+        # A stopped scheduler leaves no thread behind
+        timers = TimerScheduler()
+        session = core.SessionManager(timers).create("basic")
+        session.start_timer(3600)
+        thread = timers._thread
+        self.assertTrue(thread.is_alive())
+        timers.stop()
+        self.assertFalse(thread.is_alive())
+
+    def test_module_attributes_follow_default_session(self):
+        # core.word_state and friends are views onto core.session
+        core.game_over()
+        core.life_remaining = 3
+        self.assertEqual(core.session.life_remaining, 3)
+        core.game_over()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import groupcommit
+
+
+# Test suite for the group commit queue
+class TestGroupCommitQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+        self.queue = groupcommit.GroupCommitQueue(self.batches.append, 60, "test")
+
+    def tearDown(self):
+        self.queue.close()
+
+    def test_items_are_written_in_one_batch(self):
+        # Everything queued before a sync reaches write() together
+        for item in range(3):
+            self.queue.append(item)
+        self.queue.sync()
+        self.assertEqual(self.batches, [[0, 1, 2]])
+
+    def test_failed_write_is_raised_by_sync(self):
+        # The error is logged and raised once; the thread keeps writing
+        def fail(batch):
+            self.queue.write = self.batches.append
+            raise OSError("disk full")
+
+        self.queue.write = fail
+        self.queue.append("lost")
+        with self.assertLogs("test", "ERROR"):
+            with self.assertRaises(OSError):
+                self.queue.sync()
+        self.queue.append("kept")
+        self.queue.sync()
+        self.assertEqual(self.batches, [["kept"]])
+
+    def test_close_writes_the_queue(self):
+        # Items still queued are written before the thread stops
+        self.queue.append("last")
+        self.queue.close()
+        self.assertEqual(self.batches, [["last"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
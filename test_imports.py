@@ -0,0 +1,25 @@
+import unittest
+from bench import HEADLESS_MODULES, import_profile
+
+
+# Regression checks for the modules the headless modules pull in; their
+# import time is measured by bench.py instead
+class TestImports(unittest.TestCase):
+
+    def test_headless_modules_skip_pygame(self):
+        # Nothing but the display frontend may pull in pygame
+        for module in HEADLESS_MODULES:
+            _, loaded = import_profile(module)
+            self.assertNotIn("pygame", loaded, module)
+            self.assertNotIn("components", loaded, module)
+
+    def test_core_defers_optional_modules(self):
+        # The difficulty index and solver load only when used
+        _, loaded = import_profile("core")
+        self.assertNotIn("word_index", loaded)
+        self.assertNotIn("numpy", loaded)
+        self.assertNotIn("tempfile", loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
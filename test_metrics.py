@@ -0,0 +1,74 @@
+import unittest
+import core
+import metrics
+from scheduler import VirtualScheduler
+
+
+# Test suite for the optional instrumentation
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        core.words = ["python"]
+        self.registry = metrics.registry
+        metrics.registry = metrics.Registry()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.registry = self.registry
+
+    def test_disabled_by_default(self):
+        # Without enable() core carries no instruments
+        metrics.disable()
+        self.assertIsNone(core.instruments)
+        self.assertIsNone(metrics.game)
+
+    def test_core_events_are_counted(self):
+        # Guesses, timer expiries and sessions update their metrics
+        timers = VirtualScheduler()
+        manager = core.SessionManager(timers)
+        session = manager.create("basic")
+        open_sessions = core.instruments.active_sessions.value
+        self.assertEqual(open_sessions, core.SessionManager.open_sessions)
+        session.guess_letters("P")
+        session.guess_letters("Z")
+        timers.advance(core.TURN_SECONDS + 1)
+        self.assertEqual(core.instruments.guesses.value, 2)
+        self.assertEqual(core.instruments.guess_seconds.count, 2)
+        self.assertEqual(core.instruments.timer_expiries.value, 1)
+        manager.close(session.session_id)
+        open_sessions = core.instruments.active_sessions.value
+        self.assertEqual(open_sessions, core.SessionManager.open_sessions)
+
+    def test_dataset_cache_hits(self):
+        # Loading a dataset already in memory counts as a hit
+        core.load_words()
+        self.assertEqual(core.instruments.dataset_hits["words"].value, 1)
+        self.assertEqual(core.instruments.dataset_misses["words"].value, 0)
+
+    def test_prometheus_text(self):
+        # Histograms dump cumulative buckets, sum and count
+        histogram = metrics.registry.histogram("x_seconds", "X", (1, 2), {"kind": "a"})
+        histogram.observe(0.5)
+        histogram.observe(1.5)
+        histogram.observe(5)
+        text = metrics.render()
+        self.assertIn("# TYPE x_seconds histogram", text)
+        self.assertIn('x_seconds_bucket{kind="a",le="1"} 1', text)
+        self.assertIn('x_seconds_bucket{kind="a",le="+Inf"} 3', text)
+        self.assertIn('x_seconds_count{kind="a"} 3', text)
+        self.assertIn("hangman_guesses_total 0", text)
+
+    def test_frame_phases(self):
+        # Each frame phase is observed once per frame
+        frame = metrics.game
+        frame.start_frame(10)
+        for phase in frame.PHASES:
+            frame.lap(phase)
+        frame.end_frame(13)
+        self.assertEqual(frame.seconds["draw"].count, 1)
+        self.assertEqual(frame.surfaces.sum, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import time
+import unittest
+import core
+import pool
+from scheduler import VirtualScheduler
+
+
+# Test suite for the pool of ready-made games
+class TestSessionPool(unittest.TestCase):
+
+    def setUp(self):
+        core.words = ["python"]
+        core.phrases = ["data science"]
+        self.manager = core.SessionManager(VirtualScheduler())
+
+    def tearDown(self):
+        pool.stop()
+
+    def test_start_loads_datasets(self):
+        # The datasets are loaded when the pool starts, not by the first game
+        core.words = []
+        core.phrases = []
+        installed = pool.start(2)
+        self.assertTrue(core.words)
+        self.assertTrue(core.phrases)
+        self.assertEqual(len(installed.ready["basic"]), 2)
+        self.assertEqual(len(installed.ready["intermediate"]), 2)
+
+    def test_setup_claims_template(self):
+        # A new game takes its word, index and state from the pool
+        installed = pool.start(2)
+        session = self.manager.create("intermediate")
+        self.assertEqual(installed.claimed, 1)
+        self.assertEqual(session.current_word, "data science")
+        self.assertEqual(session.word_state, list("____ _______"))
+        session.guess_letters("A")
+        self.assertEqual("".join(session.word_state), "_A_A _______")
+        self.assertEqual(session.remaining, 9)
+
+    def test_refills_to_watermark(self):
+        # Claiming below the low watermark wakes the refill thread
+        installed = pool.start(4)
+        for _ in range(3):
+            self.manager.create("basic")
+        deadline = time.monotonic() + 5
+        while len(installed.ready["basic"]) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(installed.ready["basic"]), 4)
+
+    def test_seeded_and_difficulty_games_skip_pool(self):
+        # Seeded sessions and games of a difficulty choose their own word
+        installed = pool.start(2)
+        seeded = core.SessionManager(VirtualScheduler(), seed=1)
+        seeded.create("basic")
+        self.manager.create().setup("basic", "easy")
+        self.assertEqual(installed.claimed, 0)
+
+    def test_empty_pool_falls_back(self):
+        # A mode without templates ready chooses the word on the spot
+        core.pool = pool.SessionPool(2)
+        session = self.manager.create("basic")
+        self.assertEqual(session.current_word, "python")
+        self.assertEqual(core.pool.misses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+import core
+import replay
+
+
+# Test suite for trace recording and replay
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        core.words = ["python", "hangman", "test", "replay", "keyboard"]
+        self.header, self.actions = replay.generate(sessions=20, games=3, seed=5)
+
+    def test_replay_is_deterministic(self):
+        # Replaying a trace twice ends in the same games and digest
+        first = replay.run_trace(self.header, self.actions)
+        second = replay.run_trace(self.header, self.actions)
+        self.assertEqual(first["digest"], second["digest"])
+        self.assertEqual(first["games"], 60)
+
+    def test_timeouts_are_replayed(self):
+        # Long think times expire turn timers on the virtual clock
+        result = replay.run_trace(self.header, self.actions)
+        self.assertGreater(result["timeouts"], 0)
+        self.assertGreater(result["virtual_seconds"], core.TURN_SECONDS)
+
+    def test_trace_file_round_trip(self):
+        # A written trace reads back unchanged
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.jsonl")
+            replay.write_trace(path, self.header, self.actions)
+            self.assertEqual(replay.read_trace(path), (self.header, self.actions))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import unittest
+import core
+import server
+
+
+# Test suite for the asyncio game server
+class TestServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        core.words = ["python"]
+        core.phrases = ["machine learning"]
+        self.turn_seconds = core.TURN_SECONDS
+        self.server, self.hangman = await server.serve("127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def asyncTearDown(self):
+        core.TURN_SECONDS = self.turn_seconds
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def request(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        return await self.receive()
+
+    async def receive(self):
+        line = await asyncio.wait_for(self.reader.readline(), 5)
+        return json.loads(line)
+
+    async def test_play_game(self):
+        # A new game is masked and guesses reveal letters
+        state = await self.request({"op": "new", "mode": "basic"})
+        self.assertEqual(state["word_state"], "______")
+        self.assertEqual(state["status"], "playing")
+        state = await self.request({"op": "guess", "letter": "p"})
+        self.assertEqual(state["word_state"], "P_____")
+        for letter in "YTHON":
+            state = await self.request({"op": "guess", "letter": letter})
+        self.assertEqual(state["status"], "won")
+        self.assertEqual(state["answer"], "python")
+        self.assertEqual(self.hangman.scheduler.pending(), 0)
+
+    async def test_invalid_requests(self):
+        # Bad requests get an error reply and the connection stays usable
+        reply = await self.request({"op": "guess", "letter": "E"})
+        self.assertEqual(reply["message"], "no game running")
+        reply = await self.request({"op": "guess", "letter": "12"})
+        self.assertEqual(reply["message"], "invalid letter")
+        self.writer.write(b"not json\n")
+        self.assertEqual((await self.receive())["message"], "invalid json")
+        state = await self.request({"op": "new", "mode": "intermediate"})
+        self.assertEqual(state["word_state"], "_______ ________")
+
+    async def test_timer_expiry_is_pushed(self):
+        # The loop scheduler takes a life and pushes the new state
+        core.TURN_SECONDS = 0.05
+        await self.request({"op": "new", "mode": "basic"})
+        state = await self.receive()
+        self.assertEqual(state["event"], "timeout")
+        self.assertEqual(state["life_remaining"], 5)
+
+    async def test_hello_names_session(self):
+        # A hello moves the connection to the named session
+        reply = await self.request({"op": "hello", "session": "player"})
+        self.assertEqual(reply["session"], "player")
+        self.assertIn("player", self.hangman.sessions)
+        self.assertEqual(len(self.hangman.sessions), 1)
+
+    async def disconnect(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        for _ in range(50):
+            if not self.hangman.connections:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.hangman.connections, {})
+
+    async def wait_for_sessions(self, count):
+        for _ in range(50):
+            if len(self.hangman.sessions) == count:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(len(self.hangman.sessions), count)
+
+    async def test_disconnect_closes_unnamed_session(self):
+        # A session no client can name again is dropped with its connection
+        await self.request({"op": "new", "mode": "basic"})
+        self.assertEqual(len(self.hangman.sessions), 1)
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.wait_for_sessions(0)
+
+    async def test_reconnect_resumes_named_session(self):
+        # A named session waits, timer stopped, for its client to come back
+        await self.request({"op": "hello", "session": "player"})
+        await self.request({"op": "new", "mode": "basic"})
+        await self.request({"op": "guess", "letter": "P"})
+        await self.disconnect()
+        self.assertEqual(self.hangman.scheduler.pending(), 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+        await self.request({"op": "hello", "session": "player"})
+        state = await self.request({"op": "guess", "letter": "Y"})
+        self.assertEqual(state["word_state"], "PY____")
+        self.assertEqual(self.hangman.scheduler.pending(), 1)
+
+    async def test_named_session_closes_after_grace(self):
+        # Without a reconnect the session is closed after RECONNECT_SECONDS
+        reconnect_seconds = server.RECONNECT_SECONDS
+        server.RECONNECT_SECONDS = 0.05
+        try:
+            await self.request({"op": "hello", "session": "player"})
+            await self.request({"op": "new", "mode": "basic"})
+            await self.disconnect()
+            self.assertIn("player", self.hangman.sessions)
+            await self.wait_for_sessions(0)
+        finally:
+            server.RECONNECT_SECONDS = reconnect_seconds
+
+
+if __name__ == "__main__":
+    unittest.main()
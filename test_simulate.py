@@ -0,0 +1,58 @@
+import random
+import unittest
+from collections import Counter
+import core
+import simulate
+from scheduler import NO_TIMERS
+
+
+# Test suite for the headless engine and batch simulator
+class TestSimulate(unittest.TestCase):
+
+    def setUp(self):
+        core.words = ["python", "hangman", "test"]
+        core.phrases = ["machine learning", "data science"]
+        self.session = core.HangmanSession(scheduler=NO_TIMERS)
+        self.rng = random.Random(0)
+
+    def test_headless_session_has_no_timer(self):
+        # Guessing on a headless session never schedules a deadline
+        pending = core.timers.pending()
+        self.session.current_word = "PYTHON"
+        self.session.guess_letters("P")
+        self.assertIsNone(self.session.deadline)
+        self.assertEqual(self.session.timeout, 0)
+        self.assertEqual(core.timers.pending(), pending)
+
+    def test_play_frequency(self):
+        # "tea" is solved by the three most common letters
+        won, guesses = simulate.play(
+            self.session, "tea", simulate.frequency_strategy, self.rng
+        )
+        self.assertTrue(won)
+        self.assertEqual(guesses, 3)
+
+    def test_play_loses_after_six_misses(self):
+        # "jazz" needs rare letters, so frequency guessing runs out of lives
+        won, guesses = simulate.play(
+            self.session, "jazz", simulate.frequency_strategy, self.rng
+        )
+        self.assertFalse(won)
+        self.assertEqual(self.session.life_remaining, 0)
+
+    def test_candidates_strategy(self):
+        # With a tiny dictionary the candidate filter always wins
+        wins, guesses = simulate.play_batch(50, "basic", "candidates", seed=1)
+        self.assertEqual(wins, 50)
+        self.assertEqual(sum(guesses.values()), 50)
+
+    def test_report(self):
+        # The report summarizes the histogram of guesses per game
+        result = simulate.report(4, 3, Counter({5: 1, 7: 2, 9: 1}))
+        self.assertEqual(result["win_rate"], 0.75)
+        self.assertEqual(result["guesses_mean"], 7)
+        self.assertEqual(result["guesses_median"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import core
+from scheduler import NO_TIMERS
+
+try:
+    import solver
+except ImportError:  # NumPy is optional
+    solver = None
+
+
+# Test suite for the vectorized solver
+@unittest.skipIf(solver is None, "NumPy is not installed")
+class TestSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.words = ["python", "hangman", "test", "tent", "text", "best"]
+        self.solver = solver.Solver(self.words)
+
+    def candidates(self, word_state, guessed):
+        _, positions = self.solver.candidates(word_state, set(guessed))
+        return sorted(self.words[i] for i in positions)
+
+    def test_candidates_by_length(self):
+        # With nothing revealed every entry of the same length matches
+        self.assertEqual(
+            self.candidates(list("____"), ""), ["best", "tent", "test", "text"]
+        )
+
+    def test_candidates_follow_reveals(self):
+        # Revealed letters must match and hidden ones cannot be guessed letters
+        self.assertEqual(self.candidates(list("TE_T"), "TE"), ["tent", "test", "text"])
+        self.assertEqual(self.candidates(list("TE_T"), "TES"), ["tent", "text"])
+        self.assertEqual(self.candidates(list("_E__"), "EB"), ["tent", "test", "text"])
+
+    def test_rank_letters(self):
+        # N, S and X each split tent/test/text evenly; T is already known
+        ranking = self.solver.rank_letters(list("TE_T"), {"T", "E"})
+        self.assertEqual({letter for letter, _, _ in ranking}, {"N", "S", "X"})
+        self.assertAlmostEqual(ranking[0][1], 0.9183, places=3)
+
+    def test_best_letter_solves_word(self):
+        # Guessing the best letter repeatedly finds the word quickly
+        session = core.HangmanSession(scheduler=NO_TIMERS)
+        session.current_word = "text"
+        while not session.is_won():
+            session.guess_letters(
+                self.solver.best_letter(session.word_state, session.guessed)
+            )
+        self.assertGreater(session.life_remaining, 0)
+        self.assertEqual("".join(session.word_state), "TEXT")
+
+    def test_length_changing_upper_case(self):
+        # "ß" upper-cases to "SS", so the entry is grouped by its game length
+        words = ["straße", "abc"]
+        _, positions = solver.Solver(words).candidates(core.index_word("straße")[1], set())
+        self.assertEqual([words[i] for i in positions], ["straße"])
+
+
+if __name__ == "__main__":
+    unittest.main()
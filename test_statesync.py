@@ -0,0 +1,89 @@
+import unittest
+import core
+import statesync
+from scheduler import VirtualScheduler
+
+
+# Test suite for the delta-encoded state sync
+class TestStateSync(unittest.TestCase):
+
+    def setUp(self):
+        core.words = ["hangman"]
+        core.phrases = ["data science"]
+        self.timers = VirtualScheduler()
+        self.session = core.HangmanSession(1, self.timers)
+        self.client = statesync.LocalClient(self.session, self.timers.clock)
+
+    def tearDown(self):
+        self.session.game_over()
+
+    def assertInSync(self):
+        view = self.client.view
+        self.assertEqual(view.word_state, self.session.word_state)
+        self.assertEqual(view.life_remaining, self.session.life_remaining)
+        self.assertEqual(view.timeout, self.session.timeout)
+        self.assertEqual(view.guessed, sorted(self.session.guessed))
+
+    def test_full_state_on_new_game(self):
+        # A new game sends the whole state, spaces of a phrase included
+        self.session.setup("intermediate")
+        self.client.pump()
+        self.assertInSync()
+        self.assertEqual(self.client.view.mode, "intermediate")
+        self.assertEqual(self.client.view.word_state, list("____ _______"))
+
+    def test_guesses_send_deltas(self):
+        # Guesses, misses and timeouts are sent as small deltas
+        self.session.setup("basic")
+        self.client.pump()
+        for letter in "AZN":
+            self.session.guess_letters(letter)
+            self.client.pump()
+            self.assertInSync()
+        sent = self.client.bytes_sent
+        self.timers.advance(core.TURN_SECONDS)
+        self.client.pump()
+        self.assertInSync()
+        # A timeout carries the new life count and the stopped deadline
+        self.assertEqual(self.client.bytes_sent - sent, 2 + 2 + 1 + 4)
+        self.assertEqual(self.client.view.word_state, list("_AN__AN"))
+
+    def test_idle_sends_nothing(self):
+        # Without changes there is nothing to send, and the client counts
+        # the turn down on its own clock
+        self.session.setup("basic")
+        self.client.pump()
+        messages = self.client.messages
+        self.timers.advance(3.5)
+        self.client.pump()
+        self.assertEqual(self.client.messages, messages)
+        self.assertEqual(self.client.view.timeout, core.TURN_SECONDS - 3)
+
+    def test_batched_guesses(self):
+        # Several guesses between two pumps arrive in one delta
+        self.session.setup("intermediate")
+        self.client.pump()
+        for letter in "AEST":
+            self.session.guess_letters(letter)
+        self.client.pump()
+        self.assertInSync()
+        self.assertEqual("".join(self.client.view.word_state), "_ATA S__E__E")
+        self.session.game_over()
+        self.session.setup("intermediate")
+        self.client.pump()
+        self.assertInSync()
+
+    def test_stream_keeps_partial_messages(self):
+        # A message split across reads is decoded once complete
+        message = statesync.StateEncoder().encode(self.session)
+        stream = bytearray(statesync.FRAME.pack(len(message)) + message)
+        tail = stream[5:]
+        del stream[5:]
+        self.assertEqual(statesync.read_messages(stream), [])
+        stream += tail
+        self.assertEqual(statesync.read_messages(stream), [message])
+        self.assertEqual(stream, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+import core
+import stats
+from scheduler import NO_TIMERS
+
+
+# Test suite for the game statistics store
+class TestStatsStore(unittest.TestCase):
+
+    def setUp(self):
+        core.words = ["python"]
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "stats.db")
+        self.store = stats.StatsStore(self.path, flush_interval=60)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def play(self, word, letters, player="ann"):
+        session = core.HangmanSession(scheduler=NO_TIMERS)
+        session.setup("basic")
+        session.current_word = word
+        for letter in letters:
+            session.guess_letters(letter)
+        self.store.record(session, session.is_won(), player)
+        return session
+
+    def test_record_only_queues(self):
+        # Nothing reaches the database until the background thread commits
+        self.play("python", "PYTHON")
+        self.assertIsNone(self.store.player("ann"))
+        self.store.sync()
+        self.assertEqual(self.store.player("ann")[:3], (1, 1, 0))
+
+    def test_failed_commit_keeps_writer(self):
+        # A failing transaction is reported by sync, and later games still land
+        def fail(games):
+            self.store._queue.write = self.store._commit
+            raise stats.sqlite3.OperationalError("disk I/O error")
+
+        self.store._queue.write = fail
+        self.play("python", "PYTHON")
+        with self.assertLogs("stats", "ERROR"):
+            with self.assertRaises(stats.sqlite3.OperationalError):
+                self.store.sync()
+        self.play("python", "PYTHON", player="bob")
+        self.store.sync()
+        self.assertIsNone(self.store.player("ann"))
+        self.assertEqual(self.store.player("bob")[:3], (1, 1, 0))
+
+    def test_games_and_aggregates(self):
+        # Each game is kept, and the per-word and per-player totals follow
+        self.play("python", "PYZTHQON")
+        self.play("python", "ABCDEF", player="bob")
+        self.store.sync()
+        games, losses, wrong, _ = self.store.word("python")
+        self.assertEqual((games, losses, wrong), (2, 1, 8))
+        rows = self.store._query("SELECT word, guesses, wrong_letters, won FROM games")
+        self.assertEqual(rows, [("python", 8, "ZQ", 1), ("python", 6, "ABCDEF", 0)])
+
+    def test_leaderboard_and_hardest_words(self):
+        # Players rank by wins, words by how often they are lost
+        for _ in range(2):
+            self.play("python", "PYTHON", player="bob")
+        self.play("python", "PYTHON")
+        for _ in range(5):
+            self.play("quiz", "ABCDEF")
+        self.store.sync()
+        self.assertEqual(self.store.leaderboard(), [("bob", 2, 2), ("ann", 1, 6)])
+        self.assertEqual(self.store.hardest_words(min_games=3)[0], ("quiz", 1.0, 5))
+
+    def test_queries_use_indexes(self):
+        # The leaderboard and hardest words never scan or sort the tables
+        self.assertEqual(self.store._query("PRAGMA journal_mode"), [("wal",)])
+        queries = {
+            "player_stats_wins": "SELECT player FROM player_stats "
+            "ORDER BY wins DESC LIMIT 10",
+            "word_stats_loss_rate": "SELECT word FROM word_stats WHERE games >= 5 "
+            "ORDER BY CAST(losses AS REAL) / games DESC LIMIT 10",
+        }
+        for index, sql in queries.items():
+            rows = self.store._query("EXPLAIN QUERY PLAN " + sql)
+            plan = " ".join(row[-1] for row in rows)
+            self.assertIn(index, plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
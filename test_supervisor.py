@@ -0,0 +1,126 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import unittest
+import supervisor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+# Test suite for the consistent hash ring
+class TestHashRing(unittest.TestCase):
+
+    def test_keys_spread_over_shards(self):
+        # Every shard owns a fair share of the keys
+        ring = supervisor.HashRing(range(4))
+        counts = [0] * 4
+        for key in range(4000):
+            counts[ring.shard(f"session-{key}")] += 1
+        for count in counts:
+            self.assertGreater(count, 600)
+
+    def test_adding_a_shard_moves_few_keys(self):
+        # Only keys taken over by the new shard change owner
+        before = supervisor.HashRing(range(4))
+        after = supervisor.HashRing(range(5))
+        moved = 0
+        for key in range(4000):
+            old, new = before.shard(key), after.shard(key)
+            if old != new:
+                self.assertEqual(new, 4)
+                moved += 1
+        self.assertLess(moved, 1400)
+
+    def test_session_for_hello(self):
+        # Only a hello with a session string names the route
+        self.assertEqual(supervisor.session_for(b'{"op":"hello","session":"a"}'), "a")
+        self.assertIsNone(supervisor.session_for(b'{"op":"new"}'))
+        self.assertIsNone(supervisor.session_for(b"not json"))
+
+
+class Client:
+    def __init__(self, port, session_id):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+        self.file = self.sock.makefile("rb")
+        self.hello = self.request({"op": "hello", "session": session_id})
+
+    def request(self, message):
+        try:
+            self.sock.sendall(json.dumps(message).encode() + b"\n")
+            line = self.file.readline()
+        except ConnectionError:
+            return None
+        return json.loads(line) if line else None
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+# Test suite for the forking supervisor
+class TestSupervisor(unittest.TestCase):
+
+    def setUp(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "supervisor.py", "--port", "0", "--workers", "2"],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+        )
+        banner = self.process.stdout.readline().decode()
+        self.port = int(banner.split()[2].rsplit(":", 1)[1])
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.process.terminate()
+        self.process.wait(5)
+        self.process.stdout.close()
+
+    def connect(self, session_id):
+        client = Client(self.port, session_id)
+        self.clients.append(client)
+        return client
+
+    def test_sessions_are_routed_by_id(self):
+        # The same session id always reaches the same worker
+        first = self.connect("alpha")
+        again = self.connect("alpha")
+        self.assertEqual(first.hello["worker"], again.hello["worker"])
+        self.assertEqual(first.hello["session"], "alpha")
+        state = first.request({"op": "new", "mode": "basic"})
+        self.assertEqual(state["status"], "playing")
+
+    def test_worker_restart_keeps_other_shards(self):
+        # Killing one worker leaves games on the other shard running
+        ring = supervisor.HashRing(range(2))
+        names = [f"player-{i}" for i in range(20)]
+        victim_id = next(name for name in names if ring.shard(name) == 0)
+        other_id = next(name for name in names if ring.shard(name) == 1)
+        victim = self.connect(victim_id)
+        other = self.connect(other_id)
+        self.assertNotEqual(victim.hello["worker"], other.hello["worker"])
+        other.request({"op": "new", "mode": "basic"})
+
+        os.kill(victim.hello["worker"], signal.SIGKILL)
+        self.assertIsNone(victim.request({"op": "new", "mode": "basic"}))
+        state = other.request({"op": "guess", "letter": "E"})
+        self.assertEqual(state["type"], "state")
+
+        for _ in range(50):
+            try:
+                restarted = self.connect(victim_id)
+            except OSError:
+                restarted = None
+            if restarted and restarted.hello:
+                break
+            time.sleep(0.1)
+        self.assertNotEqual(restarted.hello["worker"], victim.hello["worker"])
+
+
+if __name__ == "__main__":
+    unittest.main()
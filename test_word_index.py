@@ -0,0 +1,77 @@
+import os
+import random
+import tempfile
+import unittest
+import word_index
+import wordlist
+
+
+# Test suite for the difficulty-indexed word store
+class TestWordIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.entries = ["eat", "tea", "hangman", "jazz", "quiz", "elephant"]
+        self.path = os.path.join(self.directory.name, "words.idx")
+        word_index.build_index(self.entries, self.path)
+        self.index = word_index.WordIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    def test_letter_profile(self):
+        # Length, distinct letters and mean letter frequency
+        self.assertEqual(word_index.letter_profile("tea"), (3, 3, 10))
+        self.assertEqual(word_index.letter_profile("Web3"), (4, 3, 5))
+
+    def test_sample_matches_tier(self):
+        # Sampled entries always belong to the requested tier
+        rng = random.Random(1)
+        for tier in word_index.TIERS:
+            for _ in range(20):
+                position = self.index.sample(tier, rng=rng)
+                if position is None:
+                    continue
+                self.assertEqual(
+                    word_index.difficulty_tier(self.entries[position]), tier
+                )
+
+    def test_sample_by_length(self):
+        # Buckets narrow by length and distinct letters
+        rng = random.Random(2)
+        for _ in range(20):
+            position = self.index.sample("easy", length=3, rng=rng)
+            self.assertIn(self.entries[position], ["eat", "tea"])
+        self.assertEqual(self.index.count("easy", 3, 3), 2)
+        self.assertIsNone(self.index.sample("easy", length=40))
+
+    def test_counts_cover_every_entry(self):
+        # The tiers partition the word list
+        total = sum(self.index.count(tier) for tier in word_index.TIERS)
+        self.assertEqual(total, len(self.entries))
+        self.assertEqual(len(self.index), len(self.entries))
+
+    def test_sample_any_tier(self):
+        # Without a difficulty the bucket spans every tier
+        rng = random.Random(4)
+        picks = {self.entries[self.index.sample(None, 4, rng=rng)] for _ in range(20)}
+        self.assertEqual(picks, {"jazz", "quiz"})
+        self.assertEqual(self.index.count(None, 4), 2)
+        self.assertIsNone(self.index.sample(None, 40))
+
+    def test_stale_index_is_ignored(self):
+        # An index older than its text is treated as missing, not rebuilt
+        text_path = os.path.join(self.directory.name, "list.txt")
+        with open(text_path, "w") as f:
+            f.write("eat\njazz\n")
+        word_index.build_for_text(text_path)
+        mtime_ns = os.stat(text_path).st_mtime_ns
+        with open(text_path, "w") as f:
+            f.write("zzz\ntea\n")
+        os.utime(text_path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        self.assertIsNone(word_index.load(text_path))
+        self.assertFalse(word_index.verify(text_path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+import wordlist
+
+
+# Test suite for compiled, memory-mapped word lists
+class TestWordList(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.text_path = os.path.join(self.directory.name, "words.txt")
+        with open(self.text_path, "w") as f:
+            f.write("python\nhangman\n\ncafé\nmachine learning\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_compile_round_trip(self):
+        # Every non-blank line comes back in order
+        count = wordlist.compile_text(self.text_path)
+        self.assertEqual(count, 4)
+        words = wordlist.WordList(wordlist.compiled_path(self.text_path))
+        self.assertEqual(len(words), 4)
+        self.assertEqual(
+            list(words), ["python", "hangman", "café", "machine learning"]
+        )
+        self.assertEqual(words[-1], "machine learning")
+        with self.assertRaises(IndexError):
+            words[4]
+        words.close()
+
+    def test_load_prefers_compiled_file(self):
+        # load() maps the compiled file when it matches the text
+        wordlist.compile_text(self.text_path)
+        words = wordlist.load(self.text_path)
+        self.assertIsInstance(words, wordlist.WordList)
+        words.close()
+
+    def test_load_falls_back_when_stale(self):
+        # A text file edited after compiling is read directly
+        wordlist.compile_text(self.text_path)
+        with open(self.text_path, "a") as f:
+            f.write("extra\n")
+        words = wordlist.load(self.text_path)
+        self.assertIsInstance(words, list)
+        self.assertEqual(words[-1], "extra")
+
+    def test_same_length_edit_is_stale(self):
+        # An edit that keeps the file size still changes its mtime
+        wordlist.compile_text(self.text_path)
+        mtime_ns = os.stat(self.text_path).st_mtime_ns
+        with open(self.text_path, "r+") as f:
+            f.write("pythin")
+        os.utime(self.text_path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        self.assertFalse(wordlist.is_current(self.text_path))
+        words = wordlist.load(self.text_path)
+        self.assertIsInstance(words, list)
+        self.assertEqual(words[0], "pythin")
+
+    def test_load_does_not_hash_the_text(self):
+        # The runtime check compares size and mtime only
+        wordlist.compile_text(self.text_path)
+        file_digest = wordlist.file_digest
+        wordlist.file_digest = None
+        try:
+            words = wordlist.load(self.text_path)
+        finally:
+            wordlist.file_digest = file_digest
+        self.assertIsInstance(words, wordlist.WordList)
+        words.close()
+
+    def test_verify_restamps_unchanged_text(self):
+        # Touching the text makes it stale until verify() finds the same digest
+        wordlist.compile_text(self.text_path)
+        os.utime(self.text_path, ns=(10**9, 10**9))
+        self.assertFalse(wordlist.is_current(self.text_path))
+        self.assertTrue(wordlist.verify(self.text_path))
+        self.assertTrue(wordlist.is_current(self.text_path))
+        with open(self.text_path, "r+") as f:
+            f.write("pythin")
+        self.assertFalse(wordlist.verify(self.text_path))
+
+    def test_rejects_other_files(self):
+        # Files without the magic header are refused
+        bad_path = os.path.join(self.directory.name, "bad.bin")
+        with open(bad_path, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            wordlist.WordList(bad_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
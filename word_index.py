@@ -0,0 +1,263 @@
+"""
+Difficulty index over a compiled word list.
+
+Each entry gets a letter profile: its length, its number of distinct letters
+and a letter-frequency score (the mean English frequency of those letters,
+in percent, rounded down). Entries are sorted by (tier, length, distinct,
+score) and their word list positions stored as one uint32 array, so every
+tier, and every bucket inside a tier, is a contiguous slice. Sampling from
+a tier or bucket is then a single random index into that slice.
+
+The index is written at dataset build time (see build_datasets.py) as
+name.idx next to name.txt and memory-mapped at runtime. Like a compiled
+word list, its header records the size, mtime and SHA-256 of the text.
+"""
+
+import array
+import mmap
+import os
+import random
+import struct
+import sys
+
+import wordlist
+
+MAGIC = b"HMWI"
+VERSION = 3
+HEADER = struct.Struct("<4sHHIIQQ32s")
+BUCKET = struct.Struct("<BBHHHII")
+POSITION = struct.Struct("<I")
+
+TIERS = ("easy", "medium", "hard")
+
+# Frequency of each letter in English text, in hundredths of a percent
+LETTER_FREQUENCY = {
+    "E": 1270, "T": 910, "A": 820, "O": 750, "I": 700, "N": 670, "S": 630,
+    "H": 610, "R": 600, "D": 430, "L": 400, "C": 280, "U": 280, "M": 240,
+    "W": 240, "F": 220, "G": 200, "Y": 200, "P": 190, "B": 150, "V": 100,
+    "K": 80, "J": 15, "X": 15, "Q": 10, "Z": 7,
+}
+
+
+def index_path(text_path):
+    """
+    Returns where the difficulty index of a text word list is stored.
+    """
+    return os.path.splitext(text_path)[0] + ".idx"
+
+
+def letter_profile(entry):
+    """
+    Returns (length, distinct letters, letter-frequency score) for an entry.
+    """
+    letters = {letter for letter in entry.upper() if letter in LETTER_FREQUENCY}
+    if not letters:
+        return len(entry), 0, 0
+    total = sum(LETTER_FREQUENCY[letter] for letter in letters)
+    return len(entry), len(letters), total // (100 * len(letters))
+
+
+def difficulty_tier(entry):
+    """
+    Rates an entry "easy", "medium" or "hard".
+    Entries made of common letters are easier; ten or more distinct
+    letters moves an entry up one tier.
+    """
+    _, distinct, score = letter_profile(entry)
+    if score >= 6:
+        tier = 0
+    elif score == 5:
+        tier = 1
+    else:
+        tier = 2
+    if distinct >= 10:
+        tier = min(tier + 1, 2)
+    return TIERS[tier]
+
+
+def bucket_key(entry):
+    """
+    Returns the sort key (tier number, length, distinct, score) of an entry.
+    """
+    length, distinct, score = letter_profile(entry)
+    return TIERS.index(difficulty_tier(entry)), length, distinct, score
+
+
+def build_index(entries, out_path, source=(0, 0, bytes(32))):
+    """
+    Writes the difficulty index of an iterable of entries. source is the
+    (size, mtime in ns, SHA-256) of the text they come from.
+    Returns the number of entries indexed.
+    """
+    # Only needed when building, so loading an index stays cheap to import
+    import tempfile
+
+    keyed = sorted(
+        (bucket_key(entry), position) for position, entry in enumerate(entries)
+    )
+    buckets = []
+    positions = array.array("I")
+    for key, position in keyed:
+        if not buckets or buckets[-1][0] != key:
+            buckets.append([key, len(positions), 0])
+        buckets[-1][2] += 1
+        positions.append(position)
+    if sys.byteorder != "little":
+        positions.byteswap()
+
+    directory = os.path.dirname(out_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    0,
+                    len(buckets),
+                    len(positions),
+                    *source,
+                )
+            )
+            for (tier, length, distinct, score), start, count in buckets:
+                f.write(BUCKET.pack(tier, score, length, distinct, 0, start, count))
+            positions.tofile(f)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(positions)
+
+
+def build_for_text(text_path):
+    """
+    Builds the difficulty index of a text word list, one entry per
+    non-blank line, in the same order as its compiled word list.
+    """
+    source = wordlist.source_stamp(text_path) + (wordlist.file_digest(text_path),)
+    with open(text_path, "r", encoding="utf-8") as f:
+        entries = [line.strip() for line in f if line.strip()]
+    return build_index(entries, index_path(text_path), source)
+
+
+class WordIndex:
+    """
+    Memory-mapped difficulty index. sample() returns the word list position
+    of a random entry matching a tier and, optionally, a length and
+    distinct-letter count (which only narrows a length), in constant time.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            _,
+            bucket_count,
+            count,
+            source_size,
+            source_mtime_ns,
+            source_digest,
+        ) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a word index")
+        self.path = path
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+        self.source_digest = source_digest
+        self._count = count
+        self._positions = HEADER.size + BUCKET.size * bucket_count
+
+        # Every prefix of the sort key covers one contiguous slice
+        self.ranges = {}
+        for i in range(bucket_count):
+            tier, score, length, distinct, _, start, size = BUCKET.unpack_from(
+                self._map, HEADER.size + BUCKET.size * i
+            )
+            for key in (
+                (TIERS[tier],),
+                (TIERS[tier], length),
+                (TIERS[tier], length, distinct),
+                (TIERS[tier], length, distinct, score),
+            ):
+                first, total = self.ranges.get(key, (start, 0))
+                self.ranges[key] = (first, total + size)
+
+    def __len__(self):
+        return self._count
+
+    def count(self, difficulty, length=None, distinct=None):
+        """
+        Returns how many entries match the given bucket; a difficulty of
+        None counts every tier.
+        """
+        if difficulty is None:
+            return sum(self.count(tier, length, distinct) for tier in TIERS)
+        return self.ranges.get(self._key(difficulty, length, distinct), (0, 0))[1]
+
+    def sample(self, difficulty, length=None, distinct=None, rng=random):
+        """
+        Returns the word list position of a random entry in the bucket,
+        or None if the bucket is empty. A difficulty of None samples the
+        bucket across every tier.
+        """
+        if difficulty is None:
+            counts = [self.count(tier, length, distinct) for tier in TIERS]
+            if not any(counts):
+                return None
+            difficulty = rng.choices(TIERS, counts)[0]
+        bucket = self.ranges.get(self._key(difficulty, length, distinct))
+        if bucket is None:
+            return None
+        start, size = bucket
+        offset = self._positions + POSITION.size * (start + rng.randrange(size))
+        return POSITION.unpack_from(self._map, offset)[0]
+
+    def close(self):
+        self._map.close()
+
+    def _key(self, difficulty, length, distinct):
+        key = (difficulty,)
+        if length is not None:
+            key += (length,)
+            if distinct is not None:
+                key += (distinct,)
+        return key
+
+
+def load(text_path):
+    """
+    Loads the difficulty index of a text word list. Returns None if it is
+    missing, in an older format, or stale (the text has changed size or
+    mtime since it was built); build_datasets.py rebuilds it.
+    """
+    path = index_path(text_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        index = WordIndex(path)
+    except ValueError:
+        return None
+    if os.path.exists(text_path) and (
+        (index.source_size, index.source_mtime_ns) != wordlist.source_stamp(text_path)
+    ):
+        index.close()
+        return None
+    return index
+
+
+def verify(text_path):
+    """
+    Build time check: returns True when the difficulty index of a text word
+    list was built from the text's current contents. Reads the whole text.
+    """
+    return wordlist.verify_source(index_path(text_path), HEADER, MAGIC, VERSION, text_path)
+
+
+if __name__ == "__main__":
+    for text_path in sys.argv[1:]:
+        count = build_for_text(text_path)
+        print(f"{text_path}: {count} entries -> {index_path(text_path)}")
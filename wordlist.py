@@ -0,0 +1,262 @@
+"""
+Compiled word lists.
+
+A text word list (one entry per line) is compiled offline into a binary file:
+
+    header   magic b"HMWL", version, entry count, then the size, mtime
+             (in ns) and SHA-256 of the source text
+    offsets  count + 1 little-endian uint32 offsets into the blob
+    blob     every entry encoded as UTF-8, packed back to back
+
+At runtime the file is memory-mapped, so picking an entry is O(1), nothing is
+loaded up front, and forked workers share the same pages. Whether it is
+still current is decided from the size and mtime of the text alone, so
+loading never reads the text; the SHA-256 is only compared at build time
+(see verify()).
+
+Usage: python wordlist.py datasets/cleaned_data.txt [more.txt ...]
+"""
+
+import array
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"HMWL"
+VERSION = 3
+HEADER = struct.Struct("<4sHHIQQ32s")
+# Every compiled header ends with the source text's size, mtime and SHA-256
+SOURCE = struct.Struct("<QQ32s")
+OFFSET = struct.Struct("<I")
+SPAN = struct.Struct("<II")
+
+
+def compiled_path(text_path):
+    """
+    Returns where the compiled form of a text word list is stored.
+    """
+    return os.path.splitext(text_path)[0] + ".bin"
+
+
+def file_digest(path):
+    """
+    Returns the SHA-256 digest of a file, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def source_stamp(text_path):
+    """
+    Returns (size, mtime in ns) of a text file.
+    """
+    stat = os.stat(text_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def compile_entries(entries, out_path, source_path=None):
+    """
+    Writes an iterable of strings as a compiled word list.
+    The file is written next to out_path and renamed into place.
+    The source recorded is source_path; without one it is the entries
+    written one per line, with no mtime until verify() stamps it.
+    """
+    # Only needed when compiling, so loading a word list stays cheap to import
+    import shutil
+    import tempfile
+
+    offsets = array.array("I", [0])
+    position = 0
+    text_digest = hashlib.sha256()
+    if source_path is not None:
+        source_size, source_mtime_ns = source_stamp(source_path)
+        source_digest = file_digest(source_path)
+    directory = os.path.dirname(out_path) or "."
+    with tempfile.TemporaryFile() as blob:
+        for entry in entries:
+            data = entry.encode("utf-8")
+            if source_path is None:
+                text_digest.update(data + b"\n")
+            blob.write(data)
+            position += len(data)
+            offsets.append(position)
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        blob.seek(0)
+        count = len(offsets) - 1
+        if source_path is None:
+            source_size, source_mtime_ns = position + count, 0
+            source_digest = text_digest.digest()
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(
+                    HEADER.pack(
+                        MAGIC,
+                        VERSION,
+                        0,
+                        count,
+                        source_size,
+                        source_mtime_ns,
+                        source_digest,
+                    )
+                )
+                offsets.tofile(f)
+                shutil.copyfileobj(blob, f)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, out_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return count
+
+
+def compile_text(text_path, out_path=None):
+    """
+    Compiles a text word list, skipping blank lines.
+    """
+    out_path = out_path or compiled_path(text_path)
+    with open(text_path, "r", encoding="utf-8") as f:
+        entries = (line.strip() for line in f)
+        return compile_entries((entry for entry in entries if entry), out_path, text_path)
+
+
+class WordList:
+    """
+    Read-only, memory-mapped view of a compiled word list.
+    Behaves like a sequence of strings.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            _,
+            count,
+            source_size,
+            source_mtime_ns,
+            source_digest,
+        ) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a compiled word list")
+        self.path = path
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+        self.source_digest = source_digest
+        self._count = count
+        self._blob = HEADER.size + OFFSET.size * (count + 1)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("word list index out of range")
+        start, end = SPAN.unpack_from(self._map, HEADER.size + OFFSET.size * index)
+        return self._map[self._blob + start : self._blob + end].decode("utf-8")
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def close(self):
+        self._map.close()
+
+
+def recorded_source(path, header, magic, version):
+    """
+    Returns the (size, mtime in ns, SHA-256) of the source recorded in a
+    compiled file with the given header layout, or None if the file is
+    missing or in another format or version.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read(header.size)
+    except FileNotFoundError:
+        return None
+    if len(data) < header.size:
+        return None
+    fields = header.unpack(data)
+    if fields[0] != magic or fields[1] != version:
+        return None
+    return fields[-3:]
+
+
+def verify_source(path, header, magic, version, text_path):
+    """
+    Returns True when the compiled file at path was built from the current
+    contents of text_path, comparing SHA-256 digests. A match whose size
+    or mtime is out of date (a fresh checkout, say) is stamped with the
+    current ones, so the runtime check accepts the file again.
+    """
+    recorded = recorded_source(path, header, magic, version)
+    if recorded is None or recorded[2] != file_digest(text_path):
+        return False
+    stamp = source_stamp(text_path)
+    if tuple(recorded[:2]) != stamp:
+        with open(path, "r+b") as f:
+            f.seek(header.size - SOURCE.size)
+            f.write(SOURCE.pack(*stamp, recorded[2]))
+    return True
+
+
+def is_current(text_path):
+    """
+    Returns True when the compiled form of a text word list exists and the
+    text still has the size and mtime it was compiled from.
+    """
+    bin_path = compiled_path(text_path)
+    if not os.path.exists(bin_path):
+        return False
+    if not os.path.exists(text_path):
+        return True
+    recorded = recorded_source(bin_path, HEADER, MAGIC, VERSION)
+    return recorded is not None and tuple(recorded[:2]) == source_stamp(text_path)
+
+
+def verify(text_path):
+    """
+    Build time check: returns True when the compiled form of a text word
+    list was built from the text's current contents. Reads the whole text.
+    """
+    return verify_source(compiled_path(text_path), HEADER, MAGIC, VERSION, text_path)
+
+
+def load(text_path):
+    """
+    Loads a word list, preferring its compiled form.
+    Falls back to reading the text file into a list when the compiled
+    file is missing or was built from a different version of the text.
+    """
+    if is_current(text_path):
+        return WordList(compiled_path(text_path))
+    return read_text(text_path)
+
+
+def read_text(text_path):
+    """
+    Reads the non-blank lines of a text word list into a list.
+    """
+    entries = []
+    with open(text_path, "r", encoding="utf-8") as f:
+        for data in f:
+            if data.strip():
+                entries.append(data.strip())
+    return entries
+
+
+if __name__ == "__main__":
+    for text_path in sys.argv[1:]:
+        count = compile_text(text_path)
+        print(f"{text_path}: {count} entries -> {compiled_path(text_path)}")